@@ -0,0 +1,116 @@
+"""
+Dashboard Collectors
+====================
+
+Runs the dashboard's metric collectors concurrently, each with its own
+timeout, so a dashboard takes about as long as its slowest collector
+instead of the sum of all of them.
+
+Collectors are plain functions returning a JSON-serialisable section. Each
+one runs in its own daemon thread (they mostly wait on subprocesses and
+file I/O); a collector that is still running at its deadline is abandoned
+rather than waited for. A section that timed out or raised is filled in
+from the last good result in the cache file and marked "stale", or with
+the collector's default and marked "timeout"/"error" when there is none,
+so one broken collector never fails the whole dashboard.
+
+Usage:
+    sections, timings = run_collectors([
+        Collector("git", get_git_metrics, timeout=30),
+        Collector("tests", get_test_metrics, timeout=300, default={}),
+    ], cache_path=Path(".cache/sections.json"))
+"""
+
+import json
+import os
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, List, NamedTuple, Optional, Tuple
+
+
+_cache_lock = threading.Lock()  # run_collectors may run on several threads (dashboard_daemon.py)
+
+
+class Collector(NamedTuple):
+    name: str
+    func: Callable[[], Any]
+    timeout: float = 30.0
+    default: Any = None
+
+
+class _Run:
+    """One collector running in a daemon thread."""
+
+    def __init__(self, collector: Collector):
+        self.collector = collector
+        self.result = None
+        self.error: Optional[BaseException] = None
+        self.seconds: Optional[float] = None
+        self.started = time.perf_counter()
+        self.thread = threading.Thread(target=self._target, name=f"collector-{collector.name}", daemon=True)
+        self.thread.start()
+
+    def _target(self) -> None:
+        try:
+            self.result = self.collector.func()
+        except BaseException as e:  # reported in the section status, never raised
+            self.error = e
+        self.seconds = time.perf_counter() - self.started
+
+
+def _load_cache(path: Optional[Path]) -> dict:
+    if path is None:
+        return {}
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_cache(path: Path, cache: dict) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.tmp")
+    tmp.write_text(json.dumps(cache, default=str), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def run_collectors(collectors: List[Collector], cache_path: Optional[Path] = None) -> Tuple[dict, dict]:
+    """Run all collectors at once; returns (sections by name, status and timing by name)."""
+    runs = [_Run(c) for c in collectors]
+    start = time.perf_counter()
+    for run in runs:
+        remaining = run.collector.timeout - (time.perf_counter() - start)
+        run.thread.join(max(0.0, remaining))
+
+    with _cache_lock:
+        return _merge(runs, cache_path)
+
+
+def _merge(runs: List[_Run], cache_path: Optional[Path]) -> Tuple[dict, dict]:
+    cache = _load_cache(cache_path)
+    sections, timings = {}, {}
+    now = datetime.utcnow().isoformat() + "Z"
+    for run in runs:
+        name = run.collector.name
+        if run.thread.is_alive():
+            status, info = "timeout", {"seconds": round(run.collector.timeout, 3)}
+        elif run.error is not None:
+            status, info = "error", {"seconds": round(run.seconds, 3), "error": f"{type(run.error).__name__}: {run.error}"}
+        else:
+            sections[name] = run.result
+            cache[name] = {"collected_at": now, "value": run.result}
+            timings[name] = {"status": "ok", "seconds": round(run.seconds, 3)}
+            continue
+        if name in cache:
+            sections[name] = cache[name]["value"]
+            info["stale_since"] = cache[name]["collected_at"]
+            info["reason"], status = status, "stale"
+        else:
+            sections[name] = run.collector.default
+        timings[name] = {"status": status, **info}
+
+    if cache_path is not None:
+        _save_cache(cache_path, cache)
+    return sections, timings
@@ -0,0 +1,321 @@
+#!/usr/bin/env python3
+"""
+Dashboard Daemon
+================
+
+Keeps the dashboard current and serves it from memory, so agents asking
+for ground-truth status get an answer in milliseconds instead of waiting
+for every collector.
+
+- Watching: every INTERVAL seconds each section's inputs (spec and source
+  trees, the blackboard and its sidecars, `.git` refs and index) are
+  stamped by (file count, total size, newest mtime). Only collectors whose
+  stamp changed — or whose MAX_AGE ran out — are re-run, concurrently,
+  through the same collector framework as generate_dashboard.py. The tests
+  section only watches TEST_SOURCE_DIRS, not the whole repository.
+- BACKGROUND sections (a vitest run can take minutes) are collected on
+  their own thread and published when they finish; the other sections
+  keep refreshing every tick meanwhile.
+- Serving: GET /dashboard.json, /dashboard.md (also /), /snapshot.json and
+  /healthz on a local port. Responses are pre-rendered bytes swapped in
+  after each refresh.
+- History: a snapshot is appended to dashboard_history.py's store when
+  HEAD moved, and otherwise at most every RECORD_INTERVAL seconds.
+- snapshot.json is rewritten (temp file + os.replace) only when its
+  content changed, ignoring timings and other VOLATILE_KEYS, so readers
+  never see a half-written file and an idle tree causes no writes.
+
+Usage:
+    python dashboard/dashboard_daemon.py
+    python dashboard/dashboard_daemon.py --port 8787 --interval 1 --snapshot dashboard/snapshot.json
+    curl -s http://127.0.0.1:8787/dashboard.json
+"""
+
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import generate_dashboard as gd
+from collectors import run_collectors
+from vitest_cache import CONFIG_FILES, SOURCE_SUFFIXES
+
+DEFAULT_PORT = 8787
+INTERVAL = 1.0
+RECORD_INTERVAL = 900.0
+SNAPSHOT_PATH = Path(__file__).resolve().parent / "snapshot.json"
+IGNORE_DIRS = {".git", "node_modules", ".cache", "dist", "coverage", "__pycache__", "test-results"}
+
+CODE_SUFFIXES = tuple(s for s in SOURCE_SUFFIXES if s != ".json")  # not the state files we write ourselves
+# Where test inputs live: the vitest.config.ts include roots and this tree's sources.
+TEST_SOURCE_DIRS = ("src", "sandbox/src", "hot/bronze/src")
+
+Watch = Tuple[Path, Optional[Tuple[str, ...]]]  # path, file suffixes (None: all files)
+
+# Inputs per section; a section is recomputed when any of them changes.
+WATCHES: Dict[str, List[Watch]] = {
+    "git": [(gd.REPO_ROOT / ".git" / name, None) for name in ("HEAD", "index", "packed-refs", "refs")],
+    "tests": [(gd.REPO_ROOT / name, CODE_SUFFIXES) for name in TEST_SOURCE_DIRS]
+    + [(gd.REPO_ROOT / name, None) for name in CONFIG_FILES],
+    "specs": [(gd.SANDBOX_ROOT / "specs", (".md",))],
+    "blackboard": [
+        (gd.BLACKBOARD_PATH, None),
+        (Path(f"{gd.BLACKBOARD_PATH}.segments"), None),
+    ],
+    "blackboard_history": [(Path(f"{gd.BLACKBOARD_PATH}.columnar"), None)],
+    "implementation": [(gd.SANDBOX_ROOT / "src", None)],
+    "progress": [
+        (gd.SANDBOX_ROOT / "specs", (".md",)),
+        (gd.SANDBOX_ROOT / "src", None),
+        (gd.BLACKBOARD_PATH, None),
+    ],
+}
+# Sections whose inputs are not fully visible to the stamps (working-tree edits for git status).
+MAX_AGE = {"git": 10.0}
+# Sections collected on their own thread instead of inside a refresh tick.
+BACKGROUND = {"tests"}
+# Keys left out when deciding whether snapshot.json changed.
+VOLATILE_KEYS = {"generated_at", "collect_seconds", "seconds", "git_processes", "refreshed_sections"}
+
+
+def _scan(path: Path, suffixes: Optional[Tuple[str, ...]], acc: List[int]) -> None:
+    try:
+        entries = os.scandir(path)
+    except (FileNotFoundError, NotADirectoryError, PermissionError):
+        return
+    with entries:
+        for entry in entries:
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    if entry.name not in IGNORE_DIRS:
+                        _scan(Path(entry.path), suffixes, acc)
+                elif suffixes is None or entry.name.endswith(suffixes):
+                    st = entry.stat(follow_symlinks=False)
+                    acc[0] += 1
+                    acc[1] += st.st_size
+                    acc[2] = max(acc[2], st.st_mtime_ns)
+            except FileNotFoundError:
+                continue
+
+
+def _content(value):
+    """`value` without VOLATILE_KEYS, at any depth."""
+    if isinstance(value, dict):
+        return {k: _content(v) for k, v in value.items() if k not in VOLATILE_KEYS}
+    if isinstance(value, list):
+        return [_content(v) for v in value]
+    return value
+
+
+def stamp(watches: List[Watch]) -> Tuple[int, ...]:
+    """(count, bytes, newest mtime) per watched path; changes when anything under it does."""
+    result = []
+    for path, suffixes in watches:
+        acc = [0, 0, 0]
+        try:
+            st = os.stat(path)
+        except FileNotFoundError:
+            result.extend((-1, 0, 0))
+            continue
+        if os.path.isdir(path):
+            acc[2] = st.st_mtime_ns  # entries added or removed
+            _scan(path, suffixes, acc)
+        else:
+            acc = [1, st.st_size, st.st_mtime_ns]
+        result.extend(acc)
+    return tuple(result)
+
+
+class DashboardDaemon:
+    """Incrementally refreshed, pre-rendered dashboard."""
+
+    def __init__(self, snapshot_path: Optional[Path] = SNAPSHOT_PATH, interval: float = INTERVAL):
+        self.snapshot_path = snapshot_path
+        self.interval = interval
+        self.collectors = {c.name: c for c in gd.COLLECTORS}
+        self.sections: dict = {}
+        self.timings: dict = {}
+        self._stamps: Dict[str, Tuple[int, ...]] = {}
+        self._collected_at: Dict[str, float] = {}
+        self._payload: Dict[str, bytes] = {}
+        self.refreshes = 0
+        self._recorded: Tuple[Optional[str], float] = (None, 0.0)  # commit, monotonic time
+        self._regressions: Optional[List[dict]] = None
+        self._snapshot_content: Optional[str] = None
+        self._running: Dict[str, threading.Thread] = {}  # BACKGROUND sections being collected
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+
+    def stale_sections(self) -> Tuple[List[str], Dict[str, Tuple[int, ...]]]:
+        stamps = {name: stamp(WATCHES.get(name, [])) for name in self.collectors}
+        now = time.monotonic()
+        stale = [
+            name for name in self.collectors
+            if name not in self._running
+            and (
+                name not in self.sections
+                or stamps[name] != self._stamps.get(name)
+                or now - self._collected_at.get(name, 0) > MAX_AGE.get(name, float("inf"))
+            )
+        ]
+        return stale, stamps
+
+    def refresh(self) -> List[str]:
+        """Re-run (or start, for BACKGROUND sections) the collectors whose inputs changed; returns their names."""
+        stale, stamps = self.stale_sections()
+        for name in stale:
+            if name in BACKGROUND:
+                self._start_background(name, stamps[name])
+        foreground = [name for name in stale if name not in BACKGROUND]
+        if foreground:
+            started = time.perf_counter()
+            gd.FILES.reset()
+            sections, timings = run_collectors([self.collectors[n] for n in foreground], gd.CACHE_DIR / "sections.json")
+            with self._lock:
+                self._store(sections, timings, stamps)
+                self._publish(foreground, time.perf_counter() - started)
+        return stale
+
+    def _start_background(self, name: str, section_stamp: Tuple[int, ...]) -> None:
+        def run() -> None:
+            try:
+                sections, timings = run_collectors([self.collectors[name]], gd.CACHE_DIR / "sections.json")
+                with self._lock:
+                    self._store(sections, timings, {name: section_stamp})
+                    self._publish([name], timings[name]["seconds"])
+            except Exception as e:  # the section keeps its last value and is retried next tick
+                print(f"{name} refresh failed: {type(e).__name__}: {e}", file=sys.stderr)
+            finally:
+                with self._lock:
+                    self._running.pop(name, None)
+
+        with self._lock:
+            self._running[name] = threading.Thread(target=run, name=f"dashboard-{name}", daemon=True)
+            self._running[name].start()
+
+    def _store(self, sections: dict, timings: dict, stamps: Dict[str, Tuple[int, ...]]) -> None:
+        now = time.monotonic()
+        for name in sections:
+            self.sections[name] = sections[name]
+            self.timings[name] = timings[name]
+            if timings[name]["status"] == "ok":
+                self._stamps[name] = stamps[name]
+                self._collected_at[name] = now
+
+    def _publish(self, refreshed: List[str], collect_seconds: float) -> None:
+        """Render the dashboard from the current sections. Caller holds the lock."""
+        ordered, timings = {}, {}
+        for name, collector in self.collectors.items():
+            ordered[name] = self.sections.get(name, collector.default)
+            timings[name] = self.timings.get(name, {"status": "running", "seconds": 0.0})
+        dashboard = gd.build_dashboard(ordered, timings, collect_seconds)
+        dashboard["refreshed_sections"] = refreshed
+        self.record(dashboard, time.monotonic())
+        body = json.dumps(dashboard, indent=2, default=str).encode("utf-8")
+        self._payload = {"json": body, "md": gd.render_markdown(dashboard).encode("utf-8")}
+        content = json.dumps(_content(dashboard), sort_keys=True, default=str)
+        if self.snapshot_path is not None and content != self._snapshot_content:
+            tmp = self.snapshot_path.with_name(f".{self.snapshot_path.name}.tmp")
+            tmp.write_bytes(body)
+            os.replace(tmp, self.snapshot_path)
+            self._snapshot_content = content
+        self.refreshes += 1
+
+    def record(self, dashboard: dict, now: float) -> None:
+        if gd.dashboard_history is None:
+            return
+        if any(name not in self.sections for name in self.collectors):
+            dashboard["regressions"] = self._regressions  # a BACKGROUND section has not reported yet
+            return
+        commit = dashboard["git"].get("latest_commit_hash")
+        last_commit, last_at = self._recorded
+        if commit == last_commit and now - last_at < RECORD_INTERVAL:
+            dashboard["regressions"] = self._regressions
+            return
+        regressions = gd.dashboard_history.append(dashboard)
+        if regressions is not None:
+            self._recorded = (commit, now)
+            self._regressions = regressions
+        dashboard["regressions"] = regressions
+
+    def payload(self, kind: str) -> bytes:
+        return self._payload.get(kind, b"")
+
+    def run(self) -> None:
+        while not self._stop.is_set():
+            try:
+                self.refresh()
+            except Exception as e:  # keep serving the last good dashboard
+                print(f"refresh failed: {type(e).__name__}: {e}", file=sys.stderr)
+            self._stop.wait(self.interval)
+
+    def stop(self) -> None:
+        self._stop.set()
+
+
+def make_handler(daemon: DashboardDaemon):
+    class Handler(BaseHTTPRequestHandler):
+        routes = {
+            "/": ("md", "text/markdown; charset=utf-8"),
+            "/dashboard.md": ("md", "text/markdown; charset=utf-8"),
+            "/dashboard.json": ("json", "application/json"),
+            "/snapshot.json": ("json", "application/json"),
+        }
+
+        def do_GET(self) -> None:
+            path = self.path.split("?", 1)[0]
+            if path == "/healthz":
+                body, content_type = json.dumps({"ok": True, "refreshes": daemon.refreshes}).encode(), "application/json"
+            elif path in self.routes:
+                kind, content_type = self.routes[path]
+                body = daemon.payload(kind)
+                if not body:
+                    self.send_error(503, "dashboard not collected yet")
+                    return
+            else:
+                self.send_error(404)
+                return
+            self.send_response(200)
+            self.send_header("Content-Type", content_type)
+            self.send_header("Content-Length", str(len(body)))
+            self.send_header("Cache-Control", "no-store")
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args) -> None:
+            pass
+
+    return Handler
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Serve a continuously refreshed dashboard")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--interval", type=float, default=INTERVAL, help="Seconds between input checks")
+    parser.add_argument("--snapshot", default=str(SNAPSHOT_PATH), help="Snapshot file to keep current ('' to skip)")
+    args = parser.parse_args(argv)
+
+    daemon = DashboardDaemon(Path(args.snapshot) if args.snapshot else None, args.interval)
+    daemon.refresh()
+    server = ThreadingHTTPServer((args.host, args.port), make_handler(daemon))
+    worker = threading.Thread(target=daemon.run, name="dashboard-refresh", daemon=True)
+    worker.start()
+    print(f"Serving dashboard on http://{args.host}:{server.server_address[1]}/ (refreshing every {args.interval}s)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        daemon.stop()
+        server.server_close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+"""
+Dashboard History
+=================
+
+Every dashboard snapshot appended to a local DuckDB time series, so drift
+in test results, test time, blackboard activity and collector cost shows
+up over weeks instead of being overwritten by the next run.
+
+Tables (history/dashboard.duckdb next to this file):
+    snapshots(run_id, ts, commit, branch)
+    metrics(run_id, metric, value)      -- long format, one row per number
+
+Metric names are dotted: tests.pass_rate, tests.duration_ms,
+test.<file > name>.duration_ms (the slowest tests), blackboard.total_signals,
+blackboard.phase.H, implementation.lines.<path>, progress.completed,
+collector.<name>.seconds, ... A collector whose section reports a "cache"
+mode (tests: hit, partial or full) has its time recorded as
+collector.<name>.<mode>.seconds instead, since a cache hit and a full
+vitest run differ by orders of magnitude; regressions then only compare
+runs made in the same mode.
+
+Regressions compare each metric's last value on a commit with its value on
+the previous commit, using the thresholds in RULES (a pass-rate drop, a
+jump in total or per-test time, a slower collector).
+
+Snapshot timestamps are naive UTC (generated_at), so the day windows are
+taken from `now() AT TIME ZONE 'UTC'`, not the local clock.
+
+generate_dashboard.py records every run; the daemon records when HEAD
+moves and otherwise every RECORD_INTERVAL seconds (see dashboard_daemon.py).
+append() reports a regression once, on the first run recorded at the HEAD
+that introduced it.
+
+Usage:
+    python dashboard/dashboard_history.py record dashboard/snapshot.json
+    python dashboard/dashboard_history.py trend tests.pass_rate --days 30
+    python dashboard/dashboard_history.py regressions
+    python dashboard/dashboard_history.py export history/parquet
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+
+import duckdb
+
+HISTORY_PATH = Path(__file__).resolve().parent / "history" / "dashboard.duckdb"
+
+SCHEMA = """
+CREATE SEQUENCE IF NOT EXISTS run_ids;
+CREATE TABLE IF NOT EXISTS snapshots (
+    run_id BIGINT PRIMARY KEY DEFAULT nextval('run_ids'),
+    ts TIMESTAMP NOT NULL,
+    "commit" VARCHAR,
+    branch VARCHAR
+);
+CREATE TABLE IF NOT EXISTS metrics (
+    run_id BIGINT NOT NULL,
+    metric VARCHAR NOT NULL,
+    value DOUBLE
+);
+"""
+
+# (metric LIKE pattern, direction, minimum absolute change, minimum ratio for rises)
+RULES = [
+    ("tests.pass_rate", "drop", 1.0, 1.0),
+    ("tests.failed", "rise", 1.0, 1.0),
+    ("tests.duration_ms", "rise", 500.0, 1.2),
+    ("test.%.duration_ms", "rise", 100.0, 1.5),
+    ("collector.%.seconds", "rise", 1.0, 1.5),
+]
+
+_RULES_SQL = ", ".join(f"('{p}', '{d}', {c}, {r})" for p, d, c, r in RULES)
+
+REGRESSIONS_SQL = f"""
+WITH per_commit AS (
+    SELECT s."commit", max(s.ts) AS ts, m.metric, arg_max(m.value, s.ts) AS value
+    FROM metrics m JOIN snapshots s USING (run_id)
+    WHERE s."commit" <> '' AND s.ts >= (now() AT TIME ZONE 'UTC') - to_days($days)
+    GROUP BY ALL
+), steps AS (
+    SELECT *, lag(value) OVER w AS previous, lag("commit") OVER w AS previous_commit
+    FROM per_commit
+    WINDOW w AS (PARTITION BY metric ORDER BY ts)
+), rules(pattern, direction, min_change, min_ratio) AS (VALUES {_RULES_SQL})
+SELECT steps.metric, previous_commit, "commit", previous, value, ts, direction
+FROM steps JOIN rules ON steps.metric LIKE rules.pattern
+WHERE previous IS NOT NULL AND (
+    (direction = 'drop' AND previous - value >= min_change)
+    OR (direction = 'rise' AND value - previous >= min_change AND value >= previous * min_ratio)
+)
+ORDER BY ts, steps.metric
+"""
+
+
+def _number(value) -> Optional[float]:
+    if isinstance(value, bool):
+        return float(value)
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        try:
+            return float(value.rstrip("%"))
+        except ValueError:
+            return None
+    return None
+
+
+def flatten(dashboard: dict) -> Dict[str, float]:
+    """Dotted metric name -> number for everything worth tracking in a dashboard document."""
+    metrics: Dict[str, Optional[float]] = {}
+    tests = dashboard.get("tests") or {}
+    for key in ("tests_passed", "tests_failed", "tests_skipped", "tests_total", "test_files", "duration_ms", "rerun_files"):
+        metrics[f"tests.{key[len('tests_'):] if key.startswith('tests_') else key}"] = _number(tests.get(key))
+    if tests.get("tests_total"):
+        metrics["tests.pass_rate"] = 100.0 * tests["tests_passed"] / tests["tests_total"]
+    for test in tests.get("slowest_tests") or []:
+        metrics[f"test.{test['test']}.duration_ms"] = _number(test["duration_ms"])
+    metrics["tests.flaky"] = float(len(tests.get("flaky_tests") or []))
+
+    bb = dashboard.get("blackboard") or {}
+    metrics["blackboard.total_signals"] = _number(bb.get("total_signals"))
+    metrics["blackboard.signals_per_minute"] = _number(bb.get("signals_per_minute"))
+    for phase, count in (bb.get("by_phase") or {}).items():
+        metrics[f"blackboard.phase.{phase}"] = _number(count)
+
+    total_lines = 0
+    for path, info in (dashboard.get("implementation") or {}).items():
+        metrics[f"implementation.lines.{path}"] = _number(info.get("lines"))
+        total_lines += info.get("lines") or 0
+    metrics["implementation.lines_total"] = float(total_lines)
+    metrics["specs.count"] = float(len(dashboard.get("specs") or {}))
+
+    progress = dashboard.get("progress") or {}
+    for key in ("completed", "total", "percentage"):
+        metrics[f"progress.{key}"] = _number(progress.get(key))
+
+    for name, timing in (dashboard.get("collectors") or {}).items():
+        section = dashboard.get(name)
+        mode = section.get("cache") if isinstance(section, dict) else None
+        timed = f"{name}.{mode}" if isinstance(mode, str) and mode else name
+        metrics[f"collector.{timed}.seconds"] = _number(timing.get("seconds"))
+        metrics[f"collector.{name}.ok"] = 1.0 if timing.get("status") == "ok" else 0.0
+    metrics["collect_seconds"] = _number(dashboard.get("collect_seconds"))
+    return {k: v for k, v in metrics.items() if v is not None}
+
+
+def connect(path: Union[str, Path] = HISTORY_PATH, read_only: bool = False) -> duckdb.DuckDBPyConnection:
+    path = Path(path)
+    if not read_only:
+        path.parent.mkdir(parents=True, exist_ok=True)
+    con = duckdb.connect(str(path), read_only=read_only)
+    if not read_only:
+        con.execute(SCHEMA)
+    return con
+
+
+def record(con: duckdb.DuckDBPyConnection, dashboard: dict) -> int:
+    """Append one dashboard document; returns its run id."""
+    git = dashboard.get("git") or {}
+    ts = dashboard.get("generated_at", "").rstrip("Z") or None
+    con.execute("BEGIN")
+    try:
+        run_id = con.execute(
+            """INSERT INTO snapshots (ts, "commit", branch)
+            VALUES (coalesce(?::TIMESTAMP, now() AT TIME ZONE 'UTC'), ?, ?) RETURNING run_id""",
+            [ts, git.get("latest_commit_hash") or "", git.get("branch") or ""],
+        ).fetchone()[0]
+        con.executemany("INSERT INTO metrics VALUES (?, ?, ?)", [(run_id, k, v) for k, v in flatten(dashboard).items()])
+        con.execute("COMMIT")
+    except Exception:
+        con.execute("ROLLBACK")
+        raise
+    return run_id
+
+
+def trend(con: duckdb.DuckDBPyConnection, metric: str, days: int = 30) -> List[tuple]:
+    """(day, runs, min, avg, max, last) per day for metrics matching `metric` (LIKE pattern)."""
+    return con.execute(
+        """
+        SELECT m.metric, s.ts::DATE AS day, count(*), min(value), avg(value), max(value), arg_max(value, s.ts)
+        FROM metrics m JOIN snapshots s USING (run_id)
+        WHERE m.metric LIKE ? AND s.ts >= (now() AT TIME ZONE 'UTC') - to_days(?)
+        GROUP BY ALL ORDER BY m.metric, day
+        """,
+        [metric, days],
+    ).fetchall()
+
+
+def regressions(con: duckdb.DuckDBPyConnection, days: int = 30, latest_only: bool = False) -> List[dict]:
+    """Metric changes between consecutive commits that break a RULES threshold."""
+    rows = con.execute(REGRESSIONS_SQL, {"days": days}).fetchall()
+    found = [
+        {
+            "metric": metric,
+            "from_commit": previous_commit,
+            "to_commit": commit,
+            "before": previous,
+            "after": value,
+            "at": str(ts),
+            "kind": direction,
+        }
+        for metric, previous_commit, commit, previous, value, ts, direction in rows
+    ]
+    if latest_only and found:
+        head = con.execute('SELECT "commit" FROM snapshots ORDER BY ts DESC LIMIT 1').fetchone()[0]
+        found = [r for r in found if r["to_commit"] == head]
+    return found
+
+
+def export(con: duckdb.DuckDBPyConnection, directory: Union[str, Path]) -> None:
+    """Write both tables as Parquet files for sharing or ad-hoc analysis."""
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    for table in ("snapshots", "metrics"):
+        con.execute(f"COPY {table} TO '{(directory / table).as_posix()}.parquet' (FORMAT PARQUET, COMPRESSION ZSTD)")
+
+
+def append(dashboard: dict, path: Union[str, Path] = HISTORY_PATH) -> Optional[List[dict]]:
+    """
+    Record a dashboard and return the regressions it introduced; [] when
+    HEAD has not moved since the last record (they were reported then),
+    None if the store is busy.
+    """
+    try:
+        con = connect(path)
+    except duckdb.IOException:  # another process holds the write lock
+        return None
+    try:
+        last = con.execute('SELECT "commit" FROM snapshots ORDER BY ts DESC LIMIT 1').fetchone()
+        record(con, dashboard)
+        if last is not None and last[0] == ((dashboard.get("git") or {}).get("latest_commit_hash") or ""):
+            return []
+        return regressions(con, latest_only=True)
+    finally:
+        con.close()
+
+
+def format_regression(r: dict) -> str:
+    verb = "dropped" if r["kind"] == "drop" else "rose"
+    return f"{r['metric']} {verb} {r['before']:g} -> {r['after']:g} ({r['from_commit']} -> {r['to_commit']})"
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Dashboard time series")
+    parser.add_argument("--db", default=str(HISTORY_PATH), help="History database")
+    sub = parser.add_subparsers(dest="command", required=True)
+    rec = sub.add_parser("record", help="Append a dashboard JSON document")
+    rec.add_argument("snapshot", help="generate_dashboard.py --json output or snapshot.json")
+    tr = sub.add_parser("trend", help="Daily values of a metric (LIKE pattern)")
+    tr.add_argument("metric")
+    tr.add_argument("--days", type=int, default=30)
+    reg = sub.add_parser("regressions", help="Threshold-breaking changes between commits")
+    reg.add_argument("--days", type=int, default=30)
+    exp = sub.add_parser("export", help="Write the tables to Parquet")
+    exp.add_argument("directory")
+    args = parser.parse_args(argv)
+
+    con = connect(args.db)
+    try:
+        if args.command == "record":
+            with open(args.snapshot, encoding="utf-8") as fp:
+                print(f"Recorded run {record(con, json.load(fp))}")
+        elif args.command == "trend":
+            for metric, day, runs, low, avg, high, last in trend(con, args.metric, args.days):
+                print(f"{metric}\t{day}\truns={runs}\tmin={low:g}\tavg={avg:g}\tmax={high:g}\tlast={last:g}")
+        elif args.command == "regressions":
+            found = regressions(con, args.days)
+            for r in found:
+                print(f"{r['at']}  {format_regression(r)}")
+            print(f"{len(found)} regression(s) in the last {args.days} days")
+            return 1 if found else 0
+        else:
+            export(con, args.directory)
+            print(f"Exported to {args.directory}")
+    finally:
+        con.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,143 @@
+"""
+Dashboard File Scanner
+======================
+
+One walk per root per dashboard run, shared by every collector that looks
+at spec or source files, with line counts cached against file stats.
+
+- scan(root) walks the tree once with os.scandir and returns a manifest,
+  {relative posix path: (size, mtime_ns)}; later calls in the same run get
+  the same manifest (reset() starts a new run).
+- line_counts(root, paths) answers from `.cache/lines.json` when a file's
+  size and mtime_ns are unchanged, and otherwise counts newline bytes:
+  one read for small files, an mmap scanned in CHUNK_SIZE slices above
+  MMAP_THRESHOLD, so nothing is decoded or split into lines.
+
+Counts match len(file.readlines()): a last line without a trailing newline
+still counts.
+
+Usage:
+    files = FileScanner(CACHE_DIR / "lines.json")
+    manifest = files.scan(SANDBOX_ROOT / "specs")
+    lines = files.line_counts(SANDBOX_ROOT / "specs", [p for p in manifest if p.endswith(".md")])
+"""
+
+import json
+import mmap
+import os
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, Tuple
+
+CACHE_VERSION = 1
+MMAP_THRESHOLD = 1 << 20
+CHUNK_SIZE = 1 << 20
+IGNORE_DIRS = {".git", "node_modules", ".cache", "__pycache__"}
+
+Manifest = Dict[str, Tuple[int, int]]  # relative path -> (size, mtime_ns)
+
+
+def _walk(directory: str, prefix: str, manifest: Manifest) -> None:
+    try:
+        entries = os.scandir(directory)
+    except (FileNotFoundError, NotADirectoryError, PermissionError):
+        return
+    with entries:
+        for entry in entries:
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    if entry.name not in IGNORE_DIRS:
+                        _walk(entry.path, f"{prefix}{entry.name}/", manifest)
+                elif entry.is_file():
+                    st = entry.stat()
+                    manifest[prefix + entry.name] = (st.st_size, st.st_mtime_ns)
+            except FileNotFoundError:
+                continue
+
+
+def count_lines(path: Path, size: int) -> int:
+    """Number of lines as readlines() would count them, without decoding."""
+    if size == 0:
+        return 0
+    with open(path, "rb") as fp:
+        if size < MMAP_THRESHOLD:
+            data = fp.read()
+            return data.count(b"\n") + (not data.endswith(b"\n"))
+        try:
+            with mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                newlines = sum(mm[i:i + CHUNK_SIZE].count(b"\n") for i in range(0, len(mm), CHUNK_SIZE))
+                return newlines + (mm[-1:] != b"\n")
+        except (OSError, ValueError):  # file shrank or cannot be mapped
+            fp.seek(0)
+            newlines, last = 0, b"\n"
+            for chunk in iter(lambda: fp.read(CHUNK_SIZE), b""):
+                newlines += chunk.count(b"\n")
+                last = chunk[-1:]
+            return newlines + (last != b"\n")
+
+
+class FileScanner:
+    """Per-run manifests and stat-keyed line counts."""
+
+    def __init__(self, cache_path: Path):
+        self.cache_path = Path(cache_path)
+        self._manifests: Dict[str, Manifest] = {}
+        self._lock = threading.Lock()
+        self._lines = None
+
+    def reset(self) -> None:
+        """Forget this run's manifests; the next scan() walks again."""
+        with self._lock:
+            self._manifests = {}
+
+    def scan(self, root: Path) -> Manifest:
+        key = os.fspath(root)
+        with self._lock:
+            if key not in self._manifests:
+                manifest: Manifest = {}
+                _walk(key, "", manifest)
+                self._manifests[key] = manifest
+            return self._manifests[key]
+
+    def _load(self) -> dict:
+        try:
+            cache = json.loads(self.cache_path.read_text(encoding="utf-8"))
+            if cache.get("version") == CACHE_VERSION:
+                return cache["files"]
+        except (OSError, ValueError):
+            pass
+        return {}
+
+    def _save(self) -> None:
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.cache_path.with_name(f".{self.cache_path.name}.tmp")
+        tmp.write_text(json.dumps({"version": CACHE_VERSION, "files": self._lines}), encoding="utf-8")
+        os.replace(tmp, self.cache_path)
+
+    def line_counts(self, root: Path, paths: Iterable[str]) -> Dict[str, int]:
+        """{path: lines} for manifest paths under root, counting only files whose stat changed."""
+        manifest = self.scan(root)
+        prefix = Path(root).resolve().as_posix() + "/"
+        counts = {}
+        with self._lock:
+            if self._lines is None:
+                self._lines = self._load()
+            dirty = False
+            for rel in paths:
+                size, mtime_ns = manifest[rel]
+                key = prefix + rel
+                cached = self._lines.get(key)
+                if cached is None or cached[0] != size or cached[1] != mtime_ns:
+                    try:
+                        cached = [size, mtime_ns, count_lines(Path(root) / rel, size)]
+                    except FileNotFoundError:
+                        continue
+                    self._lines[key] = cached
+                    dirty = True
+                counts[rel] = cached[2]
+            gone = [k for k in self._lines if k.startswith(prefix) and k[len(prefix):] not in manifest]
+            for key in gone:
+                del self._lines[key]
+            if dirty or gone:
+                self._save()
+        return counts
@@ -8,115 +8,137 @@ AI agents should run this to get ground-truth status, not rely on claims.
 Usage:
     python dashboard/generate_dashboard.py
     python dashboard/generate_dashboard.py --json  # Machine-readable output
+    python dashboard/dashboard_daemon.py           # Keep it fresh and serve it on http://127.0.0.1:8787/
+    python dashboard/dashboard_history.py trend tests.pass_rate  # Every run is kept in history/dashboard.duckdb
 """
 
 import subprocess
 import json
 import os
+import sys
+import time
 from datetime import datetime
 from pathlib import Path
 
+from collectors import Collector, run_collectors
+from file_scan import FileScanner
+from git_metrics import GitMetrics
+from vitest_cache import TestRunError, VitestCache
+from vitest_report import read_report, slowest, summarize
+
 WORKSPACE_ROOT = Path(__file__).parent.parent.parent  # hfo_gen87_x3
 SANDBOX_ROOT = Path(__file__).parent.parent  # sandbox
+REPO_ROOT = Path(__file__).resolve().parents[3]
+BLACKBOARD_PATH = Path(os.environ.get("HFO_BLACKBOARD", REPO_ROOT / "hot" / "blackboard.jsonl"))
+CACHE_DIR = Path(__file__).resolve().parent / ".cache"
+TEST_TIMEOUT = 300
+FILES = FileScanner(CACHE_DIR / "lines.json")  # specs/ and src/ are walked once per run, see file_scan.py
 
-def run_cmd(cmd: str, cwd: Path = WORKSPACE_ROOT) -> str:
-    """Run a shell command and return output."""
-    try:
-        result = subprocess.run(
-            cmd, shell=True, capture_output=True, text=True, cwd=cwd
-        )
-        return result.stdout.strip()
-    except Exception as e:
-        return f"ERROR: {e}"
+sys.path.insert(0, str(REPO_ROOT / "hot" / "bronze" / "src"))
+from blackboard.aggregate import BlackboardAggregator, rate_per_minute  # noqa: E402
+from blackboard.segments import load_manifest  # noqa: E402
+
+try:
+    from blackboard import columnar  # needs duckdb
+except ImportError:
+    columnar = None
+
+try:
+    import dashboard_history  # needs duckdb
+except ImportError:
+    dashboard_history = None
 
 def get_git_metrics() -> dict:
-    """Get verifiable git metrics."""
-    return {
-        "total_commits": run_cmd("git rev-list --count HEAD"),
-        "commits_since_main": run_cmd("git rev-list --count main..HEAD"),
-        "latest_commit_hash": run_cmd("git rev-parse --short HEAD"),
-        "latest_commit_message": run_cmd("git log -1 --format=%s"),
-        "branch": run_cmd("git branch --show-current"),
-        "uncommitted_changes": len(run_cmd("git status --porcelain").split('\n')) if run_cmd("git status --porcelain") else 0,
-    }
+    """Get verifiable git metrics (refs read from .git; git runs when HEAD or the index moved, and for status at most every STATUS_TTL seconds)."""
+    return GitMetrics(REPO_ROOT, CACHE_DIR / "git.json").collect()
 
 def get_test_metrics() -> dict:
-    """Get verifiable test metrics by actually running tests."""
-    output = run_cmd("npm test 2>&1")
-    
-    # Parse vitest output
-    passed = 0
-    failed = 0
-    total = 0
-    
-    for line in output.split('\n'):
-        if 'Tests' in line and 'passed' in line:
-            parts = line.strip().split()
-            for i, part in enumerate(parts):
-                if part == 'passed':
-                    passed = int(parts[i-1])
-                elif part == 'failed':
-                    failed = int(parts[i-1])
+    """Get verifiable test metrics, re-running only the test files affected by changes since the last run."""
+    try:
+        return VitestCache(REPO_ROOT, CACHE_DIR / "tests.json").collect(TEST_TIMEOUT)
+    except (TestRunError, subprocess.CalledProcessError) as e:
+        error = str(e)  # vitest not installed here, or not a git checkout
     
+    # Fall back to the last report CI wrote (vitest.config.ts: outputFile.json)
+    report = REPO_ROOT / "test-results" / "results.json"
+    if not report.exists():
+        return {"tests_passed": 0, "tests_failed": 0, "tests_total": 0, "test_success_rate": "N/A", "error": error}
+    results = summarize(read_report(report, REPO_ROOT))
+    passed = sum(r["passed"] for r in results.values())
+    failed = sum(r["failed"] for r in results.values())
     total = passed + failed
     
     return {
         "tests_passed": passed,
         "tests_failed": failed,
+        "tests_skipped": sum(r["skipped"] for r in results.values()),
         "tests_total": total,
         "test_success_rate": f"{(passed/total*100):.1f}%" if total > 0 else "N/A",
-        "raw_output_lines": len(output.split('\n')),
+        "test_files": len(results),
+        "duration_ms": sum(r["duration_ms"] for r in results.values()),
+        "slowest_tests": slowest(results),
+        "results_from": datetime.utcfromtimestamp(report.stat().st_mtime).isoformat() + "Z",
+        "error": error,
     }
 
 def get_spec_files() -> dict:
     """Get list of specification documents with line counts."""
     specs_dir = SANDBOX_ROOT / "specs"
+    names = [p for p in FILES.scan(specs_dir) if p.endswith(".md") and "/" not in p]
     specs = {}
     
-    if specs_dir.exists():
-        for f in specs_dir.glob("*.md"):
-            with open(f, 'r', encoding='utf-8') as file:
-                lines = len(file.readlines())
-            specs[f.name] = {
-                "exists": True,
-                "lines": lines,
-                "path": str(f.relative_to(WORKSPACE_ROOT)),
-            }
+    for name, lines in FILES.line_counts(specs_dir, names).items():
+        specs[name] = {
+            "exists": True,
+            "lines": lines,
+            "path": str((specs_dir / name).relative_to(WORKSPACE_ROOT)),
+        }
     
     return specs
 
 def get_blackboard_metrics() -> dict:
-    """Get metrics from the blackboard JSONL file."""
-    bb_path = SANDBOX_ROOT / "obsidianblackboard.jsonl"
-    
-    if not bb_path.exists():
+    """Get metrics from the blackboard, parsing only signals appended since the last run."""
+    if not BLACKBOARD_PATH.exists() and not load_manifest(BLACKBOARD_PATH)["segments"]:
         return {"exists": False, "total_signals": 0}
     
+    stats = BlackboardAggregator(BLACKBOARD_PATH).refresh()
     signals_by_phase = {"H": 0, "I": 0, "V": 0, "E": 0, "X": 0}
-    total = 0
-    latest_ts = None
-    
-    with open(bb_path, 'r', encoding='utf-8') as f:
-        for line in f:
-            line = line.strip()
-            if not line:
-                continue
-            try:
-                signal = json.loads(line)
-                total += 1
-                phase = signal.get("hive", "X")
-                signals_by_phase[phase] = signals_by_phase.get(phase, 0) + 1
-                latest_ts = signal.get("ts", latest_ts)
-            except json.JSONDecodeError:
-                pass
+    signals_by_phase.update(stats["by_phase"])
     
     return {
         "exists": True,
-        "total_signals": total,
+        "total_signals": stats["total"],
         "by_phase": signals_by_phase,
-        "latest_timestamp": latest_ts,
+        "by_port": dict(sorted(stats["by_port"].items())),
+        "by_type": stats["by_type"],
+        "by_gen": stats["by_gen"],
+        "earliest_timestamp": stats["min_ts"],
+        "latest_timestamp": stats["max_ts"],
+        "signals_per_minute": round(rate_per_minute(stats), 2),
+        "segments": stats["segments"],
     }
 
+def get_blackboard_history(days: int = 7) -> dict:
+    """Daily signal counts by HIVE phase from the columnar mirror (only if one was created)."""
+    if columnar is None or not columnar.mirror_dir(BLACKBOARD_PATH).exists():
+        return {"available": False}
+    con = columnar.connect(BLACKBOARD_PATH)
+    try:
+        rows = con.execute(
+            """
+            SELECT date::VARCHAR, hive, count(*) FROM blackboard
+            WHERE date IN (SELECT DISTINCT date FROM blackboard WHERE date IS NOT NULL ORDER BY date DESC LIMIT ?)
+            GROUP BY ALL ORDER BY 1
+            """,
+            [days],
+        ).fetchall()
+    finally:
+        con.close()
+    by_day = {}
+    for day, phase, count in rows:
+        by_day.setdefault(day, {"H": 0, "I": 0, "V": 0, "E": 0, "X": 0})[phase] = count
+    return {"available": True, "days": by_day}
+
 def get_implementation_status() -> dict:
     """Check what implementation files actually exist."""
     src_dir = SANDBOX_ROOT / "src"
@@ -131,32 +153,36 @@ def get_implementation_status() -> dict:
         "adapters/excalidraw-adapter.ts": "Excalidraw adapter",
     }
     
+    manifest = FILES.scan(src_dir)
+    lines = FILES.line_counts(src_dir, [p for p in expected_files if p in manifest])
     status = {}
     for path, description in expected_files.items():
-        full_path = src_dir / path
         status[path] = {
             "description": description,
-            "exists": full_path.exists(),
-            "lines": 0,
+            "exists": path in lines,
+            "lines": lines.get(path, 0),
         }
-        if full_path.exists():
-            with open(full_path, 'r', encoding='utf-8') as f:
-                status[path]["lines"] = len(f.readlines())
     
     return status
 
 def calculate_real_progress() -> dict:
     """Calculate actual progress percentage based on verifiable evidence."""
     
+    specs = FILES.scan(SANDBOX_ROOT / "specs")
+    src = FILES.scan(SANDBOX_ROOT / "src")
+    
+    def has_ts(directory: str) -> bool:
+        return any(p.startswith(directory + "/") and p.endswith(".ts") and "/" not in p[len(directory) + 1:] for p in src)
+    
     # Define what constitutes 100% completion
     milestones = {
         "workspace_setup": True,  # We're running, so it exists
-        "hunt_specs": len(list((SANDBOX_ROOT / "specs").glob("*.md"))) >= 3 if (SANDBOX_ROOT / "specs").exists() else False,
-        "blackboard_active": (SANDBOX_ROOT / "obsidianblackboard.jsonl").exists(),
-        "contracts_defined": (SANDBOX_ROOT / "src" / "contracts").exists() and len(list((SANDBOX_ROOT / "src" / "contracts").glob("*.ts"))) > 0 if (SANDBOX_ROOT / "src" / "contracts").exists() else False,
-        "fsm_implemented": (SANDBOX_ROOT / "src" / "fsm" / "gesture-machine.ts").exists(),
-        "filter_implemented": (SANDBOX_ROOT / "src" / "smoothing" / "one-euro.ts").exists(),
-        "adapters_exist": (SANDBOX_ROOT / "src" / "adapters").exists() and len(list((SANDBOX_ROOT / "src" / "adapters").glob("*.ts"))) > 0 if (SANDBOX_ROOT / "src" / "adapters").exists() else False,
+        "hunt_specs": sum(1 for p in specs if p.endswith(".md") and "/" not in p) >= 3,
+        "blackboard_active": BLACKBOARD_PATH.exists(),
+        "contracts_defined": has_ts("contracts"),
+        "fsm_implemented": "fsm/gesture-machine.ts" in src,
+        "filter_implemented": "smoothing/one-euro.ts" in src,
+        "adapters_exist": has_ts("adapters"),
         "tests_for_gesture": False,  # Would need to check test files
     }
     
@@ -170,24 +196,55 @@ def calculate_real_progress() -> dict:
         "percentage": f"{(completed/total*100):.0f}%",
     }
 
-def generate_dashboard(as_json: bool = False) -> str:
-    """Generate the complete dashboard."""
-    
-    dashboard = {
+# Run concurrently; a section that times out or fails is reused from the last run (stale) or left empty.
+COLLECTORS = [
+    Collector("git", get_git_metrics, timeout=30, default={}),
+    Collector("tests", get_test_metrics, timeout=TEST_TIMEOUT + 5, default={}),
+    Collector("specs", get_spec_files, timeout=30, default={}),
+    Collector("blackboard", get_blackboard_metrics, timeout=60, default={"exists": False, "total_signals": 0}),
+    Collector("blackboard_history", get_blackboard_history, timeout=60, default={"available": False}),
+    Collector("implementation", get_implementation_status, timeout=30, default={}),
+    Collector("progress", calculate_real_progress, timeout=30, default={}),
+]
+
+def section_note(name: str, timing: dict) -> str:
+    """Markdown warning for a section that is not fresh, or '' when it is."""
+    if timing["status"] == "ok":
+        return ""
+    if timing["status"] == "running":
+        return f"\n> ⏳ RUNNING: {name} collector has not reported yet"
+    if timing["status"] == "stale":
+        return f"\n> ⚠️ STALE: {name} {timing['reason']} this run; showing values from {timing['stale_since']}"
+    detail = f" ({timing['error']})" if "error" in timing else f" after {timing['seconds']}s"
+    return f"\n> ⚠️ PARTIAL: {name} collector {timing['status']}{detail}"
+
+def build_dashboard(sections: dict, timings: dict, collect_seconds: float) -> dict:
+    """Assemble the dashboard document from collector sections."""
+    return {
         "generated_at": datetime.utcnow().isoformat() + "Z",
         "workspace": str(WORKSPACE_ROOT),
-        "git": get_git_metrics(),
-        "tests": get_test_metrics(),
-        "specs": get_spec_files(),
-        "blackboard": get_blackboard_metrics(),
-        "implementation": get_implementation_status(),
-        "progress": calculate_real_progress(),
+        **sections,
+        "collectors": timings,
+        "collect_seconds": round(collect_seconds, 3),
     }
+
+def generate_dashboard(as_json: bool = False) -> str:
+    """Generate the complete dashboard."""
+    
+    started = time.perf_counter()
+    FILES.reset()
+    sections, timings = run_collectors(COLLECTORS, CACHE_DIR / "sections.json")
+    dashboard = build_dashboard(sections, timings, time.perf_counter() - started)
+    if dashboard_history is not None:
+        dashboard["regressions"] = dashboard_history.append(dashboard)
     
     if as_json:
         return json.dumps(dashboard, indent=2)
-    
-    # Generate markdown report
+    return render_markdown(dashboard)
+
+def render_markdown(dashboard: dict) -> str:
+    """Markdown report of a dashboard document."""
+    timings = dashboard['collectors']
     md = []
     md.append("# 📊 Gen87.X3 REAL PROGRESS DASHBOARD")
     md.append(f"\n> Generated: {dashboard['generated_at']}")
@@ -196,31 +253,46 @@ def generate_dashboard(as_json: bool = False) -> str:
     
     # Progress summary
     progress = dashboard['progress']
-    md.append("## 🎯 OVERALL PROGRESS")
-    md.append(f"\n**{progress['percentage']}** complete ({progress['completed']}/{progress['total']} milestones)")
-    md.append("")
-    md.append("| Milestone | Status |")
-    md.append("|-----------|--------|")
-    for name, done in progress['milestones'].items():
-        status = "✅" if done else "❌"
-        md.append(f"| {name.replace('_', ' ').title()} | {status} |")
+    md.append("## 🎯 OVERALL PROGRESS" + section_note("progress", timings["progress"]))
+    if progress:
+        md.append(f"\n**{progress['percentage']}** complete ({progress['completed']}/{progress['total']} milestones)")
+        md.append("")
+        md.append("| Milestone | Status |")
+        md.append("|-----------|--------|")
+        for name, done in progress['milestones'].items():
+            status = "✅" if done else "❌"
+            md.append(f"| {name.replace('_', ' ').title()} | {status} |")
     
     # Git metrics
     git = dashboard['git']
-    md.append("\n## 📝 Git Metrics (VERIFIABLE)")
-    md.append(f"\n- **Branch**: `{git['branch']}`")
-    md.append(f"- **Commits**: {git['total_commits']} total, {git['commits_since_main']} since main")
-    md.append(f"- **Latest**: `{git['latest_commit_hash']}` - {git['latest_commit_message']}")
-    md.append(f"- **Uncommitted changes**: {git['uncommitted_changes']}")
+    md.append("\n## 📝 Git Metrics (VERIFIABLE)" + section_note("git", timings["git"]))
+    if git:
+        md.append(f"\n- **Branch**: `{git['branch']}`")
+        md.append(f"- **Commits**: {git['total_commits']} total, {git['commits_since_main']} since {git.get('main_branch') or 'main'}")
+        md.append(f"- **Latest**: `{git['latest_commit_hash']}` - {git['latest_commit_message']}")
+        md.append(f"- **Uncommitted changes**: {git['uncommitted_changes']}")
     
     # Test metrics
     tests = dashboard['tests']
-    md.append("\n## 🧪 Test Metrics (VERIFIABLE)")
-    md.append(f"\n- **Passed**: {tests['tests_passed']}/{tests['tests_total']}")
-    md.append(f"- **Success rate**: {tests['test_success_rate']}")
+    md.append("\n## 🧪 Test Metrics (VERIFIABLE)" + section_note("tests", timings["tests"]))
+    if tests:
+        md.append(f"\n- **Passed**: {tests['tests_passed']}/{tests['tests_total']}")
+        md.append(f"- **Success rate**: {tests['test_success_rate']}")
+        if 'cache' in tests:
+            md.append(f"- **Results**: {tests['cache']} cache, {tests['rerun_files']}/{tests['test_files']} files re-run (as of {tests['results_from']})")
+        elif 'error' in tests:
+            md.append(f"- **Not run**: {tests['error']}" + (f" (showing CI report from {tests['results_from']})" if 'results_from' in tests else ""))
+        if tests.get('slowest_tests'):
+            md.append("- **Slowest tests**:")
+            for test in tests['slowest_tests'][:5]:
+                md.append(f"  - {test['duration_ms']:.0f}ms `{test['test']}`")
+        if tests.get('flaky_tests'):
+            md.append(f"- **Flaky tests** ({len(tests['flaky_tests'])}):")
+            for test in tests['flaky_tests']:
+                md.append(f"  - `{test['test']}` — {test['flips']} flips in `{test['outcomes']}`")
     
     # Spec files
-    md.append("\n## 📋 Spec Documents (VERIFIABLE)")
+    md.append("\n## 📋 Spec Documents (VERIFIABLE)" + section_note("specs", timings["specs"]))
     md.append("\n| File | Lines | Status |")
     md.append("|------|-------|--------|")
     for name, info in dashboard['specs'].items():
@@ -229,16 +301,26 @@ def generate_dashboard(as_json: bool = False) -> str:
     # Blackboard
     bb = dashboard['blackboard']
     if bb['exists']:
-        md.append("\n## 📡 Blackboard Signals (VERIFIABLE)")
+        md.append("\n## 📡 Blackboard Signals (VERIFIABLE)" + section_note("blackboard", timings["blackboard"]))
         md.append(f"\n- **Total signals**: {bb['total_signals']}")
         md.append("- **By HIVE phase**:")
         for phase, count in bb['by_phase'].items():
             if count > 0:
                 md.append(f"  - {phase}: {count}")
+        md.append("- **By port**: " + ", ".join(f"P{port}: {count}" for port, count in bb['by_port'].items()))
         md.append(f"- **Latest**: {bb['latest_timestamp']}")
+        md.append(f"- **Rate (last hour of activity)**: {bb['signals_per_minute']}/min")
+    
+    history = dashboard['blackboard_history']
+    if history['available'] and history['days']:
+        md.append(f"- **Daily by phase** (last {len(history['days'])} active days):")
+        md.append("\n| Day | H | I | V | E | X |")
+        md.append("|-----|---|---|---|---|---|")
+        for day, phases in history['days'].items():
+            md.append(f"| {day} | " + " | ".join(str(phases.get(p, 0)) for p in "HIVEX") + " |")
     
     # Implementation status
-    md.append("\n## 🔧 Implementation Status (VERIFIABLE)")
+    md.append("\n## 🔧 Implementation Status (VERIFIABLE)" + section_note("implementation", timings["implementation"]))
     md.append("\n| Component | Status | Lines |")
     md.append("|-----------|--------|-------|")
     for path, info in dashboard['implementation'].items():
@@ -246,6 +328,20 @@ def generate_dashboard(as_json: bool = False) -> str:
         lines = info['lines'] if info['exists'] else "-"
         md.append(f"| {info['description']} | {status} | {lines} |")
     
+    regressions = dashboard.get('regressions')
+    if regressions:
+        md.append("\n## 📉 Regressions (vs previous commit)")
+        md.append("")
+        for r in regressions:
+            md.append(f"- {dashboard_history.format_regression(r)}")
+    
+    md.append("\n## ⏱️ Collectors")
+    md.append("\n| Collector | Status | Seconds |")
+    md.append("|-----------|--------|---------|")
+    for name, timing in timings.items():
+        md.append(f"| {name} | {timing['status']} | {timing['seconds']} |")
+    md.append(f"\n*Collected in {dashboard['collect_seconds']}s*")
+    
     md.append("\n---")
     md.append("\n*Run `python dashboard/generate_dashboard.py --json` for machine-readable output*")
     
@@ -0,0 +1,187 @@
+"""
+Dashboard Git Metrics
+=====================
+
+Git facts for the dashboard with as few git processes as possible; fork
+and exec dominate on large repositories and on Windows.
+
+- HEAD, the branch name and the main branch's commit are read straight
+  from `.git` (HEAD, loose refs, packed-refs), without running git.
+- History facts (total commits, commits since main, recent log) depend
+  only on HEAD and main, so they are cached under those two ids and cost
+  two git calls when either moves.
+- Working-tree status (`git status --porcelain=v2 --branch`, one call) is
+  cached under HEAD and the index mtime, and re-checked after STATUS_TTL
+  seconds because editing a file does not touch the index.
+
+Usage:
+    metrics = GitMetrics(REPO_ROOT, CACHE_DIR / "git.json").collect()
+"""
+
+import json
+import os
+import subprocess
+import time
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+CACHE_VERSION = 1
+RECENT_COMMITS = 5
+STATUS_TTL = 10.0
+MAIN_BRANCHES = ("main", "master")
+
+
+def _git(root: Path, *args: str) -> str:
+    result = subprocess.run(["git", *args], cwd=root, capture_output=True, text=True, encoding="utf-8")
+    return result.stdout if result.returncode == 0 else ""
+
+
+def git_dirs(root: Path) -> Tuple[Path, Path]:
+    """(git dir, common dir); they differ in linked worktrees."""
+    git_dir = root / ".git"
+    if git_dir.is_file():  # worktree or submodule: "gitdir: <path>"
+        target = git_dir.read_text(encoding="utf-8").split(":", 1)[1].strip()
+        git_dir = (root / target).resolve()
+    common = git_dir
+    if (git_dir / "commondir").is_file():
+        common = (git_dir / (git_dir / "commondir").read_text(encoding="utf-8").strip()).resolve()
+    return git_dir, common
+
+
+def resolve_ref(common: Path, ref: str) -> Optional[str]:
+    """Commit id of a full ref name from its loose file or packed-refs."""
+    loose = common / ref
+    if loose.is_file():
+        return loose.read_text(encoding="utf-8").strip() or None
+    packed = common / "packed-refs"
+    if packed.is_file():
+        for line in packed.read_text(encoding="utf-8").splitlines():
+            if line and line[0] not in "#^":
+                sha, _, name = line.partition(" ")
+                if name == ref:
+                    return sha
+    return None
+
+
+def read_head(root: Path) -> Tuple[Optional[str], str]:
+    """(HEAD commit id, branch name or '' when detached)."""
+    git_dir, common = git_dirs(root)
+    head = (git_dir / "HEAD").read_text(encoding="utf-8").strip()
+    if head.startswith("ref: "):
+        ref = head[5:]
+        sha = resolve_ref(git_dir, ref) if (git_dir / ref).is_file() else resolve_ref(common, ref)
+        return sha, ref[len("refs/heads/"):] if ref.startswith("refs/heads/") else ref
+    return head, ""
+
+
+def parse_status(output: str) -> Dict[str, object]:
+    """Counts from `git status --porcelain=v2 --branch -z`."""
+    status = {"uncommitted_changes": 0, "untracked": 0, "upstream": None, "ahead": 0, "behind": 0}
+    entries = iter(output.split("\0"))
+    for entry in entries:
+        if not entry:
+            continue
+        if entry.startswith("# branch.upstream "):
+            status["upstream"] = entry.split(" ", 2)[2]
+        elif entry.startswith("# branch.ab "):
+            ahead, behind = entry.split()[2:4]
+            status["ahead"], status["behind"] = int(ahead), -int(behind)
+        elif entry.startswith("#"):
+            continue
+        else:
+            status["uncommitted_changes"] += 1
+            if entry.startswith("?"):
+                status["untracked"] += 1
+            elif entry.startswith("2 "):
+                next(entries, None)  # rename/copy entries carry the original path separately
+    return status
+
+
+class GitMetrics:
+    """Cached git facts for one working tree."""
+
+    def __init__(self, root: Path, cache_path: Path, recent: int = RECENT_COMMITS):
+        self.root = Path(root)
+        self.cache_path = Path(cache_path)
+        self.recent = recent
+
+    def _load(self) -> dict:
+        try:
+            cache = json.loads(self.cache_path.read_text(encoding="utf-8"))
+            if cache.get("version") == CACHE_VERSION:
+                return cache
+        except (OSError, ValueError):
+            pass
+        return {"version": CACHE_VERSION}
+
+    def _save(self, cache: dict) -> None:
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.cache_path.with_name(f".{self.cache_path.name}.tmp")
+        tmp.write_text(json.dumps(cache), encoding="utf-8")
+        os.replace(tmp, self.cache_path)
+
+    def _main(self, common: Path) -> Tuple[Optional[str], Optional[str]]:
+        for name in MAIN_BRANCHES:
+            sha = resolve_ref(common, f"refs/heads/{name}")
+            if sha:
+                return name, sha
+        return None, None
+
+    def _history(self, head: str, main: Optional[str]) -> dict:
+        lines = _git(self.root, "log", "--format=%h %s", head).splitlines()  # one walk: count and recent
+        since_main = 0
+        if main:
+            counts = _git(self.root, "rev-list", "--left-right", "--count", f"{main}...{head}").split()
+            since_main = int(counts[1]) if len(counts) == 2 else 0
+        return {"total_commits": len(lines), "commits_since_main": since_main, "recent_commits": lines[: self.recent]}
+
+    def collect(self) -> dict:
+        """Dashboard git section; `git_processes` says how many git commands this call ran."""
+        start = time.perf_counter()
+        git_dir, common = git_dirs(self.root)
+        head, branch = read_head(self.root)
+        main_name, main = self._main(common)
+        cache = self._load()
+        forks = 0
+
+        key = f"{head}:{main}:{self.recent}"
+        if cache.get("history_key") != key:
+            cache["history"] = self._history(head, main) if head else {"total_commits": 0, "commits_since_main": 0, "recent_commits": []}
+            cache["history_key"] = key
+            forks += 2 if main else 1
+        try:
+            index_mtime = os.stat(git_dir / "index").st_mtime_ns
+        except FileNotFoundError:
+            index_mtime = None
+        status_key = f"{head}:{index_mtime}"
+        if cache.get("status_key") != status_key or time.time() - cache.get("status_at", 0) > STATUS_TTL:
+            cache["status"] = parse_status(_git(self.root, "status", "--porcelain=v2", "--branch", "-z"))
+            # status refreshes the index stat cache, which may rewrite the index
+            try:
+                index_mtime = os.stat(git_dir / "index").st_mtime_ns
+            except FileNotFoundError:
+                index_mtime = None
+            cache["status_key"] = f"{head}:{index_mtime}"
+            cache["status_at"] = time.time()
+            forks += 1
+        if forks:
+            self._save(cache)
+
+        history, status = cache["history"], cache["status"]
+        recent = history["recent_commits"]
+        return {
+            "total_commits": history["total_commits"],
+            "commits_since_main": history["commits_since_main"],
+            "main_branch": main_name,
+            "latest_commit_hash": recent[0].split(" ", 1)[0] if recent else (head or "")[:7],
+            "latest_commit_message": recent[0].split(" ", 1)[1] if recent and " " in recent[0] else "",
+            "branch": branch,
+            "recent_commits": recent,
+            "uncommitted_changes": status["uncommitted_changes"],
+            "untracked_files": status["untracked"],
+            "upstream": status["upstream"],
+            "ahead": status["ahead"],
+            "behind": status["behind"],
+            "git_processes": forks,
+            "collect_seconds": round(time.perf_counter() - start, 4),
+        }
@@ -0,0 +1,194 @@
+"""
+Vitest Result Cache
+===================
+
+Per-test-file vitest results cached against a fingerprint of the working
+tree, so the dashboard only runs the tests whose inputs changed.
+
+- Fingerprint: the git blob id of every tracked or untracked (not ignored)
+  source file — `git ls-files -s` for the index, `git hash-object` for
+  files modified in the working tree — plus a hash of the config files
+  (vitest.config.ts, package.json, package-lock.json).
+- Unchanged fingerprint: the cached totals are returned without running
+  anything (a few git calls, milliseconds).
+- Some source files changed or were added: `vitest related` runs just the
+  test files that import them, and their results replace the cached ones.
+- Config changed, a source file was deleted, too many files changed or
+  there is no cache yet: full `vitest run`.
+
+Results come from vitest's JUnit reporter (`--outputFile`), parsed test by
+test (see vitest_report.py) into one record per test file with every
+test's status and duration; each run is added to the flaky-test history.
+TestRunError means no report was produced (vitest missing or crashed); the
+caller can fall back to scraping the console.
+
+Usage:
+    metrics = VitestCache(REPO_ROOT, CACHE_DIR / "tests.json").collect(timeout=300)
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import subprocess
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional
+from xml.etree.ElementTree import ParseError
+
+from vitest_report import TestHistory, iter_junit, slowest, summarize
+
+CACHE_VERSION = 2
+CONFIG_FILES = ("vitest.config.ts", "package.json", "package-lock.json")
+SOURCE_SUFFIXES = (".ts", ".tsx", ".js", ".jsx", ".mjs", ".cjs", ".json")
+MAX_RELATED = 200  # beyond this many changed files a full run is cheaper
+
+
+class TestRunError(RuntimeError):
+    """vitest did not produce a JSON report."""
+
+
+def _git(root: Path, *args: str, input: Optional[str] = None) -> str:
+    result = subprocess.run(["git", *args], cwd=root, capture_output=True, text=True, input=input, check=True)
+    return result.stdout
+
+
+def _is_source(path: str) -> bool:
+    return path.endswith(SOURCE_SUFFIXES) and "node_modules/" not in path and path not in CONFIG_FILES
+
+
+def tree_fingerprint(root: Path) -> Dict[str, str]:
+    """{path: git blob id} for every source file as it is on disk now."""
+    files = {}
+    for entry in _git(root, "ls-files", "-s", "-z").split("\0"):
+        if entry:
+            meta, path = entry.split("\t", 1)
+            if _is_source(path):
+                files[path] = meta.split()[1]
+    dirty = [
+        p for p in _git(root, "ls-files", "-m", "-o", "--exclude-standard", "-z").split("\0") if p and _is_source(p)
+    ]
+    present = [p for p in dict.fromkeys(dirty) if (root / p).is_file()]
+    for path in set(dirty) - set(present):
+        files.pop(path, None)  # deleted in the working tree
+    if present:
+        blobs = _git(root, "hash-object", "--stdin-paths", input="\n".join(present) + "\n").split()
+        files.update(zip(present, blobs))
+    return files
+
+
+def config_fingerprint(root: Path) -> str:
+    digest = hashlib.sha1()
+    for name in CONFIG_FILES:
+        path = root / name
+        digest.update(name.encode("utf-8") + b"\0")
+        digest.update(path.read_bytes() if path.is_file() else b"<missing>")
+    return digest.hexdigest()
+
+
+class VitestCache:
+    """Cached vitest results for one project root."""
+
+    def __init__(self, root: Path, cache_path: Path, history_path: Optional[Path] = None):
+        self.root = Path(root)
+        self.cache_path = Path(cache_path)
+        self.history = TestHistory(history_path or self.cache_path.with_name("test_history.json"))
+
+    def _load(self) -> Optional[dict]:
+        try:
+            cache = json.loads(self.cache_path.read_text(encoding="utf-8"))
+            if cache.get("version") == CACHE_VERSION:
+                return cache
+        except (OSError, ValueError):
+            pass
+        return None
+
+    def _save(self, cache: dict) -> None:
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.cache_path.with_name(f".{self.cache_path.name}.tmp")
+        tmp.write_text(json.dumps(cache), encoding="utf-8")
+        os.replace(tmp, self.cache_path)
+
+    def _vitest(self, args: List[str], timeout: Optional[float]) -> Dict[str, dict]:
+        vitest = shutil.which("vitest", path=str(self.root / "node_modules" / ".bin"))
+        if vitest is None:
+            raise TestRunError("vitest is not installed (npm install)")
+        fd, output = tempfile.mkstemp(suffix=".xml")
+        os.close(fd)
+        os.unlink(output)
+        try:
+            subprocess.run(
+                [vitest, *args, "--reporter=junit", f"--outputFile={output}"],
+                cwd=self.root, capture_output=True, timeout=timeout,
+            )  # exits non-zero when tests fail; the report is what counts
+            try:
+                cases = list(iter_junit(output, self.root))
+            except (OSError, ParseError) as e:
+                raise TestRunError(f"no vitest JUnit report: {e}") from e
+            self.history.record(cases)
+            self.history.save()
+            return summarize(cases)
+        except subprocess.TimeoutExpired as e:
+            raise TestRunError(f"vitest timed out after {timeout}s") from e
+        finally:
+            if os.path.exists(output):
+                os.unlink(output)
+
+    def collect(self, timeout: Optional[float] = None) -> dict:
+        """Totals for the current tree, running only what the cache cannot answer."""
+        start = time.perf_counter()
+        files = tree_fingerprint(self.root)
+        config = config_fingerprint(self.root)
+        cache = self._load()
+
+        changed = None
+        if cache is not None and cache["config"] == config:
+            old = cache["files"]
+            removed = old.keys() - files.keys()
+            changed = sorted(p for p, blob in files.items() if old.get(p) != blob)
+            if any(p not in cache["results"] for p in removed) or len(changed) > MAX_RELATED:
+                changed = None  # a deleted import breaks tests we cannot find with `related`
+
+        ran = {}
+        if changed is None:
+            results = ran = self._vitest(["run", "--passWithNoTests"], timeout)
+            mode = "full"
+        elif changed:
+            ran = self._vitest(["related", "--run", "--passWithNoTests", *changed], timeout)
+            results = {**cache["results"], **ran}
+            mode = "partial"
+        else:
+            results = cache["results"]
+            mode = "hit"
+        results = {p: r for p, r in results.items() if (self.root / p).exists()}
+
+        if mode != "hit":
+            cache = {
+                "version": CACHE_VERSION,
+                "config": config,
+                "files": files,
+                "results": results,
+                "collected_at": datetime.utcnow().isoformat() + "Z",
+            }
+            self._save(cache)
+
+        passed = sum(r["passed"] for r in results.values())
+        failed = sum(r["failed"] for r in results.values())
+        total = passed + failed
+        return {
+            "tests_passed": passed,
+            "tests_failed": failed,
+            "tests_skipped": sum(r["skipped"] for r in results.values()),
+            "tests_total": total,
+            "test_success_rate": f"{(passed/total*100):.1f}%" if total > 0 else "N/A",
+            "test_files": len(results),
+            "duration_ms": sum(r["duration_ms"] for r in results.values()),
+            "cache": mode,
+            "rerun_files": len(ran),
+            "slowest_tests": slowest(results),
+            "flaky_tests": self.history.flaky()[:10],
+            "results_from": cache["collected_at"],
+            "collect_seconds": round(time.perf_counter() - start, 3),
+        }
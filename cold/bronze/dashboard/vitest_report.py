@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+Vitest Report Ingestion
+=======================
+
+Reads vitest's machine-readable reports instead of scraping console text.
+
+- JUnit XML is parsed with iterparse: every <testcase> is turned into a
+  TestCase and then cleared, so memory and parse time depend on the
+  number of tests, not on how much the tests log.
+- JSON reports (the jest-compatible format vitest writes in CI, see
+  vitest.config.ts) are read test by test from `assertionResults`.
+- TestHistory keeps the last HISTORY_RUNS outcomes and durations of each
+  test in `.cache/test_history.json`: a test that flipped between pass
+  and fail at least FLAKY_FLIPS times in that window is reported as flaky.
+
+Usage:
+    python dashboard/vitest_report.py test-results/results.xml      # record a run, print slowest/flaky
+    python dashboard/vitest_report.py test-results/results.json --no-record
+"""
+
+import argparse
+import json
+import os
+import sys
+from datetime import datetime
+from pathlib import Path
+from typing import BinaryIO, Dict, Iterable, Iterator, List, NamedTuple, Optional, Union
+from xml.etree.ElementTree import iterparse
+
+HISTORY_RUNS = 20
+FLAKY_FLIPS = 2
+OUTCOME_CODES = {"passed": "P", "failed": "F", "skipped": "S"}
+
+
+class TestCase(NamedTuple):
+    file: str
+    name: str
+    status: str  # passed | failed | skipped
+    duration_ms: float
+
+    @property
+    def id(self) -> str:
+        return f"{self.file} > {self.name}"
+
+
+def _relative(file: str, root: Optional[Path]) -> str:
+    path = Path(file)
+    if root is not None and path.is_absolute():
+        try:
+            path = path.resolve().relative_to(root.resolve())
+        except ValueError:
+            pass
+    return path.as_posix()
+
+
+def iter_junit(source: Union[str, Path, BinaryIO], root: Optional[Path] = None) -> Iterator[TestCase]:
+    """
+    TestCases from a JUnit XML file or stream, one element at a time. A
+    suite that reports a failure or error but has no test cases (the file
+    failed to load) yields one failed case, as iter_json() does.
+    """
+    suite, cases = "", 0
+    for event, elem in iterparse(source, events=("start", "end")):
+        if event == "start":
+            if elem.tag == "testsuite":
+                suite, cases = elem.get("name", ""), 0
+            continue
+        if elem.tag == "testcase":
+            cases += 1
+            if elem.find("failure") is not None or elem.find("error") is not None:
+                status = "failed"
+            elif elem.find("skipped") is not None:
+                status = "skipped"
+            else:
+                status = "passed"
+            file = _relative(elem.get("classname") or suite, root)
+            yield TestCase(file, elem.get("name", ""), status, float(elem.get("time") or 0) * 1000)
+            elem.clear()
+        elif elem.tag == "testsuite":
+            if not cases and _suite_failed(elem):
+                yield TestCase(_relative(suite, root), "(file failed to load)", "failed", 0.0)
+            elem.clear()
+
+
+def _suite_failed(suite) -> bool:
+    for attr in ("errors", "failures"):
+        try:
+            if int(suite.get(attr) or 0) > 0:
+                return True
+        except ValueError:
+            pass
+    return suite.find("error") is not None or suite.find("failure") is not None
+
+
+def iter_json(report: dict, root: Optional[Path] = None) -> Iterator[TestCase]:
+    """TestCases from a vitest/jest JSON report."""
+    for suite in report.get("testResults", []):
+        file = _relative(suite["name"], root)
+        tests = suite.get("assertionResults", [])
+        for test in tests:
+            status = test.get("status")
+            status = status if status in ("passed", "failed") else "skipped"
+            yield TestCase(file, test.get("fullName") or test.get("title", ""), status, float(test.get("duration") or 0))
+        if suite.get("status") == "failed" and not tests:
+            yield TestCase(file, "(file failed to load)", "failed", 0.0)
+
+
+def read_report(path: Union[str, Path], root: Optional[Path] = None) -> Iterator[TestCase]:
+    """TestCases from a .xml (JUnit) or .json report file."""
+    path = Path(path)
+    if path.suffix == ".json":
+        with open(path, encoding="utf-8") as fp:
+            return iter_json(json.load(fp), root)
+    return iter_junit(str(path), root)
+
+
+def summarize(cases: Iterable[TestCase]) -> Dict[str, dict]:
+    """Per test file: counts, total duration and [name, status, ms] per test."""
+    files: Dict[str, dict] = {}
+    for case in cases:
+        entry = files.setdefault(case.file, {"passed": 0, "failed": 0, "skipped": 0, "duration_ms": 0, "tests": []})
+        entry[case.status] += 1
+        entry["duration_ms"] += case.duration_ms
+        entry["tests"].append([case.name, case.status, round(case.duration_ms, 3)])
+    for entry in files.values():
+        entry["duration_ms"] = int(round(entry["duration_ms"]))
+    return files
+
+
+def slowest(results: Dict[str, dict], count: int = 10) -> List[dict]:
+    """The slowest tests across per-file results."""
+    tests = [
+        {"test": f"{file} > {name}", "status": status, "duration_ms": ms}
+        for file, entry in results.items()
+        for name, status, ms in entry.get("tests", [])
+    ]
+    tests.sort(key=lambda t: t["duration_ms"], reverse=True)
+    return tests[:count]
+
+
+class TestHistory:
+    """Recent outcomes and durations per test."""
+
+    def __init__(self, path: Path, runs: int = HISTORY_RUNS):
+        self.path = Path(path)
+        self.runs = runs
+        try:
+            self.tests = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            self.tests = {}
+
+    def record(self, cases: Iterable[TestCase]) -> int:
+        now = datetime.utcnow().isoformat() + "Z"
+        count = 0
+        for case in cases:
+            entry = self.tests.setdefault(case.id, {"outcomes": "", "durations": [], "last_run": None})
+            entry["outcomes"] = (entry["outcomes"] + OUTCOME_CODES[case.status])[-self.runs:]
+            entry["durations"] = (entry["durations"] + [round(case.duration_ms, 3)])[-self.runs:]
+            entry["last_run"] = now
+            count += 1
+        return count
+
+    def save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = self.path.with_name(f".{self.path.name}.tmp")
+        tmp.write_text(json.dumps(self.tests), encoding="utf-8")
+        os.replace(tmp, self.path)
+
+    def flaky(self, min_flips: int = FLAKY_FLIPS) -> List[dict]:
+        """Tests whose pass/fail outcome flipped at least `min_flips` times, most flips first."""
+        result = []
+        for test, entry in self.tests.items():
+            outcomes = entry["outcomes"].replace("S", "")
+            flips = sum(1 for a, b in zip(outcomes, outcomes[1:]) if a != b)
+            if flips >= min_flips:
+                result.append({"test": test, "flips": flips, "outcomes": entry["outcomes"], "last_run": entry["last_run"]})
+        result.sort(key=lambda t: t["flips"], reverse=True)
+        return result
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Ingest a vitest JUnit/JSON report")
+    parser.add_argument("report", help="JUnit .xml or JSON .json report")
+    parser.add_argument("--history", default=str(Path(__file__).resolve().parent / ".cache" / "test_history.json"))
+    parser.add_argument("--no-record", action="store_true", help="Do not add this run to the history")
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args(argv)
+
+    cases = list(read_report(args.report, Path.cwd()))
+    results = summarize(cases)
+    history = TestHistory(Path(args.history))
+    if not args.no_record:
+        history.record(cases)
+        history.save()
+    totals = {k: sum(r[k] for r in results.values()) for k in ("passed", "failed", "skipped")}
+    print(f"{len(cases)} tests in {len(results)} files: {totals['passed']} passed, {totals['failed']} failed, {totals['skipped']} skipped")
+    print("Slowest:")
+    for test in slowest(results, args.top):
+        print(f"  {test['duration_ms']:>10.1f}ms  {test['status']:<7} {test['test']}")
+    flaky = history.flaky()
+    print(f"Flaky ({len(flaky)}):")
+    for test in flaky[: args.top]:
+        print(f"  {test['flips']} flips  {test['outcomes']}  {test['test']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
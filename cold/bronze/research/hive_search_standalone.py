@@ -1,18 +1,19 @@
-import duckdb
 import sys
+from pathlib import Path
 
-DB_PATH = 'c:/Dev/active/portable_hfo_memory_pre_hfo_to_gen84_2025-12-27T21-46-52/hfo_memory.duckdb'
+sys.path.insert(0, str(Path(__file__).resolve().parents[3] / "hot" / "bronze" / "src"))
 
-con = duckdb.connect(DB_PATH, read_only=True)
-con.execute('LOAD fts')
+from memory_bank import connect, highlight
+
+con = connect()
 
 print("="*100)
 print("SEARCHING FOR HIVE/8 CONFIGURATION CODES (1010, 2121, 0000, 3232)")
 print("="*100)
 
-# Search for HIVE configurations
+# Search for HIVE configurations (only a preview crosses into Python)
 results = con.execute("""
-    SELECT filename, generation, content
+    SELECT id, filename, generation, left(content, 2000)
     FROM artifacts 
     WHERE content LIKE '%HIVE/8:1010%' 
        OR content LIKE '%HIVE/8:2121%'
@@ -25,37 +26,31 @@ results = con.execute("""
 
 print(f"\nFound {len(results)} documents with HIVE/8 configuration codes\n")
 
-for i, (filename, gen, content) in enumerate(results):
+sections = highlight(
+    con,
+    [':0000', ':1010', ':2121', ':3232', 'HIVE/8', '8^0', '8^1', 'concurrent', 'agent'],
+    after=3,
+    ids=[row[0] for row in results],  # excerpts for exactly the documents listed below
+    max_lines=50,
+    max_excerpts=200,
+)
+
+for i, (doc_id, filename, gen, preview) in enumerate(results):
     print()
     print("="*100)
     print(f"DOCUMENT {i+1}: {filename} (Gen {gen})")
     print("="*100)
     
-    # Extract HIVE/8 relevant sections
-    lines = content.split('\n')
-    in_relevant = False
-    relevant_lines = []
-    
-    for line in lines:
-        # Check for HIVE config patterns
-        if any(p in line for p in [':0000', ':1010', ':2121', ':3232', 'HIVE/8', '8^0', '8^1', 'concurrent', 'agent']):
-            in_relevant = True
-            relevant_lines.append(line)
-        elif in_relevant and line.strip() == '':
-            relevant_lines.append(line)
-            if len(relevant_lines) > 3 and relevant_lines[-3].strip() == '':
-                in_relevant = False
-        elif in_relevant:
-            relevant_lines.append(line)
-            if len(relevant_lines) > 50:  # Limit per section
-                relevant_lines.append("... [continues]")
-                break
+    # Relevant sections are extracted inside DuckDB (see memory_bank.highlight)
+    excerpts = [ex for ex in sections if ex["id"] == doc_id]
     
-    if relevant_lines:
-        print('\n'.join(relevant_lines[:100]))
+    if excerpts:
+        for ex in excerpts:
+            print(f"[L{ex['start_line']}-{ex['end_line']}]")
+            print(ex["text"])
     else:
         # Show first 2000 chars if no specific matches
-        print(content[:2000])
+        print(preview)
     
     print("\n--- END DOCUMENT ---\n")
 
@@ -1,14 +1,19 @@
-import duckdb
+import sys
+from pathlib import Path
 
-con = duckdb.connect('c:/Dev/active/portable_hfo_memory_pre_hfo_to_gen84_2025-12-27T21-46-52/hfo_memory.duckdb', read_only=True)
-con.execute('LOAD fts')
+sys.path.insert(0, str(Path(__file__).resolve().parents[3] / "hot" / "bronze" / "src"))
+
+from memory_bank.federation import get_federation
+
+# Every configured bank (HFO_MEMORY_BANKS) is searched in parallel
+federation = get_federation()
 
 print("="*80)
 print("SEARCHING FOR FULL DOCUMENTS WITH HIVE/8 CONFIGURATION CODES...")
 print("="*80)
 
 # Find documents with HIVE/8:XXYY configuration codes
-results = con.execute("""
+results = federation.query("""
     SELECT filename, generation, content
     FROM artifacts 
     WHERE content LIKE '%HIVE/8:1010%' 
@@ -19,14 +24,15 @@ results = con.execute("""
        OR content LIKE '%8^0%8^1%'
     ORDER BY generation DESC
     LIMIT 15
-""").fetchall()
+""")
+results = sorted(results, key=lambda r: (r[2] is not None, r[2] or 0), reverse=True)[:15]
 
 for r in results:
     print()
     print("#"*80)
-    print(f"# FILE: {r[0]} (Gen {r[1]})")
+    print(f"# FILE: {r[1]} (Gen {r[2]}) [{r[0]}]")
     print("#"*80)
-    content = r[2]
+    content = r[3]
     # Print full content for docs with the key patterns
     if ':1010' in content or ':2121' in content or ':0000' in content or ':3232' in content:
         print(content)
@@ -2,6 +2,10 @@
 """
 Extract all ttao/tommy notes from Memory Bank and compile into single file.
 HUNT phase task - gathering exemplars from past generations.
+
+Current-workspace and archived Gen85 notes (ttao-notes-*.md) are read from the bank too;
+refresh them with:
+    python -m memory_bank.ingest --workspace c:/Dev/active/hfo_gen87_x3
 """
 
 import duckdb
@@ -43,24 +47,6 @@ def main():
             "content": content
         })
     
-    # Also get current workspace files
-    current_files = [
-        Path("c:/Dev/active/hfo_gen87_x3/ttao-notes-2025-12-29.md"),
-        Path("c:/Dev/active/hfo_kiro_gen85/_archived_gen85_docs/ttao-notes-2025-12-27-1106pm.md")
-    ]
-    
-    for f in current_files:
-        if f.exists():
-            content = f.read_text(encoding='utf-8')
-            print(f"Current: {f.name} [{len(content)} chars]")
-            notes_data.append({
-                "filename": f.name,
-                "generation": 87 if "87" in str(f) else 85,
-                "era": "hfo",
-                "size": len(content),
-                "content": content
-            })
-    
     # Write JSON output
     with open(OUTPUT_JSON, 'w', encoding='utf-8') as f:
         json.dump({
@@ -0,0 +1,77 @@
+"""
+HFO Obsidian Blackboard
+=======================
+
+Stigmergy substrate shared by the HIVE/8 Commanders: an append-only JSONL log
+of 8-field signals (ts, mark, pull, msg, type, hive, gen, port).
+
+Usage:
+    from blackboard import emit_signal
+    emit_signal("HUNT: found exemplar", hive="H", port=0)
+"""
+
+from .aggregate import BlackboardAggregator, rate_per_minute
+from .follow import Follower, SignalFilter, Subscription, subscribe
+from .index import BlackboardIndex, attach_index
+from .locking import file_lock
+from .ordered import TimeOrderedReader, iter_ordered
+from .reader import iter_records, read_signal
+from .ring import RingDrainer, RingProducer, get_producer
+from .segments import attach_rotation, backfill_stats, compact, iter_signals, load_manifest, prune, rotate
+from .sequence import SequenceDetector, SequenceMonitor
+from .signals import (
+    CURRENT_GENERATION,
+    DEFAULT_BLACKBOARD_PATH,
+    HIVE_PHASES,
+    MAX_PORT,
+    MIN_GENERATION,
+    PULL_DIRECTIONS,
+    SIGNAL_TYPES,
+    decode_line,
+    encode_signal,
+    make_signal,
+    parse_line,
+)
+from .writer import BlackboardWriter, emit_signal, get_writer
+
+__all__ = [
+    "BlackboardAggregator",
+    "rate_per_minute",
+    "Follower",
+    "SignalFilter",
+    "Subscription",
+    "subscribe",
+    "BlackboardIndex",
+    "attach_index",
+    "file_lock",
+    "TimeOrderedReader",
+    "iter_ordered",
+    "iter_records",
+    "read_signal",
+    "RingDrainer",
+    "RingProducer",
+    "get_producer",
+    "attach_rotation",
+    "backfill_stats",
+    "compact",
+    "iter_signals",
+    "load_manifest",
+    "prune",
+    "rotate",
+    "SequenceDetector",
+    "SequenceMonitor",
+    "CURRENT_GENERATION",
+    "DEFAULT_BLACKBOARD_PATH",
+    "HIVE_PHASES",
+    "MAX_PORT",
+    "MIN_GENERATION",
+    "PULL_DIRECTIONS",
+    "SIGNAL_TYPES",
+    "decode_line",
+    "encode_signal",
+    "make_signal",
+    "parse_line",
+    "BlackboardWriter",
+    "emit_signal",
+    "get_writer",
+]
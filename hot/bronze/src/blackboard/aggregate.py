@@ -0,0 +1,127 @@
+"""
+Blackboard Aggregator
+=====================
+
+Incrementally maintained counts over the whole blackboard (sealed segments
+plus the active file) for dashboards.
+
+State lives in `<file>.agg.json`: the active file's inode, a fingerprint of
+its first bytes, the last complete-line offset read and the stats of
+everything before it. A refresh parses only bytes appended since then and
+adds the sealed segments' stats straight from the segment manifest, so it
+costs O(new signals). Segments sealed before the manifest carried stats are
+read once and their stats written back (segments.backfill_stats). The
+active part is rebuilt from byte 0 when the file was truncated, rotated or
+replaced.
+"""
+
+import hashlib
+import json
+import os
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Union
+
+from .locking import file_lock
+from .reader import complete_size, iter_records_from
+from .segments import backfill_stats, load_manifest
+from .signals import DEFAULT_BLACKBOARD_PATH
+from .stats import MINUTE_FORMAT, add_signal, merge_stats, new_stats, trim_per_minute
+
+STATE_VERSION = 2
+FINGERPRINT_BYTES = 4096
+
+
+def _fingerprint(fp, size: int) -> str:
+    fp.seek(0)
+    return hashlib.sha1(fp.read(min(size, FINGERPRINT_BYTES))).hexdigest()
+
+
+class BlackboardAggregator:
+    """Persisted, incrementally refreshed stats for one blackboard file."""
+
+    def __init__(self, path: Union[str, Path] = DEFAULT_BLACKBOARD_PATH):
+        self.path = Path(path)
+        self.state_path = Path(f"{self.path}.agg.json")
+        self.last_refresh = {"parsed_bytes": 0, "new_signals": 0, "rebuilt": False}
+
+    def _load(self) -> dict:
+        try:
+            state = json.loads(self.state_path.read_text(encoding="utf-8"))
+            if state.get("version") == STATE_VERSION:
+                return state
+        except (OSError, ValueError):
+            pass
+        return self._empty()
+
+    @staticmethod
+    def _empty() -> dict:
+        return {"version": STATE_VERSION, "ino": None, "offset": 0, "fingerprint": None, "active": new_stats()}
+
+    def _save(self, state: dict) -> None:
+        tmp = self.state_path.with_name(f".{self.state_path.name}.tmp")
+        tmp.write_text(json.dumps(state, separators=(",", ":")), encoding="utf-8")
+        os.replace(tmp, self.state_path)
+
+    def _refresh_active(self, state: dict) -> dict:
+        if not self.path.exists():
+            return self._empty()
+        with open(self.path, "rb") as fp:
+            st = os.fstat(fp.fileno())
+            rebuilt = (
+                st.st_ino != state["ino"]
+                or st.st_size < state["offset"]
+                or (state["offset"] and _fingerprint(fp, state["offset"]) != state["fingerprint"])
+            )
+            if rebuilt:
+                state = self._empty()
+            start = state["offset"]
+            end = complete_size(fp, st.st_size)
+            new = 0
+            for _, _, _, signal in iter_records_from(fp, start, end):
+                add_signal(state["active"], signal)
+                new += 1
+            trim_per_minute(state["active"])
+            state.update(ino=st.st_ino, offset=max(start, end))
+            state["fingerprint"] = _fingerprint(fp, state["offset"])
+        self.last_refresh = {"parsed_bytes": max(0, end - start), "new_signals": new, "rebuilt": bool(rebuilt)}
+        return state
+
+    def refresh(self) -> dict:
+        """Catch up with the log and return stats over all of it."""
+        self.state_path.parent.mkdir(parents=True, exist_ok=True)
+        with file_lock(self.state_path):
+            state = self._load()
+            before = (state["ino"], state["offset"])
+            state = self._refresh_active(state)
+            if (state["ino"], state["offset"]) != before:
+                self._save(state)
+
+        manifest = load_manifest(self.path)
+        if any("stats" not in entry for entry in manifest["segments"]) and backfill_stats(self.path):
+            manifest = load_manifest(self.path)
+        totals = new_stats()
+        for entry in manifest["segments"]:
+            if "stats" in entry:
+                merge_stats(totals, entry["stats"])
+        merge_stats(totals, state["active"])
+        trim_per_minute(totals)
+        totals["segments"] = len(manifest["segments"])
+        return totals
+
+    def reset(self) -> None:
+        """Forget the persisted state; the next refresh re-reads the active file."""
+        with file_lock(self.state_path):
+            self.state_path.unlink(missing_ok=True)
+
+
+def rate_per_minute(stats: dict, minutes: int = 60) -> float:
+    """Mean signals per minute over the `minutes` ending at the newest signal."""
+    if not stats["per_minute"]:
+        return 0.0
+    try:
+        end = datetime.strptime(max(stats["per_minute"]), MINUTE_FORMAT)
+    except ValueError:  # non-ISO legacy timestamp sorted last
+        return 0.0
+    start = (end - timedelta(minutes=minutes - 1)).strftime(MINUTE_FORMAT)
+    return sum(n for minute, n in stats["per_minute"].items() if minute >= start) / minutes
@@ -0,0 +1,282 @@
+"""
+Blackboard Columnar Mirror
+==========================
+
+Optional typed Parquet copy of the blackboard for analytics, kept in sync
+incrementally and queried through a DuckDB view, so history queries scan
+columns instead of decoding JSON line by line.
+
+Layout:
+    hot/blackboard.jsonl.columnar/
+        _state.json                             # what has been mirrored so far
+        gen=87/date=2025-12-30/b000003_0.parquet
+
+Columns: ts TIMESTAMPTZ (UTC), mark FLOAT, pull/msg/type/hive VARCHAR
+(Parquet dictionary-encodes the low-cardinality ones), port UTINYINT, with
+gen USMALLINT and date DATE as partition keys. Values that do not fit
+their type (legacy timestamps, gen 87.5) become NULL; the JSONL stays the
+record of truth.
+
+Each sync() converts only what was appended since the last one: sealed
+segments it has not seen (a segment it was partway through when the
+active file rotated continues from its old offset) and then the new
+complete lines of the active file. Every source is written as one batch
+whose files are named after the batch number, so a sync interrupted before
+its state was saved rewrites the same files instead of duplicating rows.
+
+Usage:
+    python -m blackboard.columnar sync
+    python -m blackboard.columnar query "SELECT hive, count(*) FROM blackboard GROUP BY hive"
+"""
+
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+from typing import List, Optional, Tuple, Union
+
+import duckdb
+
+from .locking import file_lock
+from .reader import complete_size, iter_records_from
+from .segments import _open_read, load_manifest, segments_dir
+from .signals import DEFAULT_BLACKBOARD_PATH, encode_signal
+
+STATE_FILE = "_state.json"
+STATE_VERSION = 1
+COPY_CHUNK = 1 << 20
+HIVE_TYPES = "{'gen': 'USMALLINT', 'date': 'DATE'}"
+
+SCHEMA = (
+    ("ts", "TIMESTAMPTZ"),
+    ("mark", "FLOAT"),
+    ("pull", "VARCHAR"),
+    ("msg", "VARCHAR"),
+    ("type", "VARCHAR"),
+    ("hive", "VARCHAR"),
+    ("port", "UTINYINT"),
+    ("gen", "USMALLINT"),
+    ("date", "DATE"),
+)
+
+_COLUMNS = ", ".join(f"\"{name}\": 'VARCHAR'" for name, _ in SCHEMA[:-1])
+_TYPED = ",\n    ".join(
+    f'try_cast("{name}" AS {sql_type}) AS "{name}"' for name, sql_type in SCHEMA[:-1]
+)
+
+CONVERT_SQL = f"""
+SELECT *, CAST(ts AS DATE) AS date FROM (
+  SELECT
+    {_TYPED}
+  FROM read_json($path, format = 'newline_delimited', columns = {{{_COLUMNS}}})
+)
+"""
+
+
+def mirror_dir(path: Union[str, Path] = DEFAULT_BLACKBOARD_PATH) -> Path:
+    return Path(f"{path}.columnar")
+
+
+def _connect() -> duckdb.DuckDBPyConnection:
+    con = duckdb.connect(":memory:")
+    con.execute("SET TimeZone = 'UTC'")  # ts offsets are normalised and dates are UTC days
+    return con
+
+
+def _copy_range(fp, start: int, end: Optional[int], target) -> None:
+    fp.seek(start)
+    remaining = None if end is None else end - start
+    while remaining is None or remaining > 0:
+        chunk = fp.read(COPY_CHUNK if remaining is None else min(COPY_CHUNK, remaining))
+        if not chunk:
+            break
+        target.write(chunk)
+        if remaining is not None:
+            remaining -= len(chunk)
+
+
+def _write_batch(con: duckdb.DuckDBPyConnection, source: Path, root: Path, batch: int) -> int:
+    """Convert one JSONL file into partitioned Parquet files for `batch`; returns rows written."""
+    try:
+        con.execute(f"CREATE OR REPLACE TEMP TABLE batch AS {CONVERT_SQL}", {"path": str(source)})
+    except duckdb.InvalidInputException:
+        # Legacy lines (UTF-16, two objects on one line): re-encode through the tolerant reader.
+        fd, clean = tempfile.mkstemp(suffix=".jsonl")
+        try:
+            with os.fdopen(fd, "wb") as out, _open_read(source) as fp:
+                for _, _, _, signal in iter_records_from(fp):
+                    out.write(encode_signal(signal))
+            con.execute(f"CREATE OR REPLACE TEMP TABLE batch AS {CONVERT_SQL}", {"path": clean})
+        finally:
+            os.unlink(clean)
+    rows = con.execute("SELECT count(*) FROM batch").fetchone()[0]
+    if rows:
+        con.execute(
+            f"COPY batch TO '{root.as_posix()}' (FORMAT PARQUET, COMPRESSION ZSTD, "
+            f"PARTITION_BY (gen, date), FILENAME_PATTERN 'b{batch:06d}_{{i}}', OVERWRITE_OR_IGNORE)"
+        )
+    con.execute("DROP TABLE batch")
+    return rows
+
+
+class ColumnarMirror:
+    """Incremental JSONL → Parquet conversion for one blackboard."""
+
+    def __init__(self, path: Union[str, Path] = DEFAULT_BLACKBOARD_PATH, root: Optional[Union[str, Path]] = None):
+        self.path = Path(path)
+        self.root = Path(root) if root else mirror_dir(self.path)
+        self.state_path = self.root / STATE_FILE
+
+    def _load(self) -> Optional[dict]:
+        try:
+            state = json.loads(self.state_path.read_text(encoding="utf-8"))
+            if state.get("version") == STATE_VERSION:
+                return state
+        except (OSError, ValueError):
+            pass
+        return None
+
+    def _save(self, state: dict) -> None:
+        tmp = self.state_path.with_name(f".{STATE_FILE}.tmp")
+        tmp.write_text(json.dumps(state), encoding="utf-8")
+        os.replace(tmp, self.state_path)
+
+    def _segment(self, seq: int) -> Optional[Path]:
+        directory = segments_dir(self.path)
+        for entry in load_manifest(self.path)["segments"]:
+            if entry["seq"] == seq and (directory / entry["name"]).exists():
+                return directory / entry["name"]
+        staging = directory / f".seg-{seq:06d}.jsonl"  # renamed, not sealed yet
+        return staging if staging.exists() else None
+
+    def _pending(self, state: Optional[dict]) -> Tuple[List[Tuple[int, int]], int, Optional[int], int]:
+        """(segment seq, start offset) pairs to convert, then the active file's next_seq, inode and start."""
+        with file_lock(self.path):
+            try:
+                ino = os.stat(self.path).st_ino
+            except FileNotFoundError:
+                ino = None
+            next_seq = load_manifest(self.path)["next_seq"]
+        if state is None:
+            return [(seq, 0) for seq in range(1, next_seq)], next_seq, ino, 0
+        if state["ino"] is not None and state["ino"] == ino:
+            return [], next_seq, ino, state["offset"]
+        # The file we were reading was sealed as segment state["next_seq"].
+        segments = [(seq, state["offset"] if seq == state["next_seq"] else 0) for seq in range(state["next_seq"], next_seq)]
+        return segments, next_seq, ino, 0
+
+    def sync(self) -> dict:
+        """Mirror everything appended since the last sync."""
+        self.root.mkdir(parents=True, exist_ok=True)
+        report = {"batches": 0, "rows": 0}
+        with file_lock(self.root):
+            state = self._load()
+            segments, next_seq, ino, offset = self._pending(state)
+            batch = state["batch"] if state else 0
+            con = _connect()
+            try:
+                for seq, start in segments:
+                    segment = self._segment(seq)
+                    if segment is not None:
+                        report["rows"] += self._convert(con, segment, start, None, batch + 1)
+                        batch += 1
+                        report["batches"] += 1
+                    self._save({"version": STATE_VERSION, "ino": None, "offset": 0, "next_seq": seq + 1, "batch": batch})
+
+                end = offset
+                if ino is not None:
+                    with open(self.path, "rb") as fp:
+                        if os.fstat(fp.fileno()).st_ino == ino:
+                            end = complete_size(fp, os.fstat(fp.fileno()).st_size)
+                    if end < offset:  # truncated in place
+                        offset = 0
+                    if end > offset:
+                        report["rows"] += self._convert(con, self.path, offset, end, batch + 1)
+                        batch += 1
+                        report["batches"] += 1
+                self._save({"version": STATE_VERSION, "ino": ino, "offset": end, "next_seq": next_seq, "batch": batch})
+            finally:
+                con.close()
+        return report
+
+    def _convert(self, con: duckdb.DuckDBPyConnection, source: Path, start: int, end: Optional[int], batch: int) -> int:
+        if start == 0 and end is None:
+            return _write_batch(con, source, self.root, batch)
+        fd, tmp = tempfile.mkstemp(suffix=".jsonl")
+        try:
+            with os.fdopen(fd, "wb") as out, _open_read(source) as fp:
+                _copy_range(fp, start, end, out)
+            return _write_batch(con, Path(tmp), self.root, batch)
+        finally:
+            os.unlink(tmp)
+
+    def reset(self) -> None:
+        """Delete the mirror; the next sync rebuilds it from the whole log."""
+        with file_lock(self.root):
+            for child in self.root.iterdir():
+                if child.is_dir():
+                    shutil.rmtree(child)
+                else:
+                    child.unlink()
+
+
+def create_view(con: duckdb.DuckDBPyConnection, root: Union[str, Path], name: str = "blackboard") -> None:
+    """(Re)create `name` as a view over the mirror's Parquet files (empty when there are none)."""
+    root = Path(root)
+    con.execute("SET TimeZone = 'UTC'")
+    if any(root.glob("gen=*/date=*/*.parquet")):
+        source = (
+            f"SELECT * FROM read_parquet('{(root / 'gen=*' / 'date=*' / '*.parquet').as_posix()}', "
+            f"hive_partitioning = true, hive_types = {HIVE_TYPES}, union_by_name = true)"
+        )
+    else:
+        source = "SELECT " + ", ".join(f'NULL::{t} AS "{n}"' for n, t in SCHEMA) + " WHERE false"
+    con.execute(f'CREATE OR REPLACE VIEW "{name}" AS {source}')
+
+
+def connect(
+    path: Union[str, Path] = DEFAULT_BLACKBOARD_PATH,
+    root: Optional[Union[str, Path]] = None,
+    sync: bool = True,
+) -> duckdb.DuckDBPyConnection:
+    """In-memory DuckDB connection with a `blackboard` view over the (freshly synced) mirror."""
+    mirror = ColumnarMirror(path, root)
+    if sync:
+        mirror.sync()
+    con = duckdb.connect(":memory:")
+    create_view(con, mirror.root)
+    return con
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Columnar Parquet mirror of the blackboard")
+    parser.add_argument("--blackboard", default=str(DEFAULT_BLACKBOARD_PATH), help="Blackboard JSONL file")
+    parser.add_argument("--root", help="Mirror directory (default <blackboard>.columnar)")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("sync", help="Convert what was appended since the last sync")
+    sub.add_parser("rebuild", help="Delete the mirror and convert everything")
+    query = sub.add_parser("query", help="Run SQL against the `blackboard` view")
+    query.add_argument("sql")
+    args = parser.parse_args(argv)
+
+    mirror = ColumnarMirror(args.blackboard, args.root)
+    if args.command == "query":
+        con = connect(args.blackboard, args.root)
+        result = con.execute(args.sql)
+        print("\t".join(d[0] for d in result.description))
+        for row in result.fetchall():
+            print("\t".join("" if v is None else str(v) for v in row))
+        con.close()
+        return 0
+    if args.command == "rebuild" and mirror.root.exists():
+        mirror.reset()
+    report = mirror.sync()
+    print(f"Mirrored {report['rows']} signals in {report['batches']} batch(es) to {mirror.root}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
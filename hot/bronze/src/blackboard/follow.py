@@ -0,0 +1,406 @@
+"""
+Blackboard Subscriptions
+========================
+
+Follow the blackboard and react to new signals without rescanning it.
+
+- Follower tails one blackboard file from a byte offset. On Linux it sleeps
+  on inotify (via libc, no extra dependency) and wakes within milliseconds
+  of an append; elsewhere it polls stat() every `poll_interval` seconds.
+- Rotation (blackboard.segments) is handled by keeping the old file open:
+  it is drained to its end before switching to the new active file, so no
+  signal appended before the rename is missed. A truncated file restarts
+  at offset 0.
+- `state_file` persists (inode, offset) after each delivered batch so a
+  restarted consumer resumes where it stopped; consumers that keep their
+  own checkpoint pass `offset` and `ino` instead.
+- Delivery: iterate (blocking), `subscribe(callback)` (background thread)
+  or `async for` (asyncio).
+- serve(): streams matching signals as JSONL to local clients over a Unix
+  socket (TCP on 127.0.0.1 where AF_UNIX is unavailable) or, when the
+  `websockets` package is installed, a WebSocket. Clients send one JSON
+  line with their filter and optional offset, e.g. {"port": 4, "type": "error"}.
+
+Usage:
+    for signal in Follower(filter=SignalFilter(port=4)):
+        ...
+    python -m blackboard.follow --port 4 --type error
+    python -m blackboard.follow serve --unix /tmp/hfo-blackboard.sock
+"""
+
+import argparse
+import asyncio
+import ctypes
+import ctypes.util
+import json
+import os
+import select
+import socket
+import struct
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import AsyncIterator, Callable, Iterator, List, NamedTuple, Optional, Tuple, Union
+
+from .reader import complete_size, iter_records_from
+from .signals import DEFAULT_BLACKBOARD_PATH
+
+try:
+    import websockets
+except ImportError:  # optional; only needed for serve(websocket=...)
+    websockets = None
+
+IN_MODIFY = 0x002
+IN_CLOSE_WRITE = 0x008
+IN_MOVED_FROM = 0x040
+IN_MOVED_TO = 0x080
+IN_CREATE = 0x100
+IN_DELETE = 0x200
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+_EVENT = struct.Struct("iIII")
+
+
+class SignalFilter(NamedTuple):
+    """Match on any combination of hive, port, type and gen (None = any)."""
+    hive: Optional[str] = None
+    port: Optional[int] = None
+    type: Optional[str] = None
+    gen: Optional[int] = None
+
+    def matches(self, signal: dict) -> bool:
+        return (
+            (self.hive is None or signal.get("hive") == self.hive)
+            and (self.port is None or signal.get("port") == self.port)
+            and (self.type is None or signal.get("type") == self.type)
+            and (self.gen is None or signal.get("gen") == self.gen)
+        )
+
+    @classmethod
+    def from_dict(cls, spec: dict) -> "SignalFilter":
+        return cls(**{k: spec.get(k) for k in cls._fields})
+
+
+class _Inotify:
+    """Minimal inotify watch on one directory, filtered to one file name."""
+
+    def __init__(self, directory: Path, name: str):
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self.name = name.encode()
+        self.fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        mask = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+        if libc.inotify_add_watch(self.fd, str(directory).encode(), mask) < 0:
+            os.close(self.fd)
+            raise OSError(ctypes.get_errno(), f"inotify_add_watch failed for {directory}")
+
+    def wait(self, timeout: Optional[float]) -> bool:
+        """Block until the watched file changes (True) or `timeout` passes (False)."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            ready, _, _ = select.select([self.fd], [], [], remaining)
+            if not ready:
+                return False
+            try:
+                data = os.read(self.fd, 65536)
+            except BlockingIOError:
+                continue
+            pos = 0
+            while pos < len(data):
+                _, _, _, length = _EVENT.unpack_from(data, pos)
+                name = data[pos + _EVENT.size:pos + _EVENT.size + length].rstrip(b"\0")
+                pos += _EVENT.size + length
+                if name == self.name:
+                    return True
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+class Follower:
+    """Tail a blackboard file, yielding new signals that match `filter`."""
+
+    def __init__(
+        self,
+        path: Union[str, Path] = DEFAULT_BLACKBOARD_PATH,
+        filter: SignalFilter = SignalFilter(),
+        offset: Optional[int] = None,
+        state_file: Optional[Union[str, Path]] = None,
+        poll_interval: float = 0.05,
+        use_inotify: bool = True,
+        ino: Optional[int] = None,
+    ):
+        self.path = Path(path)
+        self.filter = filter
+        self.state_file = Path(state_file) if state_file else None
+        self.poll_interval = poll_interval
+        self._fp = None
+        self._ino = None
+        self._closed = False
+
+        saved = self._load_state()
+        if offset is not None:
+            self.offset = offset
+        elif saved is not None:
+            self.offset = saved["offset"]
+        else:
+            # Start at the current end: only signals appended from now on.
+            self.offset = self.path.stat().st_size if self.path.exists() else 0
+        # Inode the offset belongs to; a different (rotated-in) file starts at 0.
+        self._resume_ino = ino if offset is not None else saved["ino"] if saved else None
+
+        self._watch = None
+        if use_inotify and sys.platform.startswith("linux"):
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                self._watch = _Inotify(self.path.parent, self.path.name)
+            except OSError:
+                self._watch = None
+
+    # --- state ----------------------------------------------------------------
+
+    def _load_state(self) -> Optional[dict]:
+        if self.state_file is None:
+            return None
+        try:
+            return json.loads(self.state_file.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+
+    def save_state(self) -> None:
+        """Persist the current position (no-op without a state_file)."""
+        if self.state_file is None:
+            return
+        tmp = self.state_file.with_name(f".{self.state_file.name}.tmp")
+        tmp.write_text(json.dumps({"ino": self._ino, "offset": self.offset}), encoding="utf-8")
+        os.replace(tmp, self.state_file)
+
+    @property
+    def position(self) -> Tuple[Optional[int], int]:
+        """(inode, offset) of the next unread byte; inode is None until the file is opened."""
+        return self._ino, self.offset
+
+    # --- reading --------------------------------------------------------------
+
+    def _open(self) -> bool:
+        try:
+            fp = open(self.path, "rb")
+        except FileNotFoundError:
+            return False
+        self._fp = fp
+        self._ino = os.fstat(fp.fileno()).st_ino
+        if self._resume_ino is not None and self._resume_ino != self._ino:
+            # Saved position belonged to a file that has since been rotated away.
+            self.offset = 0
+        self._resume_ino = None
+        return True
+
+    def _drain(self) -> List[dict]:
+        size = os.fstat(self._fp.fileno()).st_size
+        if size < self.offset:  # truncated in place
+            self.offset = 0
+        end = complete_size(self._fp, size)
+        if end <= self.offset:
+            return []
+        matched = [s for _, _, _, s in iter_records_from(self._fp, self.offset, end) if self.filter.matches(s)]
+        self.offset = end
+        return matched
+
+    def poll(self) -> List[dict]:
+        """Signals appended since the last call (non-blocking)."""
+        if self._fp is None and not self._open():
+            return []
+        position = (self._ino, self.offset)
+        signals = self._drain()
+        try:
+            rotated = os.stat(self.path).st_ino != self._ino
+        except FileNotFoundError:
+            rotated = False  # mid-rotation; the new file appears shortly
+        if rotated:
+            # The writer renames under its lock, so the old file is complete now;
+            # drain it once more for appends that landed after the first pass.
+            signals += self._drain()
+            self._fp.close()
+            self._fp = None
+            self.offset = 0
+            if self._open():
+                signals += self._drain()
+        if (self._ino, self.offset) != position:
+            self.save_state()
+        return signals
+
+    def wait(self, timeout: Optional[float] = None) -> List[dict]:
+        """Block until at least one matching signal arrives or `timeout` passes."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while not self._closed:
+            signals = self.poll()
+            if signals:
+                return signals
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                return []
+            if self._watch is not None:
+                # Bounded so rotation races and close() are still noticed.
+                self._watch.wait(min(remaining, 1.0) if remaining is not None else 1.0)
+            else:
+                time.sleep(self.poll_interval if remaining is None else min(self.poll_interval, remaining))
+        return []
+
+    def __iter__(self) -> Iterator[dict]:
+        while not self._closed:
+            yield from self.wait(1.0)
+
+    async def __aiter__(self) -> AsyncIterator[dict]:
+        while not self._closed:
+            for signal in await asyncio.to_thread(self.wait, 1.0):
+                yield signal
+
+    def close(self) -> None:
+        self._closed = True
+        if self._fp is not None:
+            self._fp.close()
+            self._fp = None
+        if self._watch is not None:
+            self._watch.close()
+            self._watch = None
+
+
+class Subscription:
+    """A background thread delivering signals from a Follower to a callback."""
+
+    def __init__(self, follower: Follower, callback: Callable[[dict], None]):
+        self.follower = follower
+        self.callback = callback
+        self.errors = 0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="blackboard-subscription", daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            for signal in self.follower.wait(0.25):
+                try:
+                    self.callback(signal)
+                except Exception:  # one bad callback must not stop delivery
+                    self.errors += 1
+
+    def stop(self) -> None:
+        self._stop.set()
+        self._thread.join()
+        self.follower.close()
+
+
+def subscribe(
+    callback: Callable[[dict], None],
+    path: Union[str, Path] = DEFAULT_BLACKBOARD_PATH,
+    filter: SignalFilter = SignalFilter(),
+    **follower_args,
+) -> Subscription:
+    """Call `callback(signal)` for each new matching signal until stop()."""
+    return Subscription(Follower(path, filter, **follower_args), callback)
+
+
+# --- local server -------------------------------------------------------------
+
+async def _handle(path: Path, request: dict, send: Callable) -> None:
+    follower = Follower(path, SignalFilter.from_dict(request), offset=request.get("offset"))
+    try:
+        async for signal in follower:
+            await send(json.dumps(signal, ensure_ascii=False))
+    finally:
+        follower.close()
+
+
+async def serve(
+    path: Union[str, Path] = DEFAULT_BLACKBOARD_PATH,
+    unix: Optional[str] = None,
+    tcp_port: Optional[int] = None,
+    websocket_port: Optional[int] = None,
+) -> None:
+    """Serve JSONL streams to local clients until cancelled."""
+    path = Path(path)
+    servers = []
+
+    async def on_stream(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        async def send(line: str) -> None:
+            writer.write(line.encode("utf-8") + b"\n")
+            await writer.drain()
+        try:
+            first = await reader.readline()
+            await _handle(path, json.loads(first or b"{}"), send)
+        except (ConnectionError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    if unix is not None and hasattr(socket, "AF_UNIX"):
+        if os.path.exists(unix):
+            os.unlink(unix)
+        servers.append(await asyncio.start_unix_server(on_stream, path=unix))
+    elif unix is not None or tcp_port is not None:
+        servers.append(await asyncio.start_server(on_stream, "127.0.0.1", tcp_port or 8765))
+
+    if websocket_port is not None:
+        if websockets is None:
+            raise RuntimeError("serve(websocket_port=...) needs the websockets package")
+
+        async def on_websocket(ws) -> None:
+            try:
+                await _handle(path, json.loads(await ws.recv() or "{}"), ws.send)
+            except (websockets.ConnectionClosed, ValueError):
+                pass
+
+        servers.append(await websockets.serve(on_websocket, "127.0.0.1", websocket_port))
+
+    if not servers:
+        raise ValueError("serve() needs unix, tcp_port or websocket_port")
+    try:
+        await asyncio.gather(*(s.wait_closed() for s in servers))
+    finally:
+        for s in servers:
+            s.close()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Follow the blackboard or serve it to local clients")
+    parser.add_argument("mode", nargs="?", choices=["tail", "serve"], default="tail")
+    parser.add_argument("--blackboard", default=str(DEFAULT_BLACKBOARD_PATH), help="Blackboard JSONL file")
+    parser.add_argument("--hive")
+    parser.add_argument("--port", type=int)
+    parser.add_argument("--type")
+    parser.add_argument("--gen", type=int)
+    parser.add_argument("--from-start", action="store_true", help="Replay the whole file first")
+    parser.add_argument("--state", help="Resume from and save position to this file")
+    parser.add_argument("--unix", help="serve: Unix socket path")
+    parser.add_argument("--tcp", type=int, help="serve: TCP port on 127.0.0.1")
+    parser.add_argument("--websocket", type=int, help="serve: WebSocket port on 127.0.0.1")
+    args = parser.parse_args(argv)
+
+    if args.mode == "serve":
+        try:
+            asyncio.run(serve(args.blackboard, args.unix, args.tcp, args.websocket))
+        except KeyboardInterrupt:
+            pass
+        return 0
+
+    follower = Follower(
+        args.blackboard,
+        SignalFilter(args.hive, args.port, args.type, args.gen),
+        offset=0 if args.from_start else None,
+        state_file=args.state,
+    )
+    try:
+        for signal in follower:
+            print(json.dumps(signal, ensure_ascii=False), flush=True)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        follower.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,409 @@
+"""
+Blackboard Gate Validation
+==========================
+
+G0-G7 checks from the stigmergy contract (src/contracts/stigmergy.contract.ts),
+in two forms that agree with each other:
+
+- check_signal(): one signal dict, for agent tools.
+- validate_file() / validate_blackboard(): whole segments at once. DuckDB
+  reads the JSONL (plain, gzip or zstd) with one JSON column per gated
+  field and evaluates every gate as a column expression, so throughput is
+  millions of signals per second and only failing rows reach Python.
+  Files with malformed lines (legacy UTF-16, two signals on one line) and
+  small appends fall back to the tolerant parser and check_signal().
+
+Failures are appended to a quarantine JSONL next to the blackboard with
+their source, signal number and reasons; the blackboard itself is never
+rewritten. GateValidator remembers what it already checked, so repeated
+runs (or --follow) only validate new segments and new appends.
+
+Usage:
+    python -m blackboard.gates                 # sealed segments + active file
+    python -m blackboard.gates --follow        # then keep validating new appends
+
+    from blackboard.gates import check_signal
+    check_signal({"ts": "2026-01-01T00:00:00Z", "mark": 1.0, ...})  # [] = all gates pass
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Iterable, List, Optional, Tuple, Union
+
+import duckdb
+
+from .locking import file_lock
+from .reader import complete_size
+from .segments import _open_read, load_manifest, segments_dir
+from .signals import (
+    DEFAULT_BLACKBOARD_PATH,
+    HIVE_PHASES,
+    MAX_PORT,
+    MIN_GENERATION,
+    PULL_DIRECTIONS,
+    SIGNAL_TYPES,
+    decode_line,
+    parse_line,
+)
+from .writer import get_writer
+
+GATES = {
+    "G0": ("ts", "Valid ISO8601"),
+    "G1": ("mark", "0.0 ≤ mark ≤ 1.0"),
+    "G2": ("pull", "upstream/downstream/lateral"),
+    "G3": ("msg", "Non-empty string"),
+    "G4": ("type", "signal/event/error/metric"),
+    "G5": ("hive", "H/I/V/E/X"),
+    "G6": ("gen", f"Integer ≥ {MIN_GENERATION}"),
+    "G7": ("port", f"Integer 0-{MAX_PORT}"),
+}
+ISO8601_PATTERN = r"^[+-]?\d{4,6}-\d{2}-\d{2}T\d{2}:\d{2}:\d{2}(\.\d+)?Z$"
+_ISO8601 = re.compile(ISO8601_PATTERN)
+MAX_RAW_CHARS = 2000
+
+
+def gate_failure(gate_id: str) -> str:
+    field, rule = GATES[gate_id]
+    return f"{gate_id} FAIL: {field} must be {rule}"
+
+
+def _is_int(value) -> bool:
+    # JSON integers beyond 64 bits read back as doubles in DuckDB; treat them the same here.
+    return isinstance(value, int) and not isinstance(value, bool) and -2 ** 63 <= value < 2 ** 64
+
+
+def _is_number(value) -> bool:
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def _valid_ts(ts) -> bool:
+    if not isinstance(ts, str) or not _ISO8601.match(ts):
+        return False
+    if re.match(r"^\d{4}-", ts):
+        try:
+            datetime.fromisoformat(ts[:-1])
+        except ValueError:
+            return False
+    return True
+
+
+_CHECKS = {
+    "G0": lambda s: _valid_ts(s.get("ts")),
+    "G1": lambda s: _is_number(s.get("mark")) and 0.0 <= s["mark"] <= 1.0,
+    "G2": lambda s: s.get("pull") in PULL_DIRECTIONS,
+    "G3": lambda s: isinstance(s.get("msg"), str) and len(s["msg"]) > 0,
+    "G4": lambda s: s.get("type") in SIGNAL_TYPES,
+    "G5": lambda s: s.get("hive") in HIVE_PHASES,
+    "G6": lambda s: _is_int(s.get("gen")) and s["gen"] >= MIN_GENERATION,
+    "G7": lambda s: _is_int(s.get("port")) and 0 <= s["port"] <= MAX_PORT,
+}
+
+
+def check_signal(signal: dict, gates: Optional[Iterable[str]] = None) -> List[str]:
+    """Failure reasons for one signal (empty list = all gates pass)."""
+    return [gate_failure(g) for g in (gates or GATES) if not _CHECKS[g](signal)]
+
+
+FIELDS = ("ts", "mark", "pull", "msg", "type", "hive", "gen", "port")
+FAST_PATH_BYTES = 1 << 20  # smaller appends are checked in Python
+
+
+def _raw(field: str) -> str:
+    return f'"{field}"::VARCHAR'
+
+
+def _sql_strings(field: str, values: Iterable[str]) -> str:
+    return f"{_raw(field)} IN ({', '.join(repr(json.dumps(v)) for v in values)})"
+
+
+def _sql_int_range(field: str, low: int, high: int) -> str:
+    return f"regexp_full_match({_raw(field)}, '-?[0-9]+') AND try_cast({_raw(field)} AS HUGEINT) BETWEEN {low} AND {high}"
+
+
+# Gate expressions over the raw JSON text of each field, exactly as
+# check_signal() judges the parsed value: strings keep their quotes, so
+# booleans, numbers-as-strings and floats-as-ints fail without extracting
+# anything. AND does not short-circuit in DuckDB, hence try_cast.
+_SQL_GATES = {
+    "G0": (
+        f"regexp_full_match({_raw('ts')}, '\"{ISO8601_PATTERN[1:-1]}\"') "
+        f"AND (NOT regexp_matches({_raw('ts')}, '^\"[0-9]{{4}}-') "
+        f"OR try_cast(substr({_raw('ts')}, 2, length({_raw('ts')}) - 3) AS TIMESTAMP) IS NOT NULL)"
+    ),
+    "G1": f"try_cast({_raw('mark')} AS DOUBLE) BETWEEN 0.0 AND 1.0",
+    "G2": _sql_strings("pull", PULL_DIRECTIONS),
+    "G3": f"starts_with({_raw('msg')}, '\"') AND length({_raw('msg')}) > 2",
+    "G4": _sql_strings("type", SIGNAL_TYPES),
+    "G5": _sql_strings("hive", HIVE_PHASES),
+    "G6": _sql_int_range("gen", MIN_GENERATION, 2 ** 64 - 1),
+    "G7": _sql_int_range("port", 0, MAX_PORT),
+}
+
+_SIGNAL_STRUCT = ", ".join(f"'{f}': \"{f}\"" for f in FIELDS)
+_JSON_COLUMNS = ", ".join(f"\"{f}\": 'JSON'" for f in FIELDS)
+_GATE_COLUMNS = ", ".join(f"coalesce({expr}, false) AS {g.lower()}" for g, expr in _SQL_GATES.items())
+_REASONS = ", ".join(f"CASE WHEN NOT {g.lower()} THEN '{gate_failure(g)}' END" for g in _SQL_GATES)
+_ALL_PASS = " AND ".join(g.lower() for g in _SQL_GATES)
+
+# Strict newline-delimited read (one object per line, typed as raw JSON per
+# field), all gates evaluated column-wise; only failing rows come back.
+VALIDATE_SQL = f"""
+SELECT count(*) AS signals,
+       list({{'record': record, 'signal': to_json({{{_SIGNAL_STRUCT}}}), 'reasons': [{_REASONS}]}} ORDER BY record)
+           FILTER (WHERE NOT ({_ALL_PASS})) AS failures
+FROM (
+    SELECT row_number() OVER () AS record, *, {_GATE_COLUMNS}
+    FROM read_json($path, format = 'newline_delimited', columns = {{{_JSON_COLUMNS}}})
+)
+"""
+
+# (1-based record number, reasons, offending JSON)
+Failure = Tuple[int, List[str], str]
+
+
+def _run_sql(con: duckdb.DuckDBPyConnection, path: Union[str, Path]) -> Tuple[int, List[Failure]]:
+    signals, rows = con.execute(VALIDATE_SQL, {"path": str(path)}).fetchone()
+    return signals, [
+        (row["record"], [r for r in row["reasons"] if r is not None], row["signal"]) for row in rows or []
+    ]
+
+
+def validate_file(con: duckdb.DuckDBPyConnection, path: Union[str, Path]) -> Tuple[int, List[Failure]]:
+    """
+    Validate a JSONL file (plain, .gz or .zst) in one vectorized pass; falls
+    back to validate_bytes() when the file has malformed lines.
+    """
+    try:
+        return _run_sql(con, path)
+    except duckdb.InvalidInputException:
+        # Legacy lines (UTF-16, two objects on one line) need the tolerant parser.
+        with _open_read(Path(path)) as fp:
+            return validate_bytes(con, fp.read())
+
+
+def validate_bytes(con: duckdb.DuckDBPyConnection, data: bytes) -> Tuple[int, List[Failure]]:
+    """
+    Validate raw JSONL bytes. Large, well-formed chunks take the vectorized
+    path through a temporary file; otherwise each line is parsed tolerantly
+    and checked with check_signal().
+    """
+    if len(data) >= FAST_PATH_BYTES and b"\x00" not in data:
+        fd, tmp = tempfile.mkstemp(suffix=".jsonl")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(data)
+            try:
+                return _run_sql(con, tmp)
+            except duckdb.InvalidInputException:
+                pass
+        finally:
+            os.unlink(tmp)
+
+    signals = 0
+    failures: List[Failure] = []
+    for raw in data.splitlines():
+        line = decode_line(raw)
+        if not line.strip():
+            continue
+        objects = list(parse_line(line))
+        reasons = [] if len(objects) == 1 else [f"PARSE FAIL: {len(objects) or 'no'} JSON objects on one line"]
+        for obj in objects:
+            reasons += [r for r in check_signal(obj) if r not in reasons]
+        signals += len(objects)
+        if reasons:
+            failures.append((max(signals, 1), reasons, line.strip()))
+    return signals, failures
+
+
+def quarantine(records: Iterable[dict], path: Union[str, Path] = DEFAULT_BLACKBOARD_PATH) -> int:
+    """Append quarantine records (source, signal, reasons, raw) to `<file>.quarantine.jsonl`."""
+    now = datetime.utcnow().isoformat(timespec="milliseconds") + "Z"
+    batch = [{"quarantined_at": now, **r} for r in records]
+    if batch:
+        get_writer(f"{path}.quarantine.jsonl").write(batch, sync=True)
+    return len(batch)
+
+
+def _new_report() -> dict:
+    return {"signals": 0, "failed": 0, "by_gate": {}, "sources": 0, "seconds": 0.0}
+
+
+class GateValidator:
+    """
+    Incremental validation of one blackboard. State in `<file>.gates.json`
+    records which sealed segments were checked and how far into the active
+    file, so each signal is validated and quarantined once.
+    """
+
+    def __init__(self, path: Union[str, Path] = DEFAULT_BLACKBOARD_PATH, write_quarantine: bool = True):
+        self.path = Path(path)
+        self.state_path = Path(f"{self.path}.gates.json")
+        self.write_quarantine = write_quarantine
+        self._con = duckdb.connect(":memory:")
+
+    # --- state ----------------------------------------------------------------
+
+    def _load(self) -> dict:
+        try:
+            return json.loads(self.state_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {"ino": None, "offset": 0, "signals": 0, "segments": [], "carry": None}
+
+    def _save(self, state: dict) -> None:
+        tmp = self.state_path.with_name(f".{self.state_path.name}.tmp")
+        tmp.write_text(json.dumps(state), encoding="utf-8")
+        os.replace(tmp, self.state_path)
+
+    # --- validation -------------------------------------------------------------
+
+    def _record(self, report: dict, source: str, result: Tuple[int, List[Failure]], base: int = 0, skip: int = 0) -> int:
+        signals, failures = result
+        failures = [f for f in failures if f[0] > skip]
+        report["signals"] += max(0, signals - skip)
+        report["failed"] += len(failures)
+        report["sources"] += 1
+        for _, reasons, _ in failures:
+            for reason in reasons:
+                gate = reason.split(" ", 1)[0]
+                report["by_gate"][gate] = report["by_gate"].get(gate, 0) + 1
+        if self.write_quarantine:
+            quarantine(
+                [
+                    {"source": source, "signal": base + n, "reasons": reasons, "raw": raw[:MAX_RAW_CHARS]}
+                    for n, reasons, raw in failures
+                ],
+                self.path,
+            )
+        return signals
+
+    def check_file(self, report: dict, path: Path, skip: int = 0) -> int:
+        return self._record(report, path.name, validate_file(self._con, path), skip=skip)
+
+    def check_bytes(self, report: dict, source: str, data: bytes, base: int = 0) -> int:
+        return self._record(report, source, validate_bytes(self._con, data), base=base)
+
+    def _segments(self, report: dict, state: dict) -> None:
+        directory = segments_dir(self.path)
+        for entry in load_manifest(self.path)["segments"]:
+            if entry["name"] in state["segments"]:
+                continue
+            # The first new segment after a rotation is the file we were tailing;
+            # its first `carry` signals were already checked as the active file.
+            carry, state["carry"] = state.get("carry") or 0, None
+            self.check_file(report, directory / entry["name"], skip=carry)
+            state["segments"].append(entry["name"])
+
+    def _active(self, report: dict, state: dict) -> None:
+        if not self.path.exists():
+            return
+        with open(self.path, "rb") as fp:
+            st = os.fstat(fp.fileno())
+            if st.st_ino != state["ino"] or st.st_size < state["offset"]:
+                # Rotated or truncated; after a rotation remember how much of the old file was checked.
+                rotated = state["ino"] is not None and st.st_ino != state["ino"]
+                state.update(ino=st.st_ino, offset=0, signals=0, carry=state["signals"] if rotated else None)
+            end = complete_size(fp, st.st_size)
+            if end <= state["offset"]:
+                return
+            fp.seek(state["offset"])
+            data = fp.read(end - state["offset"])
+        signals = self.check_bytes(report, self.path.name, data, base=state["signals"])
+        state.update(offset=end, signals=state["signals"] + signals)
+
+    def run(self, segments: bool = True) -> dict:
+        """Validate everything not yet validated; returns counts by gate."""
+        start = time.perf_counter()
+        report = _new_report()
+        self.state_path.parent.mkdir(parents=True, exist_ok=True)
+        with file_lock(self.state_path):
+            state = self._load()
+            self._active(report, state)
+            if segments:
+                self._segments(report, state)
+            self._save(state)
+        report["seconds"] = round(time.perf_counter() - start, 3)
+        return report
+
+    def follow(self, interval: float = 0.25, callback=None) -> None:
+        """Validate new appends forever, passing non-empty reports to `callback`."""
+        while True:
+            report = self.run(segments=True)
+            if report["signals"] and callback is not None:
+                callback(report)
+            time.sleep(interval)
+
+    def close(self) -> None:
+        self._con.close()
+
+
+def validate_blackboard(path: Union[str, Path] = DEFAULT_BLACKBOARD_PATH, full: bool = False) -> dict:
+    """
+    Incrementally validate and quarantine. With `full`, re-check every
+    segment and the whole active file as a report only (nothing is
+    quarantined twice).
+    """
+    if not full:
+        validator = GateValidator(path)
+        try:
+            return validator.run()
+        finally:
+            validator.close()
+
+    path = Path(path)
+    start = time.perf_counter()
+    report = _new_report()
+    validator = GateValidator(path, write_quarantine=False)
+    try:
+        directory = segments_dir(path)
+        for entry in load_manifest(path)["segments"]:
+            validator.check_file(report, directory / entry["name"])
+        if path.exists():
+            with open(path, "rb") as fp:
+                end = complete_size(fp, os.fstat(fp.fileno()).st_size)
+                fp.seek(0)
+                validator.check_bytes(report, path.name, fp.read(end))
+    finally:
+        validator.close()
+    report["seconds"] = round(time.perf_counter() - start, 3)
+    return report
+
+
+def format_report(report: dict) -> str:
+    """One-line summary for agent tool output."""
+    rate = report["signals"] / report["seconds"] if report["seconds"] else 0
+    gates = ", ".join(f"{g}: {n}" for g, n in sorted(report["by_gate"].items())) or "none"
+    return (
+        f"Validated {report['signals']} signals from {report['sources']} source(s) in {report['seconds']}s "
+        f"({rate:,.0f}/s): {report['failed']} failed. Failures by gate: {gates}"
+    )
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Validate blackboard signals against gates G0-G7")
+    parser.add_argument("--blackboard", default=str(DEFAULT_BLACKBOARD_PATH), help="Blackboard JSONL file")
+    parser.add_argument("--full", action="store_true", help="Re-check everything (report only)")
+    parser.add_argument("--follow", action="store_true", help="Keep validating new appends")
+    args = parser.parse_args(argv)
+
+    report = validate_blackboard(args.blackboard, full=args.full)
+    print(format_report(report))
+    if args.follow:
+        validator = GateValidator(args.blackboard)
+        try:
+            validator.follow(callback=lambda r: print(format_report(r), flush=True))
+        except KeyboardInterrupt:
+            pass
+        finally:
+            validator.close()
+    return 1 if report["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
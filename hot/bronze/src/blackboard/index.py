@@ -0,0 +1,424 @@
+"""
+Blackboard Offset Index
+=======================
+
+Sidecar index that answers "signals for port 4 in gen 87 since T" without
+scanning the log. Stored next to the blackboard as `<file>.idx/`:
+
+    HEADER          JSON: indexed byte offset, record count, log fingerprint
+    records.bin     one 32-byte record per signal, in log order
+    port=4.post     uint32 record numbers (native order), ascending, one file per value
+    hive=H.post     (likewise for gen=, type= and day=YYYYMMDD)
+
+Records are memory-mapped for the length of a query; posting lists are
+read into arrays, so no mapping outlives a call and update()/rebuild() can
+truncate or unlink the files (Windows refuses both while a file is
+mapped). A query picks the smallest posting list among its filters (the
+union of day lists for a time range), checks the remaining filters against
+the fixed-size records and only then seeks into the log, so cost follows
+the number of candidates rather than the log size.
+
+The index covers the active file only. After a rotation, query() scans
+the sealed segments the manifest does not rule out (see
+blackboard.segments.iter_signals) and filters them signal by signal,
+ahead of the indexed active file; query_offsets() stays active-only
+because its offsets are byte positions in the active file.
+
+`update()` indexes whatever complete lines were appended since the last
+run; it is cheap to call on every append (`attach_index(writer)`). HEADER
+is rewritten last, so a crash mid-update leaves extra tail entries that
+are ignored and overwritten next time. A truncated or replaced log is
+detected through the fingerprint and triggers a full rebuild.
+
+Usage:
+    python -m blackboard.index --port 4 --gen 87 --since 2025-12-30T00:00:00Z
+    python -m blackboard.index --rebuild
+"""
+
+import argparse
+import hashlib
+import json
+import mmap
+import os
+import shutil
+import struct
+import sys
+from array import array
+from collections import defaultdict
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple, Union
+
+from .locking import file_lock
+from .reader import complete_size, iter_records_from, read_signal
+from .signals import DEFAULT_BLACKBOARD_PATH, SIGNAL_TYPES
+
+INDEX_VERSION = 1
+# ts_ms, offset, length, gen, port, hive, type code, object position within the line
+RECORD = struct.Struct("<qQIHbcBB6x")
+TS_UNKNOWN = -(2 ** 63)
+PORT_UNKNOWN = -1
+GEN_UNKNOWN = 0
+HIVE_UNKNOWN = b"?"
+TYPE_OTHER = 255
+FINGERPRINT_BYTES = 4096
+
+
+def parse_ts(value) -> Optional[int]:
+    """ISO-8601 timestamp (or datetime) to epoch milliseconds; naive means UTC."""
+    if isinstance(value, datetime):
+        dt = value
+    elif isinstance(value, str):
+        try:
+            dt = datetime.fromisoformat(value.strip().replace("Z", "+00:00"))
+        except ValueError:
+            return None
+    else:
+        return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=timezone.utc)
+    return int(dt.timestamp() * 1000)
+
+
+def _day(ts_ms: int) -> str:
+    return datetime.fromtimestamp(ts_ms / 1000, tz=timezone.utc).strftime("%Y%m%d")
+
+
+def _int_field(signal: dict, key: str, default: int, lo: int, hi: int) -> int:
+    value = signal.get(key)
+    if isinstance(value, bool) or not isinstance(value, int) or not lo <= value <= hi:
+        return default
+    return value
+
+
+def encode_record(offset: int, length: int, sub: int, signal: dict) -> Tuple[bytes, Dict[str, str]]:
+    """Pack one signal into a record; also return its posting keys."""
+    ts_ms = parse_ts(signal.get("ts"))
+    gen = _int_field(signal, "gen", GEN_UNKNOWN, 0, 0xFFFF)
+    port = _int_field(signal, "port", PORT_UNKNOWN, 0, 127)
+    hive = signal.get("hive")
+    hive_b = hive.encode("ascii") if isinstance(hive, str) and len(hive) == 1 and hive.isascii() else HIVE_UNKNOWN
+    sig_type = signal.get("type")
+    type_code = SIGNAL_TYPES.index(sig_type) if sig_type in SIGNAL_TYPES else TYPE_OTHER
+
+    keys = {"type": str(sig_type) if type_code != TYPE_OTHER else "other"}
+    if hive_b != HIVE_UNKNOWN:
+        keys["hive"] = hive_b.decode("ascii")
+    if gen != GEN_UNKNOWN:
+        keys["gen"] = str(gen)
+    if port != PORT_UNKNOWN:
+        keys["port"] = str(port)
+    if ts_ms is not None:
+        keys["day"] = _day(ts_ms)
+    record = RECORD.pack(
+        TS_UNKNOWN if ts_ms is None else ts_ms,
+        offset, length, gen, port, hive_b, type_code, min(sub, 255),
+    )
+    return record, keys
+
+
+class BlackboardIndex:
+    """Memory-mapped offset index for one blackboard file."""
+
+    def __init__(self, path: Union[str, Path] = DEFAULT_BLACKBOARD_PATH):
+        self.path = Path(path)
+        self.dir = Path(f"{self.path}.idx")
+
+    # --- header -----------------------------------------------------------
+
+    def header(self) -> dict:
+        try:
+            return json.loads((self.dir / "HEADER").read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return {"version": INDEX_VERSION, "indexed_bytes": 0, "records": 0, "fingerprint": None}
+
+    def _write_header(self, header: dict) -> None:
+        tmp = self.dir / ".HEADER.tmp"
+        tmp.write_text(json.dumps(header), encoding="utf-8")
+        os.replace(tmp, self.dir / "HEADER")
+
+    def _fingerprint(self, fp, indexed_bytes: int) -> str:
+        fp.seek(0)
+        return hashlib.sha1(fp.read(min(indexed_bytes, FINGERPRINT_BYTES))).hexdigest()
+
+    # --- maintenance --------------------------------------------------------
+
+    def rebuild(self) -> dict:
+        """Drop the index and re-index the whole log."""
+        if not self.path.exists():
+            raise FileNotFoundError(self.path)
+        with file_lock(self.dir):
+            shutil.rmtree(self.dir, ignore_errors=True)
+            return self._update()
+
+    def update(self) -> dict:
+        """Index complete lines appended since the last update; returns the header."""
+        if not self.path.exists():
+            return self.header()
+        self.dir.mkdir(parents=True, exist_ok=True)
+        with file_lock(self.dir):
+            return self._update()
+
+    def _update(self) -> dict:
+        self.dir.mkdir(parents=True, exist_ok=True)
+        header = self.header()
+        with open(self.path, "rb") as fp:
+            size = os.fstat(fp.fileno()).st_size
+            start = header["indexed_bytes"]
+            if (
+                header.get("version") != INDEX_VERSION
+                or size < start
+                or (start and header.get("fingerprint") != self._fingerprint(fp, start))
+            ):
+                for f in self.dir.glob("*"):
+                    f.unlink()
+                header = {"version": INDEX_VERSION, "indexed_bytes": 0, "records": 0, "fingerprint": None}
+                start = 0
+            end = complete_size(fp, size)
+            if end <= start:
+                return header
+
+            count = header["records"]
+            records = bytearray()
+            postings: Dict[str, array] = defaultdict(lambda: array("I"))
+            for offset, length, sub, signal in iter_records_from(fp, start, end):
+                record, keys = encode_record(offset, length, sub, signal)
+                records += record
+                for field, value in keys.items():
+                    postings[f"{field}={value}"].append(count)
+                count += 1
+
+            self._append(self.dir / "records.bin", header["records"] * RECORD.size, records)
+            for name, numbers in postings.items():
+                self._append_posting(self.dir / f"{name}.post", header["records"], numbers)
+
+            header = {
+                "version": INDEX_VERSION,
+                "indexed_bytes": end,
+                "records": count,
+                "fingerprint": self._fingerprint(fp, end),
+            }
+        self._write_header(header)
+        return header
+
+    @staticmethod
+    def _append(path: Path, valid_size: int, data: bytes) -> None:
+        with open(path, "ab") as f:
+            if f.tell() != valid_size:
+                f.truncate(valid_size)  # drop the tail of an interrupted update
+            f.seek(valid_size)
+            f.write(data)
+
+    @staticmethod
+    def _append_posting(path: Path, valid_records: int, numbers: array) -> None:
+        with open(path, "a+b") as f:
+            keep = f.seek(0, os.SEEK_END) // 4
+            if keep:
+                f.seek((keep - 1) * 4)
+                if struct.unpack("=I", f.read(4))[0] >= valid_records:
+                    f.seek(0)
+                    keep = _bisect_left(array("I", f.read(keep * 4)), valid_records)
+            if keep * 4 != f.seek(0, os.SEEK_END):
+                f.truncate(keep * 4)
+            f.write(numbers.tobytes())
+
+    # --- queries ------------------------------------------------------------
+
+    def query(
+        self,
+        since=None,
+        until=None,
+        hive: Optional[str] = None,
+        port: Optional[int] = None,
+        gen: Optional[int] = None,
+        type: Optional[str] = None,
+        limit: Optional[int] = None,
+        refresh: bool = True,
+        include_sealed: bool = True,
+    ) -> Iterator[dict]:
+        """
+        Signals matching every given filter, in log order: sealed segments
+        first (unless `include_sealed` is False), then the active file.
+        `since` is inclusive and `until` exclusive (ISO strings or datetimes).
+        """
+        if limit is not None and limit <= 0:
+            return
+        found = 0
+        if include_sealed:
+            for signal in self._query_sealed(since, until, hive, port, gen, type):
+                yield signal
+                found += 1
+                if limit is not None and found >= limit:
+                    return
+        remaining = None if limit is None else limit - found
+        for _, signal in self.query_offsets(since, until, hive, port, gen, type, remaining, refresh):
+            yield signal
+
+    def _query_sealed(self, since, until, hive, port, gen, type) -> Iterator[dict]:
+        from .segments import iter_signals  # segments imports this module
+
+        since_ms = parse_ts(since) if since is not None else None
+        until_ms = parse_ts(until) if until is not None else None
+        type_code = None
+        if type is not None:
+            type_code = SIGNAL_TYPES.index(type) if type in SIGNAL_TYPES else TYPE_OTHER
+        for signal in iter_signals(self.path, since, gen, include_active=False, until=until, max_gen=gen):
+            record, _ = encode_record(0, 0, 0, signal)
+            if not _matches(RECORD.unpack(record), since_ms, until_ms, hive, port, gen, type_code):
+                continue
+            if type_code == TYPE_OTHER and signal.get("type") != type:
+                continue
+            yield signal
+
+    def query_offsets(
+        self,
+        since=None,
+        until=None,
+        hive: Optional[str] = None,
+        port: Optional[int] = None,
+        gen: Optional[int] = None,
+        type: Optional[str] = None,
+        limit: Optional[int] = None,
+        refresh: bool = True,
+    ) -> Iterator[Tuple[int, dict]]:
+        """Like query() but yields (byte offset, signal), from the active file only."""
+        header = self.update() if refresh else self.header()
+        total = header["records"]
+        if not total:
+            return
+        since_ms = parse_ts(since) if since is not None else None
+        until_ms = parse_ts(until) if until is not None else None
+        type_code = None
+        if type is not None:
+            type_code = SIGNAL_TYPES.index(type) if type in SIGNAL_TYPES else TYPE_OTHER
+
+        candidates = self._candidates(total, since_ms, until_ms, hive, port, gen, type)
+        with open(self.dir / "records.bin", "rb") as rf, open(self.path, "rb") as log:
+            if os.fstat(rf.fileno()).st_size < total * RECORD.size:
+                return
+            records = mmap.mmap(rf.fileno(), total * RECORD.size, access=mmap.ACCESS_READ)
+            try:
+                found = 0
+                for n in candidates:
+                    fields = RECORD.unpack_from(records, n * RECORD.size)
+                    if not _matches(fields, since_ms, until_ms, hive, port, gen, type_code):
+                        continue
+                    _, offset, length, _, _, _, _, sub = fields
+                    signal = read_signal(log, offset, length, sub)
+                    if signal is None:
+                        continue
+                    if type_code == TYPE_OTHER and signal.get("type") != type:
+                        continue
+                    yield offset, signal
+                    found += 1
+                    if limit is not None and found >= limit:
+                        return
+            finally:
+                records.close()
+
+    def count(self, field: str, value, refresh: bool = True) -> int:
+        """Number of signals with `field` == value, from the posting list alone."""
+        header = self.update() if refresh else self.header()
+        posting = _load_posting(self.dir / f"{field}={value}.post")
+        return _bisect_left(posting, header["records"]) if posting else 0
+
+    def values(self, field: str) -> List[str]:
+        """Distinct indexed values of a field (hive, port, gen, type, day)."""
+        prefix = f"{field}="
+        return sorted(p.stem[len(prefix):] for p in self.dir.glob(f"{prefix}*.post"))
+
+    def _candidates(self, total, since_ms, until_ms, hive, port, gen, type) -> Sequence[int]:
+        lists: List[Sequence[int]] = []
+        for field, value in (("hive", hive), ("port", port), ("gen", gen)):
+            if value is not None:
+                lists.append(self._posting(f"{field}={value}", total))
+        if type is not None:
+            lists.append(self._posting(f"type={type if type in SIGNAL_TYPES else 'other'}", total))
+        if since_ms is not None or until_ms is not None:
+            lo = _day(since_ms) if since_ms is not None else ""
+            hi = _day(until_ms) if until_ms is not None else "99999999"
+            days = [d for d in self.values("day") if lo <= d <= hi]
+            merged = sorted(n for d in days for n in self._posting(f"day={d}", total))
+            lists.append(merged)
+        if not lists:
+            return range(total)
+        return min(lists, key=len)
+
+    def _posting(self, name: str, total: int) -> Sequence[int]:
+        posting = _load_posting(self.dir / f"{name}.post")
+        if not posting:
+            return ()
+        return posting[:_bisect_left(posting, total)]
+
+
+def _matches(fields: tuple, since_ms, until_ms, hive, port, gen, type_code) -> bool:
+    """Whether an unpacked RECORD passes every given filter."""
+    ts_ms, _, _, r_gen, r_port, r_hive, r_type, _ = fields
+    if since_ms is not None and (ts_ms == TS_UNKNOWN or ts_ms < since_ms):
+        return False
+    if until_ms is not None and (ts_ms == TS_UNKNOWN or ts_ms >= until_ms):
+        return False
+    if hive is not None and r_hive != hive.encode("ascii", "replace"):
+        return False
+    if port is not None and r_port != port:
+        return False
+    if gen is not None and r_gen != gen:
+        return False
+    return type_code is None or r_type == type_code
+
+
+def _load_posting(path: Path) -> Sequence[int]:
+    """Read a posting file as an array of uint32 (ignoring a torn last entry)."""
+    posting = array("I")
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+    except OSError:
+        return ()
+    posting.frombytes(data[:len(data) - len(data) % 4])
+    return posting
+
+
+def _bisect_left(seq: Sequence[int], value: int) -> int:
+    lo, hi = 0, len(seq)
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if seq[mid] < value:
+            lo = mid + 1
+        else:
+            hi = mid
+    return lo
+
+
+def attach_index(writer) -> BlackboardIndex:
+    """Keep the index of `writer`'s file current after every appended batch."""
+    index = BlackboardIndex(writer.path)
+    writer.add_append_hook(lambda path, appended: index.update())
+    return index
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Query or rebuild the blackboard offset index")
+    parser.add_argument("--blackboard", default=str(DEFAULT_BLACKBOARD_PATH), help="Blackboard JSONL file")
+    parser.add_argument("--rebuild", action="store_true", help="Re-index the whole log")
+    parser.add_argument("--since", help="Inclusive ISO-8601 lower bound")
+    parser.add_argument("--until", help="Exclusive ISO-8601 upper bound")
+    parser.add_argument("--hive", choices=["H", "I", "V", "E", "X"])
+    parser.add_argument("--port", type=int)
+    parser.add_argument("--gen", type=int)
+    parser.add_argument("--type")
+    parser.add_argument("--limit", type=int)
+    args = parser.parse_args(argv)
+
+    index = BlackboardIndex(args.blackboard)
+    header = index.rebuild() if args.rebuild else index.update()
+    if args.rebuild:
+        print(f"Indexed {header['records']} signals ({header['indexed_bytes']} bytes)")
+        return 0
+    for signal in index.query(args.since, args.until, args.hive, args.port, args.gen, args.type, args.limit, refresh=False):
+        print(json.dumps(signal, ensure_ascii=False))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,336 @@
+"""
+Blackboard Time Order
+=====================
+
+The blackboard is appended in arrival order, not timestamp order: a
+2025-12-30T23:45 V signal sits between 2025-12-29T10:00 and 10:05 hunt
+signals. TimeOrderedReader yields signals in true timestamp order for any
+window with bounded memory.
+
+- Run generation: every sealed segment, and every RUN_BYTES chunk of the
+  active file, becomes one sorted run file. At most RUN_SIGNALS signals
+  are sorted in memory at a time; larger inputs spill sorted pieces to
+  temporary files that are merged into the run.
+- Runs are cached in `<file>.sorted/` next to a JSON header (count,
+  earliest/latest, sparse offsets). Segments are immutable and finished
+  active chunks are keyed by inode and start offset, so a query only sorts
+  the unfinished tail of the active file, in memory.
+- Queries k-way merge (heapq.merge) the runs whose time range overlaps the
+  window, seeking each one close to `since` through its sparse offsets.
+  Ties keep log order.
+- bounds() answers earliest/latest from the run headers alone.
+
+Signals whose ts does not parse cannot be placed in time; they are
+skipped and counted as undated.
+
+Usage:
+    for signal in iter_ordered(since="2025-12-30T00:00:00Z", until="2025-12-31T00:00:00Z"):
+        ...
+    python -m blackboard.ordered --since 2025-12-30T00:00:00Z --limit 20
+"""
+
+import argparse
+import hashlib
+import heapq
+import json
+import os
+import sys
+import tempfile
+from bisect import bisect_left
+from itertools import islice
+from pathlib import Path
+from typing import BinaryIO, Iterable, Iterator, List, Optional, Tuple, Union
+
+from .index import parse_ts
+from .locking import file_lock
+from .reader import complete_size, iter_records_from
+from .segments import _open_read, load_manifest, segments_dir
+from .signals import DEFAULT_BLACKBOARD_PATH
+
+RUN_BYTES = 16 * 1024 * 1024  # active-file chunk that becomes one cached run
+RUN_SIGNALS = 100_000  # signals sorted in memory before spilling
+SPARSE_EVERY = 1024  # lines between sparse offsets in a run header
+FINGERPRINT_BYTES = 4096
+
+# (ts_ms, run rank, position in run, signal): tuples sort by time, then log order.
+Entry = Tuple[int, int, int, dict]
+
+
+def sorted_dir(path: Union[str, Path] = DEFAULT_BLACKBOARD_PATH) -> Path:
+    return Path(f"{path}.sorted")
+
+
+def _ts_ms(signal: dict) -> Optional[int]:
+    ts = signal.get("ts")
+    return parse_ts(ts) if isinstance(ts, str) else None
+
+
+def _spill(entries: List[Tuple[int, int, bytes]]) -> Path:
+    entries.sort()
+    fd, name = tempfile.mkstemp(suffix=".run")
+    with os.fdopen(fd, "wb") as out:
+        for ms, n, line in entries:
+            out.write(b"%d %d %s\n" % (ms, n, line))
+    return Path(name)
+
+
+def _read_spill(path: Path) -> Iterator[Tuple[int, int, bytes]]:
+    with open(path, "rb") as fp:
+        for line in fp:
+            ms, n, body = line.rstrip(b"\n").split(b" ", 2)
+            yield int(ms), int(n), body
+
+
+def build_run(signals: Iterable[dict], target: Path, source: dict) -> dict:
+    """Sort `signals` into `target` (lines of "ts_ms json") and write its header; returns the header."""
+    pieces: List[Path] = []
+    buffer: List[Tuple[int, int, bytes]] = []
+    undated = 0
+    try:
+        for n, signal in enumerate(signals):
+            ms = _ts_ms(signal)
+            if ms is None:
+                undated += 1
+                continue
+            buffer.append((ms, n, json.dumps(signal, ensure_ascii=False, separators=(",", ":")).encode("utf-8")))
+            if len(buffer) >= RUN_SIGNALS:
+                pieces.append(_spill(buffer))
+                buffer = []
+        buffer.sort()
+
+        header = {"source": source, "count": 0, "undated": undated, "min_ms": None, "max_ms": None,
+                  "min_ts": None, "max_ts": None, "sparse": []}
+        tmp = target.with_name(f".{target.name}.tmp")
+        with open(tmp, "wb") as out:
+            offset = 0
+            for ms, _, body in heapq.merge(buffer, *(_read_spill(p) for p in pieces)):
+                if header["count"] % SPARSE_EVERY == 0:
+                    header["sparse"].append([ms, offset])
+                if header["min_ms"] is None:
+                    header["min_ms"], header["min_ts"] = ms, json.loads(body)["ts"]
+                header["max_ms"], last = ms, body
+                line = b"%d %s\n" % (ms, body)
+                out.write(line)
+                offset += len(line)
+                header["count"] += 1
+        if header["count"]:
+            header["max_ts"] = json.loads(last)["ts"]
+        os.replace(tmp, target)
+    finally:
+        for piece in pieces:
+            piece.unlink()
+    _write_header(target, header)
+    return header
+
+
+def _header_path(run: Path) -> Path:
+    return run.with_name(f"{run.name}.json")
+
+
+def _write_header(run: Path, header: dict) -> None:
+    path = _header_path(run)
+    tmp = path.with_name(f".{path.name}.tmp")
+    tmp.write_text(json.dumps(header, separators=(",", ":")), encoding="utf-8")
+    os.replace(tmp, path)
+
+
+def _read_header(run: Path, source: dict) -> Optional[dict]:
+    try:
+        header = json.loads(_header_path(run).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    return header if header.get("source") == source and run.exists() else None
+
+
+def iter_run(run: Path, header: dict, rank: int, since_ms: Optional[int], until_ms: Optional[int]) -> Iterator[Entry]:
+    """Entries of one run with since_ms <= ts < until_ms."""
+    start = 0
+    if since_ms is not None and header["sparse"]:
+        i = bisect_left([ms for ms, _ in header["sparse"]], since_ms)
+        start = header["sparse"][max(i - 1, 0)][1]
+    with open(run, "rb") as fp:
+        fp.seek(start)
+        for pos, line in enumerate(fp):
+            ms_text, body = line.split(b" ", 1)
+            ms = int(ms_text)
+            if since_ms is not None and ms < since_ms:
+                continue
+            if until_ms is not None and ms >= until_ms:
+                return
+            yield ms, rank, pos, json.loads(body)
+
+
+class TimeOrderedReader:
+    """Timestamp-ordered access to one blackboard (sealed segments + active file)."""
+
+    def __init__(self, path: Union[str, Path] = DEFAULT_BLACKBOARD_PATH, cache_dir: Optional[Union[str, Path]] = None):
+        self.path = Path(path)
+        self.cache_dir = Path(cache_dir) if cache_dir else sorted_dir(self.path)
+
+    # --- runs -----------------------------------------------------------------
+
+    def _snapshot(self) -> Tuple[List[Tuple[int, Path]], Optional[BinaryIO]]:
+        """Sealed/staged segment files and an open handle on the active file, taken atomically."""
+        with file_lock(self.path):
+            manifest = load_manifest(self.path)
+            try:
+                active = open(self.path, "rb")
+            except FileNotFoundError:
+                active = None
+        directory = segments_dir(self.path)
+        sealed = {e["seq"]: directory / e["name"] for e in manifest["segments"]}
+        segments = []
+        for seq in range(1, manifest["next_seq"]):
+            staging = directory / f".seg-{seq:06d}.jsonl"  # renamed, not sealed yet
+            if seq not in sealed and not staging.exists():
+                # Sealed since the manifest was read (or pruned).
+                sealed.update((e["seq"], directory / e["name"]) for e in load_manifest(self.path)["segments"])
+            for candidate in (sealed.get(seq), staging):
+                if candidate is not None and candidate.exists():
+                    segments.append((seq, candidate))
+                    break
+        return segments, active
+
+    def _segment_run(self, seq: int, segment: Path) -> Tuple[Path, dict]:
+        run = self.cache_dir / f"seg-{seq:06d}.run"
+        source = {"name": segment.name, "bytes": segment.stat().st_size}
+        header = _read_header(run, source)
+        if header is None:
+            with _open_read(segment) as fp:
+                header = build_run((s for _, _, _, s in iter_records_from(fp)), run, source)
+        return run, header
+
+    def _active_runs(self, fp: BinaryIO) -> Tuple[List[Tuple[Path, dict]], List[Entry], int]:
+        """Cached runs for finished RUN_BYTES chunks, the sorted in-memory tail and its undated count."""
+        st = os.fstat(fp.fileno())
+        end = complete_size(fp, st.st_size)
+        runs, start = [], 0
+        while start < end:
+            fp.seek(start)
+            head = hashlib.sha1(fp.read(min(FINGERPRINT_BYTES, end - start))).hexdigest()
+            run = self.cache_dir / f"active-{st.st_ino}-{start:012d}.run"
+            try:
+                header = json.loads(_header_path(run).read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                header = None
+            if header and (header["source"]["fingerprint"] != head or header["source"]["end"] > end):
+                header = None  # same inode and offset, different bytes: file was rewritten
+            if header is None:
+                if end - start < RUN_BYTES:
+                    break
+                fp.seek(start + RUN_BYTES)
+                fp.readline()  # finish the line that crosses the boundary
+                chunk_end = min(fp.tell(), end)
+                source = {"ino": st.st_ino, "start": start, "end": chunk_end, "fingerprint": head}
+                header = build_run((s for _, _, _, s in iter_records_from(fp, start, chunk_end)), run, source)
+            runs.append((run, header))
+            start = header["source"]["end"]
+
+        tail, undated = [], 0
+        for n, (_, _, _, signal) in enumerate(iter_records_from(fp, start, end)):
+            ms = _ts_ms(signal)
+            if ms is None:
+                undated += 1
+            else:
+                tail.append((ms, 0, n, signal))
+        tail.sort(key=lambda e: (e[0], e[2]))
+        return runs, tail, undated
+
+    def _prune_cache(self, segments: List[Tuple[int, Path]], ino: Optional[int]) -> None:
+        keep = {f"seg-{seq:06d}.run" for seq, _ in segments}
+        for child in self.cache_dir.iterdir():
+            name = child.name[:-5] if child.name.endswith(".json") else child.name
+            stale = (
+                (name.startswith("seg-") and name not in keep)
+                or (name.startswith("active-") and not name.startswith(f"active-{ino}-"))
+            )
+            if stale:
+                child.unlink(missing_ok=True)
+
+    def runs(self) -> Tuple[List[Tuple[Path, dict]], List[Entry], int]:
+        """Every cached run in log order (building missing ones), the active tail and its undated count."""
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        segments, active = self._snapshot()
+        try:
+            with file_lock(self.cache_dir):
+                runs = [self._segment_run(seq, segment) for seq, segment in segments]
+                tail: List[Entry] = []
+                ino, undated = None, 0
+                if active is not None:
+                    ino = os.fstat(active.fileno()).st_ino
+                    active_runs, tail, undated = self._active_runs(active)
+                    runs += active_runs
+                self._prune_cache(segments, ino)
+        finally:
+            if active is not None:
+                active.close()
+        # Re-rank the tail after the cached runs.
+        tail = [(ms, len(runs), pos, signal) for ms, _, pos, signal in tail]
+        return runs, tail, undated
+
+    # --- queries --------------------------------------------------------------
+
+    def iter(self, since=None, until=None) -> Iterator[dict]:
+        """Signals with since <= ts < until (ISO strings or datetimes) in timestamp order."""
+        since_ms = parse_ts(since) if since is not None else None
+        until_ms = parse_ts(until) if until is not None else None
+        runs, tail, _ = self.runs()
+        streams = [
+            iter_run(run, header, rank, since_ms, until_ms)
+            for rank, (run, header) in enumerate(runs)
+            if header["count"]
+            and (since_ms is None or header["max_ms"] >= since_ms)
+            and (until_ms is None or header["min_ms"] < until_ms)
+        ]
+        streams.append(
+            e for e in tail if (since_ms is None or e[0] >= since_ms) and (until_ms is None or e[0] < until_ms)
+        )
+        for _, _, _, signal in heapq.merge(*streams):
+            yield signal
+
+    def bounds(self) -> dict:
+        """Earliest and latest signal time over the whole log, plus counts."""
+        runs, tail, undated = self.runs()
+        result = {"earliest": None, "latest": None, "signals": 0, "undated": undated}
+        low = high = None
+        for _, header in runs:
+            result["signals"] += header["count"]
+            result["undated"] += header["undated"]
+            if header["count"] and (low is None or header["min_ms"] < low):
+                low, result["earliest"] = header["min_ms"], header["min_ts"]
+            if header["count"] and (high is None or header["max_ms"] >= high):
+                high, result["latest"] = header["max_ms"], header["max_ts"]
+        if tail:
+            result["signals"] += len(tail)
+            if low is None or tail[0][0] < low:
+                result["earliest"] = tail[0][3]["ts"]
+            if high is None or tail[-1][0] >= high:
+                result["latest"] = tail[-1][3]["ts"]
+        return result
+
+
+def iter_ordered(path: Union[str, Path] = DEFAULT_BLACKBOARD_PATH, since=None, until=None) -> Iterator[dict]:
+    """TimeOrderedReader(path).iter(since, until)."""
+    return TimeOrderedReader(path).iter(since, until)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Read blackboard signals in timestamp order")
+    parser.add_argument("--blackboard", default=str(DEFAULT_BLACKBOARD_PATH), help="Blackboard JSONL file")
+    parser.add_argument("--since", help="ISO timestamp (inclusive)")
+    parser.add_argument("--until", help="ISO timestamp (exclusive)")
+    parser.add_argument("--limit", type=int)
+    parser.add_argument("--bounds", action="store_true", help="Only print earliest/latest")
+    args = parser.parse_args(argv)
+
+    reader = TimeOrderedReader(args.blackboard)
+    if args.bounds:
+        print(json.dumps(reader.bounds()))
+        return 0
+    for signal in islice(reader.iter(args.since, args.until), args.limit):
+        print(json.dumps(signal, ensure_ascii=False))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
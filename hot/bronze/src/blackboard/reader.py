@@ -0,0 +1,67 @@
+"""
+Blackboard Reader
+=================
+
+Byte-offset aware iteration over a blackboard file, the primitive the
+index, aggregators and followers build on.
+"""
+
+from pathlib import Path
+from typing import BinaryIO, Iterator, Optional, Tuple, Union
+
+from .signals import DEFAULT_BLACKBOARD_PATH, decode_line, parse_line
+
+# (line offset, line length in bytes, position of the object within the line, signal)
+Record = Tuple[int, int, int, dict]
+
+
+def iter_records_from(fp: BinaryIO, start: int = 0, end: Optional[int] = None) -> Iterator[Record]:
+    """
+    Yield every signal in complete lines between `start` and `end`.
+
+    A trailing line without a newline is left alone (it may still be
+    being written); callers resume from the offset after the last
+    complete line.
+    """
+    fp.seek(start)
+    offset = start
+    while end is None or offset < end:
+        raw = fp.readline()
+        if not raw or not raw.endswith(b"\n"):
+            return
+        for sub, signal in enumerate(parse_line(decode_line(raw))):
+            yield offset, len(raw), sub, signal
+        offset += len(raw)
+
+
+def iter_records(
+    path: Union[str, Path] = DEFAULT_BLACKBOARD_PATH,
+    start: int = 0,
+    end: Optional[int] = None,
+) -> Iterator[Record]:
+    """iter_records_from() over a path."""
+    with open(path, "rb") as fp:
+        yield from iter_records_from(fp, start, end)
+
+
+def complete_size(fp: BinaryIO, size: int) -> int:
+    """Offset just past the last newline at or before `size`."""
+    pos = size
+    while pos > 0:
+        step = min(4096, pos)
+        fp.seek(pos - step)
+        chunk = fp.read(step)
+        nl = chunk.rfind(b"\n")
+        if nl >= 0:
+            return pos - step + nl + 1
+        pos -= step
+    return 0
+
+
+def read_signal(fp: BinaryIO, offset: int, length: int, sub: int = 0) -> Optional[dict]:
+    """Read the `sub`-th signal of the line at `offset`."""
+    fp.seek(offset)
+    for i, signal in enumerate(parse_line(decode_line(fp.read(length)))):
+        if i == sub:
+            return signal
+    return None
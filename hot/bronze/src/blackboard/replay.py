@@ -0,0 +1,458 @@
+"""
+Blackboard Replay
+=================
+
+Load generator for the blackboard consumers. Re-emits the history of a
+source blackboard, in timestamp order, into a scratch blackboard while the
+consumers under test tail it in their own processes, and reports how far
+behind each one falls.
+
+- Pacing: each stage replays at a speed multiplier of the recorded gaps
+  (1 = real time, 10 = ten times faster) or at max speed. Idle gaps are
+  capped at --max-gap seconds of recorded time so a quiet night does not
+  stall a stage. The source loops when it runs out.
+- Fan-out: every source signal is written `fanout` times; port and gen
+  jitter spread the copies over other ports (mod 8) and generations.
+  Signals are re-stamped with the time they are written.
+- Consumers: follow (a Subscription-style Follower), aggregate (the
+  dashboard's BlackboardAggregator), gates (GateValidator, needs duckdb)
+  and sequence (SequenceMonitor, not emitting violations).
+- Lag: the age of the oldest signal a consumer has not processed yet,
+  sampled while the producer runs; throughput is signals processed per
+  second. A consumer is behind when its lag at the end of a stage exceeds
+  --max-lag; a ramp stops at the first stage where that happens.
+
+The target blackboard and its known sidecars (SIDECAR_SUFFIXES: index,
+segments, sorted runs, columnar store, consumer state and lock files) are
+deleted before a run; nothing else is. A target in the source's directory,
+or one whose sidecars would include the source or its sidecars, is refused.
+
+Usage:
+    python -m blackboard.replay --speed 1,10,100,max --duration 10
+    python -m blackboard.replay --speed max --fanout 8 --port-jitter 7 --consumers follow,gates
+"""
+
+import argparse
+import json
+import multiprocessing
+import random
+import shutil
+import sys
+import tempfile
+import time
+from bisect import bisect_right
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional, Tuple, Union
+
+from .aggregate import BlackboardAggregator
+from .follow import Follower
+from .index import parse_ts
+from .ordered import iter_ordered
+from .sequence import SequenceMonitor
+from .signals import DEFAULT_BLACKBOARD_PATH, MAX_PORT, MIN_GENERATION
+from .writer import BlackboardWriter
+
+DEFAULT_TARGET = Path(tempfile.gettempdir()) / "hfo-replay" / "blackboard.jsonl"
+CONSUMER_NAMES = ("follow", "aggregate", "gates", "sequence")
+BATCH_SIGNALS = 256
+SAMPLE_INTERVAL = 0.05
+POLL_INTERVAL = 0.05
+READY_TIMEOUT = 60.0
+# Files and directories the blackboard modules keep next to `<file>`, as suffixes of its name.
+SIDECAR_SUFFIXES = (
+    ".idx",
+    ".segments",
+    ".sorted",
+    ".columnar",
+    ".agg.json",
+    ".gates.json",
+    ".sequence.json",
+    ".quarantine.jsonl",
+    ".ring",
+)
+
+Step = Callable[[float], int]
+
+
+# --- consumers ------------------------------------------------------------------
+# Each factory returns step(timeout) -> signals processed so far; a step
+# blocks for at most `timeout` when there is nothing new.
+
+
+def _follow(path: Path) -> Step:
+    follower = Follower(path, offset=0)
+    seen = [0]
+
+    def step(timeout: float) -> int:
+        seen[0] += len(follower.wait(timeout))
+        return seen[0]
+
+    return step
+
+
+def _aggregate(path: Path) -> Step:
+    aggregator = BlackboardAggregator(path)
+
+    def step(timeout: float) -> int:
+        total = aggregator.refresh()["total"]
+        if not aggregator.last_refresh["new_signals"]:
+            time.sleep(timeout)
+        return total
+
+    return step
+
+
+def _gates(path: Path) -> Step:
+    from .gates import GateValidator  # needs duckdb
+
+    validator = GateValidator(path, write_quarantine=False)
+    seen = [0]
+
+    def step(timeout: float) -> int:
+        new = validator.run()["signals"]
+        seen[0] += new
+        if not new:
+            time.sleep(timeout)
+        return seen[0]
+
+    return step
+
+
+def _sequence(path: Path) -> Step:
+    monitor = SequenceMonitor(path, emit=False)
+
+    def step(timeout: float) -> int:
+        monitor.run_once(timeout)
+        return monitor.detector.counts["signals"]
+
+    return step
+
+
+CONSUMERS: Dict[str, Callable[[Path], Step]] = {
+    "follow": _follow,
+    "aggregate": _aggregate,
+    "gates": _gates,
+    "sequence": _sequence,
+}
+
+
+def _consume(name: str, path: str, processed, ready, stop) -> None:
+    """Consumer process: report the running count in `processed` until `stop`."""
+    step = CONSUMERS[name](Path(path))
+    ready.set()
+    while not stop.is_set():
+        processed.value = step(POLL_INTERVAL)
+
+
+# --- producer ---------------------------------------------------------------------
+
+
+def sidecars(path: Union[str, Path]) -> List[Path]:
+    """A blackboard file, its sidecars, their lock files and their atomic-write temp files."""
+    path = Path(path)
+    paths = []
+    for suffix in ("",) + SIDECAR_SUFFIXES:
+        name = f"{path.name}{suffix}"
+        paths += [path.with_name(name), path.with_name(f"{name}.lock"), path.with_name(f".{name}.tmp")]
+    return paths
+
+
+def check_target(source: Union[str, Path], target: Union[str, Path]) -> None:
+    """Raise ValueError unless resetting `target` is guaranteed to leave `source` alone."""
+    source, target = Path(source).resolve(), Path(target).resolve()
+    if target.parent == source.parent:
+        raise ValueError(f"replay target {target} must not be in the source's directory {source.parent}")
+    protected = set(sidecars(source))
+    for path in sidecars(target):
+        if path in protected or source.is_relative_to(path):
+            raise ValueError(f"replay target {target} would delete {path}, which holds the source {source} or its sidecars")
+
+
+def reset_target(target: Union[str, Path], source: Union[str, Path]) -> None:
+    """Delete a scratch blackboard and its known sidecars, refusing anything that touches `source`."""
+    check_target(source, target)
+    for path in sidecars(target):
+        if path.is_dir() and not path.is_symlink():
+            shutil.rmtree(path)
+        elif path.exists() or path.is_symlink():
+            path.unlink()
+
+
+def parse_speeds(spec: str) -> List[Optional[float]]:
+    """'1,10,max' -> [1.0, 10.0, None]; None is max speed."""
+    speeds = []
+    for part in spec.split(","):
+        part = part.strip().lower()
+        if part in ("max", "0"):
+            speeds.append(None)
+        else:
+            value = float(part.rstrip("x"))
+            if value <= 0:
+                raise ValueError(f"speed must be positive: {part}")
+            speeds.append(value)
+    return speeds
+
+
+def _percentile(values: List[float], q: float) -> float:
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+class Replay:
+    """Re-emit a blackboard's history into a scratch blackboard and measure its consumers."""
+
+    def __init__(
+        self,
+        source: Union[str, Path] = DEFAULT_BLACKBOARD_PATH,
+        target: Union[str, Path] = DEFAULT_TARGET,
+        fanout: int = 1,
+        port_jitter: int = 0,
+        gen_jitter: int = 0,
+        max_gap: float = 5.0,
+        seed: Optional[int] = None,
+    ):
+        self.source = Path(source)
+        self.target = Path(target)
+        check_target(self.source, self.target)
+        if fanout < 1:
+            raise ValueError("fanout must be at least 1")
+        self.fanout = fanout
+        self.port_jitter = port_jitter
+        self.gen_jitter = gen_jitter
+        self.max_gap = max_gap
+        self._rng = random.Random(seed)
+
+    def signals(self) -> Iterator[Tuple[float, dict]]:
+        """(recorded gap in seconds, signal) forever, looping over the source."""
+        while True:
+            previous = None
+            replayed = 0
+            for signal in iter_ordered(self.source):
+                ms = parse_ts(signal["ts"])
+                gap = 0.0 if previous is None else min(self.max_gap, max(0, ms - previous) / 1000)
+                previous = ms
+                replayed += 1
+                yield gap, signal
+            if not replayed:
+                raise ValueError(f"no dated signals to replay in {self.source}")
+
+    def copies(self, signal: dict, ts: str) -> List[dict]:
+        """The `fanout` re-stamped, jittered signals written for one source signal."""
+        result = []
+        for _ in range(self.fanout):
+            copy = dict(signal, ts=ts)
+            port, gen = copy.get("port"), copy.get("gen")
+            if self.port_jitter and isinstance(port, int) and 0 <= port <= MAX_PORT:
+                copy["port"] = (port + self._rng.randint(-self.port_jitter, self.port_jitter)) % (MAX_PORT + 1)
+            if self.gen_jitter and isinstance(gen, int) and not isinstance(gen, bool):
+                copy["gen"] = max(MIN_GENERATION, gen + self._rng.randint(-self.gen_jitter, self.gen_jitter))
+            result.append(copy)
+        return result
+
+    def run(
+        self,
+        speeds: List[Optional[float]],
+        duration: float = 10.0,
+        consumers: Tuple[str, ...] = CONSUMER_NAMES,
+        max_lag: float = 1.0,
+        drain: float = 30.0,
+    ) -> dict:
+        """Replay one stage per speed, then wait up to `drain` seconds for the consumers to catch up."""
+        for name in consumers:
+            if name not in CONSUMERS:
+                raise ValueError(f"unknown consumer: {name}")
+        reset_target(self.target, self.source)
+        self.target.parent.mkdir(parents=True, exist_ok=True)
+        self.target.touch()
+
+        stop = multiprocessing.Event()
+        procs = {}
+        for name in consumers:
+            processed, ready = multiprocessing.Value("q", 0), multiprocessing.Event()
+            proc = multiprocessing.Process(
+                target=_consume, args=(name, str(self.target), processed, ready, stop), name=f"replay-{name}", daemon=True
+            )
+            proc.start()
+            procs[name] = (proc, processed, ready)
+        writer = BlackboardWriter(self.target, fsync_interval=None)
+        try:
+            for name, (proc, _, ready) in procs.items():
+                if not ready.wait(READY_TIMEOUT):
+                    raise RuntimeError(f"consumer {name} did not start")
+            self._counts = {name: processed for name, (_, processed, _) in procs.items()}
+            self._ends: List[int] = []  # cumulative signals after each write
+            self._times: List[float] = []  # when each write became visible
+            source = self.signals()
+            stages = []
+            for speed in speeds:
+                stage = self._stage(writer, source, speed, duration, max_lag)
+                stages.append(stage)
+                if stage["behind"]:
+                    break
+            caught_up = self._drain(drain)
+        finally:
+            stop.set()
+            for proc, _, _ in procs.values():
+                proc.join(5)
+                if proc.is_alive():
+                    proc.terminate()
+            writer.close()
+
+        behind = next((s for s in stages if s["behind"]), None)
+        return {
+            "source": str(self.source),
+            "target": str(self.target),
+            "fanout": self.fanout,
+            "emitted": self._ends[-1] if self._ends else 0,
+            "stages": stages,
+            "falls_behind_at": behind["speed"] if behind else None,
+            "caught_up_after": caught_up,
+            "exited": {name: proc.exitcode for name, (proc, _, _) in procs.items() if proc.exitcode},
+        }
+
+    def _lag(self, processed: int, now: float) -> float:
+        i = bisect_right(self._ends, processed)
+        return now - self._times[i] if i < len(self._ends) else 0.0
+
+    def _sample(self, samples: Dict[str, List[float]]) -> None:
+        now = time.monotonic()
+        for name, processed in self._counts.items():
+            samples[name].append(self._lag(processed.value, now))
+
+    def _stage(self, writer: BlackboardWriter, source, speed: Optional[float], duration: float, max_lag: float) -> dict:
+        emitted_before = self._ends[-1] if self._ends else 0
+        counts_before = {name: processed.value for name, processed in self._counts.items()}
+        samples = {name: [] for name in self._counts}
+        start = time.monotonic()
+        end = start + duration
+        due = start
+        next_sample = start
+        pending = None
+        while True:
+            now = time.monotonic()
+            if now >= end:
+                break
+            ts = datetime.utcnow().isoformat(timespec="milliseconds") + "Z"
+            batch = []
+            while len(batch) < BATCH_SIGNALS:
+                if pending is None:
+                    pending = next(source)
+                gap, signal = pending
+                if speed is not None:
+                    if due + gap / speed > now:
+                        break
+                    due += gap / speed
+                batch.extend(self.copies(signal, ts))
+                pending = None
+            if batch:
+                writer.write(batch)
+                self._ends.append((self._ends[-1] if self._ends else 0) + len(batch))
+                self._times.append(time.monotonic())
+            now = time.monotonic()
+            if now >= next_sample:
+                self._sample(samples)
+                next_sample = now + SAMPLE_INTERVAL
+            if not batch:
+                time.sleep(max(0.0, min(due + pending[0] / speed, next_sample, end) - now))
+
+        seconds = time.monotonic() - start
+        self._sample(samples)
+        emitted = (self._ends[-1] if self._ends else 0) - emitted_before
+        report = {
+            "speed": "max" if speed is None else f"{speed:g}x",
+            "seconds": round(seconds, 3),
+            "emitted": emitted,
+            "rate": round(emitted / seconds, 1),
+            "consumers": {},
+            "behind": [],
+        }
+        for name, processed in self._counts.items():
+            lags = samples[name]
+            report["consumers"][name] = {
+                "processed": processed.value - counts_before[name],
+                "rate": round((processed.value - counts_before[name]) / seconds, 1),
+                "lag_p50": round(_percentile(lags, 0.50), 3),
+                "lag_p95": round(_percentile(lags, 0.95), 3),
+                "lag_max": round(max(lags), 3),
+                "lag_end": round(lags[-1], 3),
+            }
+            if lags[-1] > max_lag:
+                report["behind"].append(name)
+        return report
+
+    def _drain(self, timeout: float) -> Dict[str, Optional[float]]:
+        """Seconds each consumer needed after the last write to process everything (None: timed out)."""
+        total = self._ends[-1] if self._ends else 0
+        start = time.monotonic()
+        caught_up = {}
+        while len(caught_up) < len(self._counts):
+            now = time.monotonic()
+            for name, processed in self._counts.items():
+                if name not in caught_up and processed.value >= total:
+                    caught_up[name] = round(now - start, 3)
+            if now - start >= timeout:
+                break
+            time.sleep(SAMPLE_INTERVAL)
+        return {name: caught_up.get(name) for name in self._counts}
+
+
+def format_report(report: dict) -> str:
+    lines = [f"Replayed {report['emitted']} signals from {report['source']} into {report['target']} (fan-out {report['fanout']})"]
+    lines.append(f"{'stage':>7} {'emit/s':>10}  {'consumer':<10} {'proc/s':>10} {'p50 lag':>8} {'p95 lag':>8} {'max lag':>8} {'end lag':>8}")
+    for stage in report["stages"]:
+        for i, (name, c) in enumerate(stage["consumers"].items()):
+            head = f"{stage['speed']:>7} {stage['rate']:>10.1f}" if i == 0 else " " * 18
+            mark = "  BEHIND" if name in stage["behind"] else ""
+            lines.append(
+                f"{head}  {name:<10} {c['rate']:>10.1f} {c['lag_p50']:>7.3f}s {c['lag_p95']:>7.3f}s "
+                f"{c['lag_max']:>7.3f}s {c['lag_end']:>7.3f}s{mark}"
+            )
+    if report["falls_behind_at"]:
+        lines.append(f"Consumers fall behind at {report['falls_behind_at']}")
+    else:
+        lines.append("Consumers kept up at every stage")
+    lines.append(
+        "Caught up after the last write: "
+        + ", ".join(f"{name} {'timed out' if s is None else f'{s:.2f}s'}" for name, s in report["caught_up_after"].items())
+    )
+    for name, code in report["exited"].items():
+        lines.append(f"Consumer {name} exited with code {code}")
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Replay blackboard history to load-test its consumers")
+    parser.add_argument("--blackboard", default=str(DEFAULT_BLACKBOARD_PATH), help="Source blackboard JSONL file")
+    parser.add_argument("--target", default=str(DEFAULT_TARGET), help="Scratch blackboard to write (deleted first)")
+    parser.add_argument("--speed", default="1", help="Comma-separated stages: multipliers of real time or 'max'")
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds per stage")
+    parser.add_argument("--fanout", type=int, default=1, help="Copies written per source signal")
+    parser.add_argument("--port-jitter", type=int, default=0, help="Shift copies by up to +/-N ports")
+    parser.add_argument("--gen-jitter", type=int, default=0, help="Shift copies by up to +/-N generations")
+    parser.add_argument("--max-gap", type=float, default=5.0, help="Cap on a recorded gap between signals (seconds)")
+    parser.add_argument("--consumers", default=",".join(CONSUMER_NAMES), help="Comma-separated: " + ", ".join(CONSUMER_NAMES))
+    parser.add_argument("--max-lag", type=float, default=1.0, help="End-of-stage lag (seconds) that counts as behind")
+    parser.add_argument("--drain", type=float, default=30.0, help="Seconds to wait for consumers after the last stage")
+    parser.add_argument("--seed", type=int, help="Seed for the jitter")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args(argv)
+
+    replay = Replay(
+        args.blackboard, args.target, args.fanout, args.port_jitter, args.gen_jitter, args.max_gap, args.seed
+    )
+    report = replay.run(
+        parse_speeds(args.speed),
+        args.duration,
+        tuple(c.strip() for c in args.consumers.split(",") if c.strip()),
+        args.max_lag,
+        args.drain,
+    )
+    print(json.dumps(report, indent=2) if args.json else format_report(report))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,553 @@
+"""
+Blackboard Shared-Memory Ring
+=============================
+
+Optional in-host transport for high emit rates: commander processes put
+encoded signals into a shared-memory ring of fixed-size slots, and one
+drainer process appends them to the JSONL blackboard in large batches.
+Emitting costs a slot claim and a memcpy (microseconds) instead of a
+locked file append; the JSONL file stays the durable log and subscribers
+keep following it as before.
+
+- Layout: a header (claim and drain counters, overflow counters, drainer
+  pid and heartbeat) followed by `slots` slots of `slot_size` bytes. A
+  slot holds its sequence number, the record length and the encoded
+  JSONL line.
+- Producers claim the next slot under a short flock on `<file>.ring.lock`,
+  then take it again to copy the record in and publish it by writing the
+  slot's sequence number last. The drainer (the only consumer) reads
+  published slots in order, writes them with one append and only then
+  frees them.
+- Backpressure: when the ring is full a producer waits up to
+  `block_timeout` for the drainer ("block"), or gives up at once
+  ("direct" or "drop"). Signals that do not go through the ring — ring
+  full, record larger than a slot, drainer not running — are appended
+  directly through BlackboardWriter, except with "drop". Every case is
+  counted in the header.
+- A slot claimed by a producer that died before publishing it is skipped
+  after ABANDON_AFTER seconds and counted as abandoned. The drainer skips
+  it under the ring lock by moving `tail` past it, and a producer only
+  writes its slot while `tail` has not passed it, so one that was merely
+  slow appends directly instead (counted as late) and can never overwrite
+  the slot after it has been reused.
+
+Set HFO_BLACKBOARD_TRANSPORT=ring to make emit_signal() use the ring
+whenever a drainer is running for the blackboard.
+
+Usage:
+    python -m blackboard.ring serve            # the drainer
+    python -m blackboard.ring stats
+    python -m blackboard.ring bench --producers 4 --signals 20000   # into a scratch file
+"""
+
+import argparse
+import hashlib
+import json
+import multiprocessing
+import os
+import signal as signals_module
+import struct
+import sys
+import tempfile
+import threading
+import time
+from multiprocessing import resource_tracker, shared_memory
+from pathlib import Path
+from typing import Callable, List, Optional, Union
+
+from .locking import _lock, _unlock
+from .signals import DEFAULT_BLACKBOARD_PATH, encode_signal, make_signal
+from .writer import AppendHook, BlackboardWriter, get_writer
+
+MAGIC = b"HFOR"
+VERSION = 2
+DEFAULT_SLOTS = 1 << 16
+DEFAULT_SLOT_SIZE = 512
+DRAIN_BATCH = 4096
+IDLE_SLEEP = 0.001
+HEARTBEAT_STALE = 2.0
+ABANDON_AFTER = 1.0
+PRODUCER_RECHECK = 1.0
+BENCH_TARGET = Path(tempfile.gettempdir()) / "hfo-ring-bench" / "blackboard.jsonl"
+
+# magic, version, slots, slot_size, then the u64 counters and the heartbeat.
+HEADER = struct.Struct("<4sIIIQQQQQQQQQQd")
+COUNTERS = ("head", "tail", "overflow", "dropped", "blocked", "oversize", "direct", "abandoned", "late", "pid")
+HEADER_SIZE = 128
+SLOT = struct.Struct("<QI4x")  # sequence number (claim index + 1), record length
+
+_U32 = struct.Struct("<I")
+_U64 = struct.Struct("<Q")
+_F64 = struct.Struct("<d")
+_OFFSETS = {name: 16 + 8 * i for i, name in enumerate(COUNTERS)}
+_HEARTBEAT = 16 + 8 * len(COUNTERS)
+
+
+def ring_name(path: Union[str, Path] = DEFAULT_BLACKBOARD_PATH) -> str:
+    """Shared-memory segment name for a blackboard file."""
+    return "hfo-bb-" + hashlib.sha1(str(Path(path).resolve()).encode("utf-8")).hexdigest()[:16]
+
+
+_owned = set()  # rings created (and tracked for cleanup) by this process
+
+
+def _attach(name: str) -> shared_memory.SharedMemory:
+    shm = shared_memory.SharedMemory(name)
+    if name not in _owned:
+        # Attaching registers the segment with this process's resource tracker,
+        # which would unlink it when we exit; only the drainer owns it.
+        resource_tracker.unregister(shm._name, "shared_memory")
+    return shm
+
+
+if os.name == "nt":
+    import ctypes
+    from ctypes import wintypes
+
+    _kernel32 = ctypes.WinDLL("kernel32", use_last_error=True)
+    _kernel32.OpenProcess.restype = wintypes.HANDLE
+    _kernel32.OpenProcess.argtypes = (wintypes.DWORD, wintypes.BOOL, wintypes.DWORD)
+    _kernel32.GetExitCodeProcess.argtypes = (wintypes.HANDLE, ctypes.POINTER(wintypes.DWORD))
+    _kernel32.CloseHandle.argtypes = (wintypes.HANDLE,)
+    _PROCESS_QUERY_LIMITED_INFORMATION = 0x1000
+    _ERROR_ACCESS_DENIED = 5
+    _STILL_ACTIVE = 259
+
+    def _pid_alive(pid: int) -> bool:
+        # os.kill(pid, 0) would terminate the process on Windows.
+        handle = _kernel32.OpenProcess(_PROCESS_QUERY_LIMITED_INFORMATION, False, pid)
+        if not handle:
+            return ctypes.get_last_error() == _ERROR_ACCESS_DENIED
+        try:
+            code = wintypes.DWORD()
+            if not _kernel32.GetExitCodeProcess(handle, ctypes.byref(code)):
+                return True
+            return code.value == _STILL_ACTIVE
+        finally:
+            _kernel32.CloseHandle(handle)
+else:
+    def _pid_alive(pid: int) -> bool:
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return False
+        except PermissionError:
+            return True
+        return True
+
+
+class _Ring:
+    """Typed access to a mapped ring."""
+
+    def __init__(self, shm: shared_memory.SharedMemory):
+        self.shm = shm
+        self.buf = shm.buf
+        magic, version, slots, slot_size = HEADER.unpack_from(self.buf)[:4]
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{shm.name} is not a version {VERSION} blackboard ring")
+        self.slots = slots
+        self.slot_size = slot_size
+        self.payload = slot_size - SLOT.size
+
+    def get(self, name: str) -> int:
+        return _U64.unpack_from(self.buf, _OFFSETS[name])[0]
+
+    def set(self, name: str, value: int) -> None:
+        _U64.pack_into(self.buf, _OFFSETS[name], value)
+
+    def add(self, name: str, n: int = 1) -> None:
+        self.set(name, self.get(name) + n)
+
+    @property
+    def heartbeat(self) -> float:
+        return _F64.unpack_from(self.buf, _HEARTBEAT)[0]
+
+    @heartbeat.setter
+    def heartbeat(self, value: float) -> None:
+        _F64.pack_into(self.buf, _HEARTBEAT, value)
+
+    def alive(self) -> bool:
+        return time.time() - self.heartbeat < HEARTBEAT_STALE
+
+    def slot(self, index: int) -> int:
+        return HEADER_SIZE + (index % self.slots) * self.slot_size
+
+    def stats(self) -> dict:
+        result = {name: self.get(name) for name in COUNTERS}
+        result["pending"] = result["head"] - result["tail"]
+        result.update(slots=self.slots, slot_size=self.slot_size, alive=self.alive())
+        return result
+
+    def close(self) -> None:
+        self.buf = None
+        self.shm.close()
+
+
+class RingDrainer:
+    """Owner of a blackboard's ring: appends published slots to the JSONL file."""
+
+    def __init__(
+        self,
+        path: Union[str, Path] = DEFAULT_BLACKBOARD_PATH,
+        slots: int = DEFAULT_SLOTS,
+        slot_size: int = DEFAULT_SLOT_SIZE,
+        max_batch: int = DRAIN_BATCH,
+        fsync_every: Optional[int] = None,
+        fsync_interval: Optional[float] = 1.0,
+    ):
+        if slot_size % 8 or slot_size <= SLOT.size:
+            raise ValueError("slot_size must be a multiple of 8 larger than the slot header")
+        self.path = Path(path)
+        self.max_batch = max_batch
+        name = ring_name(self.path)
+        self._claim_stale(name)
+        shm = shared_memory.SharedMemory(name, create=True, size=HEADER_SIZE + slots * slot_size)
+        _owned.add(name)
+        HEADER.pack_into(shm.buf, 0, MAGIC, VERSION, slots, slot_size, *([0] * len(COUNTERS)), time.time())
+        self.ring = _Ring(shm)
+        self.ring.set("pid", os.getpid())
+        self.writer = BlackboardWriter(self.path, fsync_every=fsync_every, fsync_interval=fsync_interval)
+        self._fd = os.open(f"{self.path}.ring.lock", os.O_RDWR | os.O_CREAT, 0o644)
+        self._stalled_since: Optional[float] = None
+        self._closed = False
+
+    @staticmethod
+    def _claim_stale(name: str) -> None:
+        """Unlink a ring left behind by a drainer that died; refuse to replace a live one."""
+        try:
+            shm = _attach(name)
+        except FileNotFoundError:
+            return
+        try:
+            ring = _Ring(shm)
+            pid = ring.get("pid")
+            live = ring.alive() and _pid_alive(pid)
+            ring.close()
+        except ValueError:
+            shm.close()
+            live = False
+            pid = None
+        if live:
+            raise RuntimeError(f"a ring drainer (pid {pid}) is already running for this blackboard")
+        resource_tracker.register(shm._name, "shared_memory")  # unlink() unregisters it
+        shm.unlink()
+
+    def add_append_hook(self, hook: AppendHook) -> None:
+        """In-process subscribers of the drained batches (see BlackboardWriter)."""
+        self.writer.add_append_hook(hook)
+
+    def drain_once(self) -> int:
+        """Append up to max_batch published signals; returns how many."""
+        ring = self.ring
+        ring.heartbeat = time.time()
+        tail = ring.get("tail")
+        head = ring.get("head")
+        records = []
+        index = tail
+        while index < head and len(records) < self.max_batch:
+            offset = ring.slot(index)
+            seq, length = SLOT.unpack_from(ring.buf, offset)
+            if seq != index + 1:  # claimed, not published yet
+                break
+            records.append(bytes(ring.buf[offset + SLOT.size : offset + SLOT.size + length]))
+            index += 1
+
+        if not records and index < head:
+            now = time.monotonic()
+            if self._stalled_since is None:
+                self._stalled_since = now
+            elif now - self._stalled_since >= ABANDON_AFTER:
+                self._abandon(index)
+                self._stalled_since = None
+            return 0
+        self._stalled_since = None
+        if records:
+            self.writer.write_records(records)
+            ring.set("tail", index)  # free the slots only once they are in the log
+        return len(records)
+
+    def _abandon(self, index: int) -> None:
+        """Skip an unpublished slot; its producer sees `tail` past it and will not write it."""
+        ring = self.ring
+        _lock(self._fd)
+        try:
+            seq, _ = SLOT.unpack_from(ring.buf, ring.slot(index))
+            if seq != index + 1:  # still unpublished now that no producer is mid-write
+                ring.add("abandoned")
+                ring.set("tail", index + 1)
+        finally:
+            _unlock(self._fd)
+
+    def run(self, stop: Optional[threading.Event] = None, callback: Optional[Callable[[int], None]] = None) -> None:
+        """Drain until `stop` is set, sleeping IDLE_SLEEP whenever the ring is empty."""
+        while stop is None or not stop.is_set():
+            n = self.drain_once()
+            if callback is not None and n:
+                callback(n)
+            if not n:
+                time.sleep(IDLE_SLEEP)
+
+    def stats(self) -> dict:
+        return self.ring.stats()
+
+    def close(self) -> None:
+        """Drain what producers already published, then remove the ring."""
+        if self._closed:
+            return
+        self._closed = True
+        deadline = time.monotonic() + ABANDON_AFTER
+        while self.ring.get("tail") < self.ring.get("head") and time.monotonic() < deadline:
+            if not self.drain_once():
+                time.sleep(IDLE_SLEEP)
+        self.ring.heartbeat = 0.0  # producers fall back to direct appends
+        self.writer.close()
+        os.close(self._fd)
+        shm = self.ring.shm
+        self.ring.close()
+        shm.unlink()
+        _owned.discard(shm.name)
+
+
+class RingProducer:
+    """Emit signals into a running drainer's ring, falling back to direct appends."""
+
+    def __init__(
+        self,
+        path: Union[str, Path] = DEFAULT_BLACKBOARD_PATH,
+        on_full: str = "block",
+        block_timeout: float = 1.0,
+    ):
+        if on_full not in ("block", "direct", "drop"):
+            raise ValueError(f"on_full must be block, direct or drop: {on_full}")
+        self.path = Path(path)
+        self.on_full = on_full
+        self.block_timeout = block_timeout
+        self.ring = _Ring(_attach(ring_name(self.path)))
+        self._fd = os.open(f"{self.path}.ring.lock", os.O_RDWR | os.O_CREAT, 0o644)
+        self._mutex = threading.Lock()  # flock is per open file, not per thread
+        self._last = 0
+
+    def _count(self, name: str) -> None:
+        _lock(self._fd)
+        try:
+            self.ring.add(name)
+        finally:
+            _unlock(self._fd)
+
+    def _claim(self) -> Optional[int]:
+        """Next free slot index, or None when the ring stays full."""
+        ring = self.ring
+        deadline = None
+        pause = 0.00005
+        while True:
+            _lock(self._fd)
+            try:
+                head = ring.get("head")
+                if head - ring.get("tail") < ring.slots:
+                    ring.set("head", head + 1)
+                    return head
+                if deadline is None:
+                    ring.add("blocked")
+            finally:
+                _unlock(self._fd)
+            if self.on_full != "block":
+                return None
+            now = time.monotonic()
+            if deadline is None:
+                deadline = now + self.block_timeout
+            elif now >= deadline:
+                return None
+            time.sleep(pause)
+            pause = min(pause * 2, 0.005)
+
+    def _direct(self, signal: dict, counter: str) -> None:
+        self._count(counter)
+        get_writer(self.path).emit(signal)
+
+    def emit(self, signal: dict) -> bool:
+        """Publish one signal; False only when it was dropped (on_full="drop")."""
+        record = encode_signal(signal)
+        ring = self.ring
+        if not ring.alive():
+            self._direct(signal, "direct")
+            return True
+        if len(record) > ring.payload:
+            self._direct(signal, "oversize")
+            return True
+        with self._mutex:
+            index = self._claim()
+            if index is None:
+                if self.on_full == "drop":
+                    self._count("dropped")
+                    return False
+                self._direct(signal, "overflow")
+                return True
+            if not self._publish(index, record):
+                self._direct(signal, "late")
+                return True
+            self._last = index + 1
+        return True
+
+    def _publish(self, index: int, record: bytes) -> bool:
+        """Copy a record into its claimed slot; False when the drainer already skipped the slot."""
+        ring = self.ring
+        _lock(self._fd)
+        try:
+            if ring.get("tail") > index:  # abandoned while we were stalled; the slot may be reused
+                return False
+            offset = ring.slot(index)
+            ring.buf[offset + SLOT.size : offset + SLOT.size + len(record)] = record
+            _U32.pack_into(ring.buf, offset + 8, len(record))
+            _U64.pack_into(ring.buf, offset, index + 1)  # publish last
+            return True
+        finally:
+            _unlock(self._fd)
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait until everything this producer published is in the log."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self.ring.get("tail") < self._last:
+            if not self.ring.alive() or (deadline is not None and time.monotonic() >= deadline):
+                return False
+            time.sleep(IDLE_SLEEP)
+        return get_writer(self.path).flush(timeout)
+
+    def stats(self) -> dict:
+        return self.ring.stats()
+
+    def close(self) -> None:
+        if self._fd is not None:
+            os.close(self._fd)
+            self._fd = None
+            self.ring.close()
+
+
+_producers = {}
+_producers_lock = threading.Lock()
+
+
+def get_producer(path: Union[str, Path] = DEFAULT_BLACKBOARD_PATH) -> Optional[RingProducer]:
+    """Process-wide producer for a blackboard, or None while no drainer is running."""
+    key = Path(path).resolve()
+    with _producers_lock:
+        producer, checked = _producers.get(key, (None, -PRODUCER_RECHECK))
+        if producer is not None and producer.ring.alive():
+            return producer
+        if time.monotonic() - checked < PRODUCER_RECHECK:
+            return None
+        if producer is not None:
+            producer.close()
+        try:
+            producer = RingProducer(key)
+            if not producer.ring.alive():
+                producer.close()
+                producer = None
+        except (FileNotFoundError, ValueError):
+            producer = None
+        _producers[key] = (producer, time.monotonic())
+        return producer
+
+
+def read_stats(path: Union[str, Path] = DEFAULT_BLACKBOARD_PATH) -> Optional[dict]:
+    """Header counters of a blackboard's ring, or None if there is none."""
+    try:
+        ring = _Ring(_attach(ring_name(path)))
+    except FileNotFoundError:
+        return None
+    try:
+        return ring.stats()
+    finally:
+        ring.close()
+
+
+def _bench_producer(path: str, count: int, latencies) -> None:
+    producer = RingProducer(path)
+    signal = make_signal("BENCH: ring emit", hive="X", port=0, type="metric")
+    samples = []
+    clock = time.perf_counter_ns
+    for _ in range(count):
+        start = clock()
+        producer.emit(signal)
+        samples.append(clock() - start)
+    producer.flush(30)
+    samples.sort()
+    latencies.put((samples[len(samples) // 2], samples[int(len(samples) * 0.99)], samples[-1]))
+
+
+def _serve(path: str, ready, stop, slots: int, slot_size: int) -> None:
+    drainer = RingDrainer(path, slots=slots, slot_size=slot_size)
+    ready.set()
+    try:
+        drainer.run(stop)
+    finally:
+        drainer.close()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Shared-memory ring transport for the blackboard")
+    parser.add_argument("--blackboard", default=str(DEFAULT_BLACKBOARD_PATH), help="Blackboard JSONL file")
+    sub = parser.add_subparsers(dest="command", required=True)
+    serve = sub.add_parser("serve", help="Run the drainer until interrupted")
+    bench = sub.add_parser("bench", help="Measure emit latency with producer processes")
+    for p in (serve, bench):
+        p.add_argument("--slots", type=int, default=DEFAULT_SLOTS)
+        p.add_argument("--slot-size", type=int, default=DEFAULT_SLOT_SIZE)
+    bench.add_argument("--target", default=str(BENCH_TARGET), help="Scratch blackboard the bench writes to")
+    bench.add_argument("--producers", type=int, default=4)
+    bench.add_argument("--signals", type=int, default=20000, help="Signals per producer")
+    sub.add_parser("stats", help="Print the ring's counters")
+    args = parser.parse_args(argv)
+
+    if args.command == "stats":
+        stats = read_stats(args.blackboard)
+        if stats is None:
+            print("No ring for this blackboard")
+            return 1
+        print(json.dumps(stats, indent=2))
+        return 0
+
+    if args.command == "serve":
+        drainer = RingDrainer(args.blackboard, slots=args.slots, slot_size=args.slot_size)
+        stop = threading.Event()
+        signals_module.signal(signals_module.SIGTERM, lambda *_: stop.set())
+        print(f"Draining {drainer.ring.shm.name} into {args.blackboard}")
+        try:
+            drainer.run(stop)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            drainer.close()
+        return 0
+
+    ready, stop = multiprocessing.Event(), multiprocessing.Event()
+    server = multiprocessing.Process(target=_serve, args=(args.target, ready, stop, args.slots, args.slot_size))
+    server.start()
+    if not ready.wait(30):
+        server.terminate()
+        print("Drainer did not start")
+        return 1
+    latencies = multiprocessing.Queue()
+    start = time.perf_counter()
+    producers = [
+        multiprocessing.Process(target=_bench_producer, args=(args.target, args.signals, latencies))
+        for _ in range(args.producers)
+    ]
+    for p in producers:
+        p.start()
+    results = [latencies.get() for _ in producers]
+    for p in producers:
+        p.join()
+    seconds = time.perf_counter() - start
+    stats = read_stats(args.target)
+    stop.set()
+    server.join()
+    total = args.producers * args.signals
+    print(f"{total} signals from {args.producers} producers in {seconds:.2f}s ({total / seconds:,.0f}/s, flushed to the log)")
+    for i, (p50, p99, worst) in enumerate(results):
+        print(f"  producer {i}: emit p50 {p50 / 1000:.1f}us  p99 {p99 / 1000:.1f}us  max {worst / 1000:.1f}us")
+    print("Counters: " + ", ".join(f"{k}={stats[k]}" for k in ("blocked", "overflow", "oversize", "direct", "abandoned", "late")))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,535 @@
+"""
+Blackboard Segments
+===================
+
+Keeps the live blackboard small so readers stay fast over long runs.
+
+    hot/blackboard.jsonl                      # active segment, writers append here
+    hot/blackboard.jsonl.segments/
+        manifest.json                         # sealed segments + their stats, oldest first
+        seg-000001.jsonl.gz                   # sealed, compressed, immutable
+        seg-000002.jsonl.zst                  # zstd when `zstandard` is installed
+
+- rotate(): under the writer lock, the active file is renamed to a staging
+  name and a fresh one created, so no append is lost or split. Where the
+  rename keeps failing because a reader holds the file open (Windows), the
+  file is copied to staging and truncated instead, still under the lock.
+  Sealing (compress, record stats in the manifest, drop staging) happens
+  after the lock is released; a crash in between is finished by the next
+  rotate().
+- Writers from get_writer() rotate automatically when
+  HFO_BLACKBOARD_ROTATE_BYTES and/or HFO_BLACKBOARD_ROTATE_HOURS is set
+  (see attach_rotation()).
+- compact(): rewrites sealed segments older than a cutoff, rolling `metric`
+  signals up into one aggregate signal per (hour, gen, port, hive). Other
+  signals are kept verbatim.
+- prune(): deletes sealed segments past a retention age or total size.
+- backfill_stats(): adds the per-segment counters to manifest entries sealed
+  before they were recorded, reading each such segment once.
+- iter_signals(): every signal across sealed segments and the active file
+  in log order, skipping segments the manifest proves are out of range.
+
+Usage:
+    python -m blackboard.segments rotate --max-bytes 67108864
+    python -m blackboard.segments compact --older-than-days 7
+    python -m blackboard.segments prune --retain-days 180
+"""
+
+import argparse
+import gzip
+import io
+import json
+import os
+import re
+import shutil
+import sys
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import BinaryIO, Iterator, List, Optional, Tuple, Union
+
+from .index import parse_ts
+from .locking import file_lock
+from .reader import iter_records_from
+from .signals import DEFAULT_BLACKBOARD_PATH, encode_signal, make_signal
+from .stats import add_signal, new_stats
+
+try:
+    import zstandard
+except ImportError:  # optional; gzip is always available
+    zstandard = None
+
+MANIFEST = "manifest.json"
+SEGMENT_PATTERN = re.compile(r"^seg-(\d{6})\.jsonl(\.gz|\.zst)?$")
+STAGING_PATTERN = re.compile(r"^\.seg-(\d{6})\.jsonl$")
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+RENAME_RETRIES = 5
+RENAME_RETRY_DELAY = 0.05
+ROLLUP_PREFIX = "ROLLUP "
+
+
+def segments_dir(path: Union[str, Path] = DEFAULT_BLACKBOARD_PATH) -> Path:
+    return Path(f"{path}.segments")
+
+
+def default_codec() -> str:
+    return "zst" if zstandard is not None else "gz"
+
+
+# --- manifest -----------------------------------------------------------------
+
+def load_manifest(path: Union[str, Path] = DEFAULT_BLACKBOARD_PATH) -> dict:
+    """Sealed segment list (empty when nothing was ever rotated)."""
+    try:
+        return json.loads((segments_dir(path) / MANIFEST).read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return {"next_seq": 1, "segments": []}
+
+
+def _save_manifest(path: Union[str, Path], manifest: dict) -> None:
+    directory = segments_dir(path)
+    tmp = directory / f".{MANIFEST}.tmp"
+    tmp.write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+    os.replace(tmp, directory / MANIFEST)
+
+
+# --- segment I/O --------------------------------------------------------------
+
+def _open_read(segment: Path) -> BinaryIO:
+    if segment.suffix == ".gz":
+        return gzip.open(segment, "rb")
+    if segment.suffix == ".zst":
+        if zstandard is None:
+            raise RuntimeError(f"{segment.name} needs the zstandard package")
+        return io.BufferedReader(zstandard.ZstdDecompressor().stream_reader(open(segment, "rb"), closefd=True))
+    return open(segment, "rb")
+
+
+def _write_compressed(source: BinaryIO, target: Path, codec: str) -> None:
+    tmp = target.with_name(f".{target.name}.tmp")
+    with open(tmp, "wb") as raw:
+        if codec == "zst":
+            with zstandard.ZstdCompressor(level=10).stream_writer(raw, closefd=False) as out:
+                for chunk in iter(lambda: source.read(1 << 20), b""):
+                    out.write(chunk)
+        else:
+            with gzip.GzipFile(fileobj=raw, mode="wb", compresslevel=6, mtime=0) as out:
+                for chunk in iter(lambda: source.read(1 << 20), b""):
+                    out.write(chunk)
+        raw.flush()
+        os.fsync(raw.fileno())
+    os.replace(tmp, target)
+
+
+def _segment_stats(fp: BinaryIO) -> dict:
+    stats = {"signals": 0, "first_ts": None, "last_ts": None, "min_gen": None, "max_gen": None, "metrics": 0}
+    counters = new_stats()
+    for _, _, _, signal in iter_records_from(fp):
+        add_signal(counters, signal)
+        stats["signals"] += 1
+        gen = signal.get("gen")
+        if isinstance(gen, int) and not isinstance(gen, bool):
+            stats["min_gen"] = gen if stats["min_gen"] is None else min(stats["min_gen"], gen)
+            stats["max_gen"] = gen if stats["max_gen"] is None else max(stats["max_gen"], gen)
+        if signal.get("type") == "metric":
+            stats["metrics"] += 1
+    stats["first_ts"], stats["last_ts"] = counters["min_ts"], counters["max_ts"]
+    stats["stats"] = counters
+    return stats
+
+
+def backfill_stats(path: Union[str, Path] = DEFAULT_BLACKBOARD_PATH) -> int:
+    """Record counters for sealed segments whose manifest entry lacks them; returns how many were added."""
+    directory = segments_dir(path)
+    if not directory.exists():
+        return 0
+    with file_lock(directory):
+        manifest = load_manifest(path)
+        added = 0
+        for entry in manifest["segments"]:
+            if "stats" in entry:
+                continue
+            try:
+                with _open_read(directory / entry["name"]) as fp:
+                    entry["stats"] = _segment_stats(fp)["stats"]
+            except (OSError, RuntimeError):  # missing segment or codec; retried next time
+                continue
+            added += 1
+        if added:
+            _save_manifest(path, manifest)
+        return added
+
+
+# --- rotation -----------------------------------------------------------------
+
+def _first_ts(path: Path) -> Optional[str]:
+    with open(path, "rb") as fp:
+        for _, _, _, signal in iter_records_from(fp):
+            if isinstance(signal.get("ts"), str):
+                return signal["ts"]
+    return None
+
+
+def _parse_ts(ts: str) -> Optional[datetime]:
+    try:
+        dt = datetime.fromisoformat(ts.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    return dt if dt.tzinfo else dt.replace(tzinfo=timezone.utc)
+
+
+def rotation_due(
+    path: Union[str, Path] = DEFAULT_BLACKBOARD_PATH,
+    max_bytes: Optional[int] = DEFAULT_MAX_BYTES,
+    max_age: Optional[timedelta] = None,
+) -> bool:
+    """True when the active file is over `max_bytes` or its first signal is older than `max_age`."""
+    path = Path(path)
+    try:
+        size = path.stat().st_size
+    except FileNotFoundError:
+        return False
+    if not size:
+        return False
+    if max_bytes is not None and size >= max_bytes:
+        return True
+    if max_age is not None:
+        first = _first_ts(path)
+        dt = _parse_ts(first) if first else None
+        return dt is not None and datetime.now(timezone.utc) - dt >= max_age
+    return False
+
+
+def rotate(
+    path: Union[str, Path] = DEFAULT_BLACKBOARD_PATH,
+    max_bytes: Optional[int] = DEFAULT_MAX_BYTES,
+    max_age: Optional[timedelta] = None,
+    force: bool = False,
+    codec: Optional[str] = None,
+) -> Optional[dict]:
+    """Seal the active file if a rotation is due; returns the new manifest entry."""
+    path = Path(path)
+    directory = segments_dir(path)
+    directory.mkdir(parents=True, exist_ok=True)
+    seal_pending(path, codec)
+
+    with file_lock(directory):
+        with file_lock(path):
+            if not (force and path.exists() and path.stat().st_size) and not rotation_due(path, max_bytes, max_age):
+                return None
+            manifest = load_manifest(path)
+            seq = manifest["next_seq"]
+            _stage_active(path, directory / f".seg-{seq:06d}.jsonl")
+            path.touch()
+            manifest["next_seq"] = seq + 1
+            _save_manifest(path, manifest)
+        return _seal(path, seq, codec)
+
+
+def _stage_active(path: Path, staging: Path) -> None:
+    """Move the active file to `staging`. Caller holds the writer lock."""
+    for attempt in range(RENAME_RETRIES):
+        try:
+            os.rename(path, staging)
+            return
+        except PermissionError:  # Windows: a reader still has the file open
+            time.sleep(RENAME_RETRY_DELAY * (attempt + 1))
+    # No writer can append while we hold the lock, so copy-and-truncate loses nothing.
+    tmp = staging.with_name(f"{staging.name}.tmp")
+    shutil.copyfile(path, tmp)
+    os.replace(tmp, staging)
+    with open(path, "r+b") as fp:
+        fp.truncate(0)
+
+
+def seal_pending(path: Union[str, Path] = DEFAULT_BLACKBOARD_PATH, codec: Optional[str] = None) -> List[dict]:
+    """Finish sealing staged segments left behind by an interrupted rotate()."""
+    directory = segments_dir(path)
+    if not directory.exists():
+        return []
+    with file_lock(directory):
+        staged = sorted(
+            int(m.group(1)) for m in (STAGING_PATTERN.match(p.name) for p in directory.iterdir()) if m
+        )
+        return [_seal(Path(path), seq, codec) for seq in staged]
+
+
+def _seal(path: Path, seq: int, codec: Optional[str]) -> dict:
+    """Compress a staged segment and record it. Caller holds the segments lock."""
+    directory = segments_dir(path)
+    staging = directory / f".seg-{seq:06d}.jsonl"
+    codec = codec or default_codec()
+    name = f"seg-{seq:06d}.jsonl.{codec}"
+    with open(staging, "rb") as fp:
+        stats = _segment_stats(fp)
+        fp.seek(0)
+        _write_compressed(fp, directory / name, codec)
+
+    entry = {
+        "seq": seq,
+        "name": name,
+        "codec": codec,
+        "raw_bytes": staging.stat().st_size,
+        "bytes": (directory / name).stat().st_size,
+        "sealed_at": datetime.utcnow().isoformat() + "Z",
+        "compacted": False,
+        **stats,
+    }
+    manifest = load_manifest(path)
+    manifest["segments"] = [s for s in manifest["segments"] if s["seq"] != seq] + [entry]
+    manifest["segments"].sort(key=lambda s: s["seq"])
+    manifest["next_seq"] = max(manifest["next_seq"], seq + 1)
+    _save_manifest(path, manifest)
+    staging.unlink()
+    return entry
+
+
+def attach_rotation(
+    writer,
+    max_bytes: Optional[int] = DEFAULT_MAX_BYTES,
+    max_age: Optional[timedelta] = None,
+    check_every: int = 1024,
+) -> None:
+    """
+    Rotate `writer`'s file from its append hook. The size check uses the
+    offsets the writer just reported, so it costs nothing between rotations;
+    the age check reads the first line every `check_every` signals.
+    """
+    state = {"since_check": 0}
+    sealing = threading.Lock()
+
+    def hook(path: Path, appended: list) -> None:
+        offset, length, _ = appended[-1]
+        state["since_check"] += len(appended)
+        over_size = max_bytes is not None and offset + length >= max_bytes
+        if not over_size and not (max_age is not None and state["since_check"] >= check_every):
+            return
+        state["since_check"] = 0
+        if not rotation_due(path, max_bytes, max_age):
+            return
+        if sealing.acquire(blocking=False):
+            def run():
+                try:
+                    rotate(path, max_bytes, max_age)
+                finally:
+                    sealing.release()
+            threading.Thread(target=run, name="blackboard-rotate", daemon=True).start()
+
+    writer.add_append_hook(hook)
+
+
+# --- compaction and retention -------------------------------------------------
+
+def rollup_metrics(signals: List[dict]) -> List[dict]:
+    """One aggregate metric signal per (hour, gen, port, hive)."""
+    groups: "OrderedDict[tuple, dict]" = OrderedDict()
+    for s in signals:
+        ts = s.get("ts") if isinstance(s.get("ts"), str) else ""
+        key = (ts[:13], s.get("gen"), s.get("port"), s.get("hive"))
+        mark = s.get("mark") if isinstance(s.get("mark"), (int, float)) else None
+        group = groups.get(key)
+        if group is None:
+            group = groups[key] = {"count": 0, "first_ts": ts, "last_ts": ts, "marks": [], "sample": s.get("msg")}
+        group["count"] += 1
+        group["first_ts"] = min(group["first_ts"], ts)
+        group["last_ts"] = max(group["last_ts"], ts)
+        if mark is not None:
+            group["marks"].append(mark)
+
+    rolled = []
+    for (_, gen, port, hive), g in groups.items():
+        marks = g["marks"]
+        summary = {
+            "count": g["count"],
+            "from": g["first_ts"],
+            "to": g["last_ts"],
+            "mark_min": min(marks) if marks else None,
+            "mark_max": max(marks) if marks else None,
+            "sample": g["sample"],
+        }
+        rolled.append(make_signal(
+            ROLLUP_PREFIX + json.dumps(summary, ensure_ascii=False, separators=(",", ":")),
+            hive=hive, port=port, gen=gen, type="metric",
+            mark=round(sum(marks) / len(marks), 6) if marks else 0.0,
+            ts=g["first_ts"] or None,
+        ))
+    return rolled
+
+
+def compact(
+    path: Union[str, Path] = DEFAULT_BLACKBOARD_PATH,
+    older_than: timedelta = timedelta(days=7),
+    codec: Optional[str] = None,
+) -> List[dict]:
+    """Roll up metric signals in sealed segments whose last signal is older than `older_than`."""
+    path = Path(path)
+    directory = segments_dir(path)
+    if not directory.exists():
+        return []
+    cutoff = datetime.now(timezone.utc) - older_than
+    compacted = []
+    with file_lock(directory):
+        manifest = load_manifest(path)
+        for entry in manifest["segments"]:
+            last = _parse_ts(entry["last_ts"]) if entry.get("last_ts") else None
+            if entry.get("compacted") or not entry.get("metrics") or last is None or last >= cutoff:
+                continue
+            segment = directory / entry["name"]
+            kept: List[dict] = []
+            metrics: List[dict] = []
+            with _open_read(segment) as fp:
+                for _, _, _, signal in iter_records_from(fp):
+                    if signal.get("type") == "metric" and not str(signal.get("msg", "")).startswith(ROLLUP_PREFIX):
+                        metrics.append(signal)
+                    else:
+                        kept.append(signal)
+            signals = kept + rollup_metrics(metrics)
+            signals.sort(key=lambda s: s.get("ts") if isinstance(s.get("ts"), str) else "")
+            data = io.BytesIO(b"".join(encode_signal(s) for s in signals))
+
+            seg_codec = codec or entry["codec"]
+            name = f"seg-{entry['seq']:06d}.jsonl.{seg_codec}"
+            _write_compressed(data, directory / name, seg_codec)
+            if name != entry["name"]:
+                segment.unlink()
+            data.seek(0)
+            entry.update(_segment_stats(data))
+            entry.update({
+                "name": name,
+                "codec": seg_codec,
+                "raw_bytes": len(data.getvalue()),
+                "bytes": (directory / name).stat().st_size,
+                "compacted": True,
+                "rolled_up": len(metrics),
+            })
+            compacted.append(entry)
+        if compacted:
+            _save_manifest(path, manifest)
+    return compacted
+
+
+def prune(
+    path: Union[str, Path] = DEFAULT_BLACKBOARD_PATH,
+    retain: Optional[timedelta] = None,
+    max_total_bytes: Optional[int] = None,
+) -> List[dict]:
+    """Delete the oldest sealed segments past the retention age or size budget."""
+    path = Path(path)
+    directory = segments_dir(path)
+    if not directory.exists():
+        return []
+    removed = []
+    with file_lock(directory):
+        manifest = load_manifest(path)
+        segments = manifest["segments"]
+        cutoff = datetime.now(timezone.utc) - retain if retain is not None else None
+        total = sum(s["bytes"] for s in segments)
+        while segments:
+            oldest = segments[0]
+            last = _parse_ts(oldest["last_ts"]) if oldest.get("last_ts") else None
+            too_old = cutoff is not None and last is not None and last < cutoff
+            too_big = max_total_bytes is not None and total > max_total_bytes
+            if not (too_old or too_big):
+                break
+            (directory / oldest["name"]).unlink(missing_ok=True)
+            total -= oldest["bytes"]
+            removed.append(segments.pop(0))
+        if removed:
+            _save_manifest(path, manifest)
+    return removed
+
+
+# --- reading ------------------------------------------------------------------
+
+def iter_signals(
+    path: Union[str, Path] = DEFAULT_BLACKBOARD_PATH,
+    since=None,
+    min_gen: Optional[int] = None,
+    include_active: bool = True,
+    until=None,
+    max_gen: Optional[int] = None,
+) -> Iterator[dict]:
+    """
+    Every signal in sealed segments (oldest first) and then the active file.
+    `since` (inclusive) / `until` (exclusive), ISO strings or datetimes, and
+    `min_gen` / `max_gen` only skip whole segments the manifest rules out;
+    callers still filter individual signals.
+    """
+    path = Path(path)
+    directory = segments_dir(path)
+    since_ms = parse_ts(since) if since is not None else None
+    until_ms = parse_ts(until) if until is not None else None
+    for entry in load_manifest(path)["segments"]:
+        first_ms, last_ms = _entry_range(entry)
+        if since_ms is not None and last_ms is not None and last_ms < since_ms:
+            continue
+        if until_ms is not None and first_ms is not None and first_ms >= until_ms:
+            continue
+        if min_gen is not None and entry.get("max_gen") is not None and entry["max_gen"] < min_gen:
+            continue
+        if max_gen is not None and entry.get("min_gen") is not None and entry["min_gen"] > max_gen:
+            continue
+        try:
+            fp = _open_read(directory / entry["name"])
+        except FileNotFoundError:  # pruned after the manifest was read
+            continue
+        with fp:
+            for _, _, _, signal in iter_records_from(fp):
+                yield signal
+    if include_active and path.exists():
+        with open(path, "rb") as fp:
+            for _, _, _, signal in iter_records_from(fp):
+                yield signal
+
+
+def _entry_range(entry: dict) -> Tuple[Optional[int], Optional[int]]:
+    """Earliest and latest signal of a sealed segment in epoch ms (None when unknown)."""
+    counters = entry.get("stats") or {}
+    first_ms, last_ms = counters.get("min_ms"), counters.get("max_ms")
+    if first_ms is None and entry.get("first_ts"):
+        first_ms = parse_ts(entry["first_ts"])
+    if last_ms is None and entry.get("last_ts"):
+        last_ms = parse_ts(entry["last_ts"])
+    return first_ms, last_ms
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Rotate, compact and prune blackboard segments")
+    parser.add_argument("--blackboard", default=str(DEFAULT_BLACKBOARD_PATH), help="Active blackboard JSONL file")
+    sub = parser.add_subparsers(dest="command", required=True)
+    rot = sub.add_parser("rotate", help="Seal the active file when a threshold is reached")
+    rot.add_argument("--max-bytes", type=int, default=DEFAULT_MAX_BYTES)
+    rot.add_argument("--max-age-hours", type=float)
+    rot.add_argument("--force", action="store_true", help="Seal regardless of thresholds")
+    rot.add_argument("--codec", choices=["gz", "zst"])
+    comp = sub.add_parser("compact", help="Roll up metric signals in old sealed segments")
+    comp.add_argument("--older-than-days", type=float, default=7)
+    pr = sub.add_parser("prune", help="Delete sealed segments past retention")
+    pr.add_argument("--retain-days", type=float)
+    pr.add_argument("--max-total-bytes", type=int)
+    sub.add_parser("list", help="Show the segment manifest")
+    args = parser.parse_args(argv)
+
+    if args.command == "rotate":
+        max_age = timedelta(hours=args.max_age_hours) if args.max_age_hours else None
+        entry = rotate(args.blackboard, args.max_bytes, max_age, force=args.force, codec=args.codec)
+        print(f"Sealed {entry['name']}: {entry['signals']} signals, {entry['raw_bytes']} -> {entry['bytes']} bytes"
+              if entry else "No rotation due")
+    elif args.command == "compact":
+        for entry in compact(args.blackboard, timedelta(days=args.older_than_days)):
+            print(f"Compacted {entry['name']}: {entry['rolled_up']} metrics rolled up, {entry['bytes']} bytes")
+    elif args.command == "prune":
+        retain = timedelta(days=args.retain_days) if args.retain_days else None
+        for entry in prune(args.blackboard, retain, args.max_total_bytes):
+            print(f"Pruned {entry['name']} ({entry['first_ts']} .. {entry['last_ts']})")
+    else:
+        for entry in load_manifest(args.blackboard)["segments"]:
+            print(f"{entry['name']}  {entry['signals']:>8} signals  {entry['bytes']:>10} bytes  "
+                  f"{entry['first_ts']} .. {entry['last_ts']}{'  compacted' if entry.get('compacted') else ''}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
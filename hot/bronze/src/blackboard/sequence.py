@@ -0,0 +1,389 @@
+"""
+Blackboard Sequence Monitor
+===========================
+
+Streaming HIVE/8 phase enforcement over the blackboard (the Python side of
+src/enforcement/hive-validator.ts).
+
+- SequenceDetector: one HIVE cycle per generation, tracked across ports.
+  Ports own fixed phases and work concurrently (port 0 only hunts while
+  port 1 writes tests), so state is kept per generation rather than per
+  (gen, port): a port-1 stream never contains H and would be flagged on
+  its first signal. A generation's state is the furthest phase its
+  current cycle has reached, and memory is O(generations) however long the
+  log gets. A signal may repeat or revisit any phase up to one past that
+  point; it is flagged only when it skips ahead: reward hacks (V, TDD
+  GREEN, before any I, TDD RED) and E before I or V. H after E is the
+  strange loop and starts a new cycle, so every cycle is checked, not just
+  the first. Handoffs (X) never change the state.
+- Out-of-order timestamps (already present in hot/blackboard.jsonl) are
+  buffered up to `lateness` seconds behind the newest timestamp seen and
+  released in timestamp order. Signals later than that, or without a
+  parseable ts, are processed on arrival and counted as late.
+- SequenceMonitor: checkpoints the detector together with its position
+  (sealed segment sequence, inode, offset) in `<file>.sequence.json`,
+  catches up on segments sealed while it was down, then follows the active
+  file through Follower. Each batch costs O(new signals).
+- Violations are appended to the blackboard as `type: "error"` signals
+  from the Pyre Praetorian (port 5, V). The monitor skips its own
+  violation signals when it reads them back.
+
+Usage:
+    python -m blackboard.sequence                  # catch up once, emit violations
+    python -m blackboard.sequence --follow         # keep enforcing new appends
+    python -m blackboard.sequence --scan           # report over the whole history only
+"""
+
+import argparse
+import heapq
+import json
+import os
+import sys
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Union
+
+from .follow import Follower
+from .index import parse_ts
+from .locking import file_lock
+from .reader import iter_records_from
+from .segments import _open_read, iter_signals, load_manifest, segments_dir
+from .signals import DEFAULT_BLACKBOARD_PATH, HIVE_PHASES, make_signal
+from .writer import get_writer
+
+ALLOWED_TRANSITIONS = {
+    "H": ("H", "I", "X"),  # Hunt can continue or move to Interlock
+    "I": ("I", "V", "X"),  # Interlock can continue or move to Validate
+    "V": ("V", "E", "X"),  # Validate can continue or move to Evolve
+    "E": ("E", "H", "X"),  # Evolve can continue or STRANGE LOOP back to Hunt
+}
+VIOLATION_MESSAGES = {
+    "SKIPPED_HUNT": "Cannot start HIVE cycle without Hunt phase. Search first!",
+    "SKIPPED_INTERLOCK": "Cannot jump to Evolve without Interlock. Write failing tests first!",
+    "SKIPPED_VALIDATE": "Cannot jump to Evolve without Validate. Make tests pass first!",
+    "REWARD_HACK": "REWARD HACK DETECTED: Going GREEN without prior RED is forbidden!",
+    "ILLEGAL_TRANSITION": "HIVE phases cannot run backwards within a cycle.",
+    "UNKNOWN_PHASE": "Unknown HIVE phase encountered.",
+}
+VIOLATION_PREFIX = "SEQUENCE VIOLATION: "
+DEFAULT_LATENESS = 300.0  # seconds
+STATE_VERSION = 2
+PHASE_ORDER = "HIVE"
+
+
+def classify(previous: Optional[str], current) -> Optional[str]:
+    """Violation kind for moving from `previous` (None = no history) to `current`, or None."""
+    if current not in HIVE_PHASES:
+        return "UNKNOWN_PHASE"
+    if current == "X":  # handoffs are boundary markers and never change the phase
+        return None
+    if previous is None:
+        return None if current == "H" else "REWARD_HACK" if current == "V" else "SKIPPED_HUNT"
+    if current in ALLOWED_TRANSITIONS[previous]:
+        return None
+    if current == "V":
+        return "REWARD_HACK"
+    if current == "E":
+        return "SKIPPED_INTERLOCK" if previous == "H" else "SKIPPED_VALIDATE"
+    return "ILLEGAL_TRANSITION"
+
+
+def classify_cycle(reached: Optional[str], current) -> Optional[str]:
+    """Violation kind for a signal in `current` phase when its cycle has reached `reached`, or None."""
+    if current not in HIVE_PHASES:
+        return "UNKNOWN_PHASE"
+    if current == "X":
+        return None
+    if reached is None:
+        return None if current == "H" else "REWARD_HACK" if current == "V" else "SKIPPED_HUNT"
+    if PHASE_ORDER.index(current) <= PHASE_ORDER.index(reached) + 1:
+        return None
+    if current == "V":
+        return "REWARD_HACK"
+    return "SKIPPED_INTERLOCK" if reached == "H" else "SKIPPED_VALIDATE"
+
+
+def is_violation_signal(signal: dict) -> bool:
+    msg = signal.get("msg")
+    return signal.get("type") == "error" and isinstance(msg, str) and msg.startswith(VIOLATION_PREFIX)
+
+
+def violation_signal(violation: dict) -> dict:
+    """The `type: "error"` blackboard signal reporting one violation."""
+    return make_signal(
+        f"{VIOLATION_PREFIX}{violation['kind']} gen {violation['gen']} port {violation['port']}: "
+        f"{violation['from'] or '-'} → {violation['to']} at {violation['ts']}. "
+        f"{VIOLATION_MESSAGES[violation['kind']]}",
+        hive="V",
+        port=5,
+        type="error",
+    )
+
+
+class SequenceDetector:
+    """Per-generation HIVE cycles behind a bounded reorder buffer."""
+
+    def __init__(self, lateness: float = DEFAULT_LATENESS):
+        self.lateness_ms = int(lateness * 1000)
+        self.phases: Dict[str, str] = {}  # gen -> furthest phase reached in its current cycle
+        self.pending: list = []  # heap of [ts_ms, arrival, signal]
+        self.watermark: Optional[int] = None  # newest ts seen
+        self.released: Optional[int] = None  # ts of the last signal released from the buffer
+        self.arrivals = 0
+        self.counts = {"signals": 0, "late": 0, "violations": {}}
+
+    def feed(self, signal: dict) -> List[dict]:
+        """Accept one signal; returns violations for the signals it releases."""
+        if is_violation_signal(signal):
+            return []
+        self.counts["signals"] += 1
+        ts = parse_ts(signal.get("ts"))
+        if ts is None or (self.released is not None and ts < self.released):
+            self.counts["late"] += 1
+            return self._step(signal)
+        self.arrivals += 1
+        heapq.heappush(self.pending, [ts, self.arrivals, signal])
+        self.watermark = ts if self.watermark is None else max(self.watermark, ts)
+        return self._release(self.watermark - self.lateness_ms)
+
+    def feed_all(self, signals: Iterable[dict]) -> List[dict]:
+        violations = []
+        for signal in signals:
+            violations += self.feed(signal)
+        return violations
+
+    def flush(self) -> List[dict]:
+        """Release everything still buffered (end of a finite scan)."""
+        return self._release(None)
+
+    def _release(self, until: Optional[int]) -> List[dict]:
+        violations = []
+        while self.pending and (until is None or self.pending[0][0] <= until):
+            ts, _, signal = heapq.heappop(self.pending)
+            self.released = ts
+            violations += self._step(signal)
+        return violations
+
+    def _step(self, signal: dict) -> List[dict]:
+        key = str(signal.get("gen"))
+        previous, current = self.phases.get(key), signal.get("hive")
+        kind = classify_cycle(previous, current)
+        if previous == "E" and current == "H":
+            self.phases[key] = "H"  # strange loop: a new cycle starts from Hunt
+        elif current in ALLOWED_TRANSITIONS and (previous is None or PHASE_ORDER.index(current) > PHASE_ORDER.index(previous)):
+            self.phases[key] = current
+        if kind is None:
+            return []
+        self.counts["violations"][kind] = self.counts["violations"].get(kind, 0) + 1
+        return [{
+            "kind": kind,
+            "gen": signal.get("gen"),
+            "port": signal.get("port"),
+            "from": previous,
+            "to": current,
+            "ts": signal.get("ts"),
+            "msg": str(signal.get("msg", ""))[:200],
+        }]
+
+    # --- persistence ------------------------------------------------------------
+
+    def to_state(self) -> dict:
+        return {
+            "lateness_ms": self.lateness_ms,
+            "phases": self.phases,
+            "pending": self.pending,
+            "watermark": self.watermark,
+            "released": self.released,
+            "arrivals": self.arrivals,
+            "counts": self.counts,
+        }
+
+    @classmethod
+    def from_state(cls, state: dict, lateness: Optional[float] = None) -> "SequenceDetector":
+        detector = cls()
+        detector.lateness_ms = int(lateness * 1000) if lateness is not None else state["lateness_ms"]
+        detector.phases = state["phases"]
+        detector.pending = state["pending"]
+        heapq.heapify(detector.pending)
+        detector.watermark = state["watermark"]
+        detector.released = state["released"]
+        detector.arrivals = state["arrivals"]
+        detector.counts = state["counts"]
+        return detector
+
+
+class SequenceMonitor:
+    """Incremental, checkpointed SequenceDetector over one blackboard."""
+
+    def __init__(
+        self,
+        path: Union[str, Path] = DEFAULT_BLACKBOARD_PATH,
+        lateness: Optional[float] = None,
+        emit: bool = True,
+        use_inotify: bool = True,
+    ):
+        self.path = Path(path)
+        self.state_path = Path(f"{self.path}.sequence.json")
+        self.emit = emit
+        self.use_inotify = use_inotify
+        self._lateness = lateness
+        self.detector: Optional[SequenceDetector] = None
+        self.follower: Optional[Follower] = None
+        self.next_seq = 1  # first segment sequence not covered by what we have read
+        self._expected = (None, 0)
+
+    # --- state ----------------------------------------------------------------
+
+    def _load(self) -> Optional[dict]:
+        try:
+            state = json.loads(self.state_path.read_text(encoding="utf-8"))
+            if state.get("version") == STATE_VERSION:
+                return state
+        except (OSError, ValueError):
+            pass
+        return None
+
+    def _save(self) -> None:
+        ino, offset = self.follower.position
+        state = {
+            "version": STATE_VERSION,
+            "ino": ino,
+            "offset": offset,
+            "next_seq": self.next_seq,
+            "detector": self.detector.to_state(),
+        }
+        tmp = self.state_path.with_name(f".{self.state_path.name}.tmp")
+        tmp.write_text(json.dumps(state, separators=(",", ":")), encoding="utf-8")
+        os.replace(tmp, self.state_path)
+
+    # --- reading --------------------------------------------------------------
+
+    def _segment_signals(self, seq: int, start: int) -> Iterable[dict]:
+        directory = segments_dir(self.path)
+        names = [e["name"] for e in load_manifest(self.path)["segments"] if e["seq"] == seq]
+        # Renamed but not yet sealed segments are still plain JSONL in staging.
+        for candidate in [directory / n for n in names] + [directory / f".seg-{seq:06d}.jsonl"]:
+            try:
+                fp = _open_read(candidate)
+            except FileNotFoundError:
+                continue
+            with fp:
+                for _, _, _, signal in iter_records_from(fp, start):
+                    yield signal
+            return
+
+    def _start(self) -> List[dict]:
+        state = self._load()
+        with file_lock(self.path):
+            try:
+                ino = os.stat(self.path).st_ino
+            except FileNotFoundError:
+                ino = None
+            next_seq = load_manifest(self.path)["next_seq"]
+
+        if state is None:
+            self.detector = SequenceDetector(DEFAULT_LATENESS if self._lateness is None else self._lateness)
+            first_seq, carry, offset = 1, 0, 0
+        else:
+            self.detector = SequenceDetector.from_state(state["detector"], self._lateness)
+            same_file = state["ino"] is not None and state["ino"] == ino
+            # A different inode means the file we were tailing is now segment state["next_seq"].
+            first_seq = next_seq if same_file else state["next_seq"]
+            carry = 0 if same_file else state["offset"]
+            offset = state["offset"] if same_file else 0
+
+        violations = []
+        for seq in range(first_seq, next_seq):
+            violations += self.detector.feed_all(self._segment_signals(seq, carry if seq == first_seq else 0))
+        self.next_seq = next_seq
+        self.follower = Follower(self.path, offset=offset, ino=ino, use_inotify=self.use_inotify)
+        self._expected = (ino, offset)
+        return violations
+
+    def _process(self, ino: Optional[int], signals: List[dict]) -> List[dict]:
+        violations = self.detector.feed_all(signals)
+        current = self.follower.position[0]
+        if ino is None and self._expected[0] not in (None, current):
+            # Rotated between _start() and the first open: read the old file's tail from its segment.
+            violations += self.detector.feed_all(self._segment_signals(self.next_seq, self._expected[1]))
+            self.next_seq += 1
+        elif ino is not None and current != ino:
+            self.next_seq += 1  # the file we drained was sealed as the next segment
+        return violations
+
+    def _publish(self, violations: List[dict]) -> None:
+        if self.emit and violations:
+            get_writer(self.path).write([violation_signal(v) for v in violations])
+
+    def run_once(self, timeout: float = 0.0) -> List[dict]:
+        """Process everything appended since the checkpoint; returns new violations."""
+        self.state_path.parent.mkdir(parents=True, exist_ok=True)
+        with file_lock(self.state_path):
+            violations = self._start() if self.follower is None else []
+            ino = self.follower.position[0]
+            signals = self.follower.wait(timeout) if timeout else self.follower.poll()
+            violations += self._process(ino, signals)
+            self._publish(violations)
+            self._save()
+        return violations
+
+    def follow(self, callback: Optional[Callable[[List[dict]], None]] = None) -> None:
+        """Enforce forever; sleeps on inotify between appends."""
+        while True:
+            violations = self.run_once(timeout=1.0)
+            if violations and callback is not None:
+                callback(violations)
+
+    def close(self) -> None:
+        if self.follower is not None:
+            self.follower.close()
+            self.follower = None
+
+
+def scan(path: Union[str, Path] = DEFAULT_BLACKBOARD_PATH, lateness: float = DEFAULT_LATENESS) -> dict:
+    """One report-only pass over the whole history (segments and active file)."""
+    detector = SequenceDetector(lateness)
+    violations = detector.feed_all(iter_signals(path))
+    violations += detector.flush()
+    return {**detector.counts, "keys": len(detector.phases), "found": violations}
+
+
+def format_counts(counts: dict) -> str:
+    """One-line summary for agent tool output."""
+    kinds = ", ".join(f"{k}: {n}" for k, n in sorted(counts["violations"].items())) or "none"
+    return (
+        f"Checked {counts['signals']} signals across {counts.get('keys', 0)} generations "
+        f"({counts['late']} late): {sum(counts['violations'].values())} violations. By kind: {kinds}"
+    )
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Enforce HIVE phase sequence over the blackboard")
+    parser.add_argument("--blackboard", default=str(DEFAULT_BLACKBOARD_PATH), help="Blackboard JSONL file")
+    parser.add_argument("--lateness", type=float, help=f"Seconds of timestamp disorder to tolerate (default {DEFAULT_LATENESS:g})")
+    parser.add_argument("--scan", action="store_true", help="Report over the whole history; emit nothing")
+    parser.add_argument("--follow", action="store_true", help="Keep enforcing new appends")
+    parser.add_argument("--no-emit", action="store_true", help="Do not append error signals")
+    args = parser.parse_args(argv)
+
+    if args.scan:
+        result = scan(args.blackboard, DEFAULT_LATENESS if args.lateness is None else args.lateness)
+        for v in result["found"]:
+            print(f"{v['ts']}  gen {v['gen']} port {v['port']}  {v['from'] or '-'} → {v['to']}  {v['kind']}")
+        print(format_counts(result))
+        return 1 if result["found"] else 0
+
+    monitor = SequenceMonitor(args.blackboard, args.lateness, emit=not args.no_emit)
+    try:
+        found = monitor.run_once()
+        print(f"{len(found)} new violations. " + format_counts({**monitor.detector.counts, "keys": len(monitor.detector.phases)}))
+        if args.follow:
+            monitor.follow(lambda vs: [print(violation_signal(v)["msg"], flush=True) for v in vs])
+    except KeyboardInterrupt:
+        pass
+    finally:
+        monitor.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
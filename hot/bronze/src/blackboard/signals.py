@@ -0,0 +1,95 @@
+"""
+Blackboard Signals
+==================
+
+The 8-field stigmergy signal (see src/contracts/stigmergy.contract.ts) as the
+Python side writes and reads it:
+
+    {"ts": ..., "mark": ..., "pull": ..., "msg": ..., "type": ..., "hive": ..., "gen": ..., "port": ...}
+
+Signals are stored one JSON object per line, compact separators, UTF-8.
+"""
+
+import json
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import Iterator, Optional
+
+HIVE_PHASES = ("H", "I", "V", "E", "X")
+PULL_DIRECTIONS = ("upstream", "downstream", "lateral")
+SIGNAL_TYPES = ("signal", "event", "error", "metric")
+MIN_GENERATION = 85
+MAX_PORT = 7
+CURRENT_GENERATION = 87
+
+DEFAULT_BLACKBOARD_PATH = Path(
+    os.environ.get(
+        "HFO_BLACKBOARD",
+        Path(os.environ.get("WORKSPACE_ROOT", ".")) / "hot" / "blackboard.jsonl",
+    )
+)
+
+_decoder = json.JSONDecoder()
+
+
+def make_signal(
+    msg: str,
+    hive: str,
+    port: int,
+    type: str = "signal",
+    mark: float = 1.0,
+    pull: str = "downstream",
+    gen: int = CURRENT_GENERATION,
+    ts: Optional[str] = None,
+) -> dict:
+    """Build a signal dict in canonical field order."""
+    return {
+        "ts": ts or datetime.utcnow().isoformat(timespec="milliseconds") + "Z",
+        "mark": mark,
+        "pull": pull,
+        "msg": msg,
+        "type": type,
+        "hive": hive,
+        "gen": gen,
+        "port": port,
+    }
+
+
+def encode_signal(signal: dict) -> bytes:
+    """One newline-terminated JSONL record."""
+    return (json.dumps(signal, ensure_ascii=False, separators=(",", ":")) + "\n").encode("utf-8")
+
+
+def decode_line(raw: bytes) -> str:
+    """
+    Decode one raw JSONL line.
+
+    Some legacy lines were appended by PowerShell as UTF-16LE (NUL between
+    every ASCII byte) or in a legacy code page; NULs are dropped and
+    undecodable bytes replaced rather than failing the whole read.
+    """
+    if b"\x00" in raw:
+        raw = raw.replace(b"\x00", b"")
+    return raw.decode("utf-8", errors="replace")
+
+
+def parse_line(line: str) -> Iterator[dict]:
+    """
+    Decode every JSON object on a line.
+
+    Tolerates blank lines and the legacy records where two signals were
+    written onto one line separated by a space; undecodable text is skipped.
+    """
+    idx, end = 0, len(line)
+    while idx < end:
+        while idx < end and line[idx].isspace():
+            idx += 1
+        if idx >= end:
+            return
+        try:
+            obj, idx = _decoder.raw_decode(line, idx)
+        except json.JSONDecodeError:
+            return
+        if isinstance(obj, dict):
+            yield obj
@@ -0,0 +1,88 @@
+"""
+Blackboard Statistics
+=====================
+
+Mergeable per-signal counters: a stats dict folds signals one at a time and
+two stats dicts over disjoint ranges of the log merge into the stats of
+their union. Sealed segments store theirs in the segment manifest, so
+aggregates over months of history never re-read old segments.
+
+All keys are strings so the dicts round-trip through JSON unchanged.
+Earliest/latest are decided on parsed instants (min_ms/max_ms), not on
+the timestamp text, so offsets like -07:00 and arrival order do not skew
+them; per-minute buckets are UTC.
+"""
+
+import time
+from typing import Dict, Optional
+
+from .index import parse_ts
+
+PER_MINUTE_WINDOW = 1440  # minutes of per-minute counts to keep
+MINUTE_FORMAT = "%Y-%m-%dT%H:%M"
+
+
+def new_stats() -> dict:
+    return {
+        "total": 0,
+        "by_phase": {},
+        "by_port": {},
+        "by_type": {},
+        "by_gen": {},
+        "min_ts": None,
+        "max_ts": None,
+        "min_ms": None,
+        "max_ms": None,
+        "per_minute": {},
+    }
+
+
+def _bump(counter: Dict[str, int], key, n: int = 1) -> None:
+    key = str(key)
+    counter[key] = counter.get(key, 0) + n
+
+
+def add_signal(stats: dict, signal: dict) -> None:
+    """Fold one signal into `stats` in place."""
+    stats["total"] += 1
+    _bump(stats["by_phase"], signal.get("hive", "X"))
+    _bump(stats["by_port"], signal.get("port"))
+    _bump(stats["by_type"], signal.get("type"))
+    _bump(stats["by_gen"], signal.get("gen"))
+    ts = signal.get("ts")
+    ms = parse_ts(ts) if isinstance(ts, str) else None
+    if ms is None:
+        return
+    if stats["min_ms"] is None or ms < stats["min_ms"]:
+        stats["min_ts"], stats["min_ms"] = ts, ms
+    if stats["max_ms"] is None or ms > stats["max_ms"]:
+        stats["max_ts"], stats["max_ms"] = ts, ms
+    _bump(stats["per_minute"], time.strftime(MINUTE_FORMAT, time.gmtime(ms // 1000)))
+
+
+def _bound(stats: dict, which: str) -> Optional[int]:
+    # Stats written before min_ms/max_ms existed only have the text.
+    ms = stats.get(f"{which}_ms")
+    return ms if ms is not None else parse_ts(stats[f"{which}_ts"])
+
+
+def merge_stats(into: dict, other: dict) -> dict:
+    """Add `other` into `into` in place and return it."""
+    into["total"] += other["total"]
+    for field in ("by_phase", "by_port", "by_type", "by_gen", "per_minute"):
+        for key, n in other[field].items():
+            _bump(into[field], key, n)
+    for which, better in (("min", lambda a, b: a < b), ("max", lambda a, b: a > b)):
+        ms = _bound(other, which)
+        current = _bound(into, which)
+        if ms is not None and (current is None or better(ms, current)):
+            into[f"{which}_ts"], into[f"{which}_ms"] = other[f"{which}_ts"], ms
+    return into
+
+
+def trim_per_minute(stats: dict, window: int = PER_MINUTE_WINDOW) -> dict:
+    """Keep only the newest `window` minutes of per-minute counts."""
+    minutes = stats["per_minute"]
+    if len(minutes) > window:
+        stats["per_minute"] = {k: minutes[k] for k in sorted(minutes)[-window:]}
+    return stats
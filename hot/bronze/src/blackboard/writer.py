@@ -0,0 +1,273 @@
+"""
+Blackboard Writer
+=================
+
+Single append-only JSONL blackboard shared by every Commander process.
+
+- emit() only enqueues; a background thread writes batches of up to
+  `max_batch` signals, or whatever is pending after `max_delay` seconds.
+- Each batch is encoded up front and written with one os.write() on an
+  O_APPEND descriptor while holding the cross-process `<file>.lock`, so
+  concurrent writers never interleave partial lines.
+- fsync policy: every `fsync_every` signals and/or every `fsync_interval`
+  seconds; leave both as None to rely on the OS (fastest, least durable).
+- Append hooks receive (path, [(offset, length, signal), ...]) after each
+  batch lands, for indexes and subscribers that follow the log.
+- HFO_BLACKBOARD_TRANSPORT=ring sends emit_signal() through the
+  shared-memory ring (see ring.py) while its drainer is running.
+- HFO_BLACKBOARD_ROTATE_BYTES / HFO_BLACKBOARD_ROTATE_HOURS make writers
+  from get_writer() seal the active file into segments once it passes that
+  size or age (see segments.attach_rotation). Rotation is off by default.
+"""
+
+import atexit
+import json
+import os
+import threading
+import time
+from datetime import timedelta
+from pathlib import Path
+from typing import Callable, List, Optional, Sequence, Tuple, Union
+
+from .locking import file_lock
+from .signals import DEFAULT_BLACKBOARD_PATH, encode_signal, make_signal
+
+TRANSPORT = os.environ.get("HFO_BLACKBOARD_TRANSPORT", "file")
+ROTATE_BYTES = os.environ.get("HFO_BLACKBOARD_ROTATE_BYTES")
+ROTATE_HOURS = os.environ.get("HFO_BLACKBOARD_ROTATE_HOURS")
+
+Appended = Tuple[int, int, dict]
+AppendHook = Callable[[Path, List[Appended]], None]
+
+
+class BlackboardWriter:
+    """Batched, locked appender for one blackboard file."""
+
+    def __init__(
+        self,
+        path: Union[str, Path] = DEFAULT_BLACKBOARD_PATH,
+        max_batch: int = 256,
+        max_delay: float = 0.02,
+        fsync_every: Optional[int] = None,
+        fsync_interval: Optional[float] = 1.0,
+    ):
+        self.path = Path(path)
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.fsync_every = fsync_every
+        self.fsync_interval = fsync_interval
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        self._hooks: List[AppendHook] = []
+        self._cond = threading.Condition()
+        self._queue: List[dict] = []
+        self._oldest: Optional[float] = None
+        self._requested = 0
+        self._written = 0
+        self._closed = False
+        self._error: Optional[Exception] = None
+        self._unsynced = 0
+        self._last_fsync = time.monotonic()
+        self.stats = {"signals": 0, "batches": 0, "fsyncs": 0, "bytes": 0}
+
+        self._thread = threading.Thread(target=self._run, name="blackboard-writer", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def add_append_hook(self, hook: AppendHook) -> None:
+        self._hooks.append(hook)
+
+    # --- producers --------------------------------------------------------
+
+    def emit(self, signal: dict) -> None:
+        """Queue a signal for the next batch."""
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("BlackboardWriter is closed")
+            self._queue.append(signal)
+            if self._oldest is None:
+                self._oldest = time.monotonic()
+                self._cond.notify_all()
+            elif len(self._queue) >= self.max_batch:
+                self._cond.notify_all()
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Block until everything emitted so far is written (and fsynced, if a
+        policy is set). Re-raises the last write error; those signals stay queued.
+        """
+        with self._cond:
+            self._requested += 1
+            ticket = self._requested
+            self._cond.notify_all()
+            done = self._cond.wait_for(lambda: self._written >= ticket, timeout)
+            error, self._error = self._error, None
+        if error is not None:
+            raise error
+        return done
+
+    def close(self) -> None:
+        """Write what is queued and stop the background thread."""
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join()
+
+    # --- synchronous path -------------------------------------------------
+
+    def write(self, signals: Sequence[dict], sync: bool = False) -> List[Appended]:
+        """Append a batch now; returns (offset, length, signal) per record."""
+        appended = self._append(signals, sync)
+        self._run_hooks(appended)
+        return appended
+
+    def write_records(self, records: Sequence[bytes], sync: bool = False) -> int:
+        """Append already encoded records (one JSONL line each); hooks get them decoded."""
+        if not records:
+            return 0
+        offset = self._append_data(b"".join(records), len(records), sync)
+        if self._hooks:
+            appended = []
+            for record in records:
+                appended.append((offset, len(record), json.loads(record)))
+                offset += len(record)
+            self._run_hooks(appended)
+        return len(records)
+
+    def _append(self, signals: Sequence[dict], sync: bool) -> List[Appended]:
+        if not signals:
+            return []
+        records = [encode_signal(s) for s in signals]
+        offset = self._append_data(b"".join(records), len(signals), sync)
+        appended = []
+        for record, signal in zip(records, signals):
+            appended.append((offset, len(record), signal))
+            offset += len(record)
+        return appended
+
+    def _append_data(self, data: bytes, count: int, sync: bool) -> int:
+        """One locked O_APPEND write of `count` records; returns the offset it landed at."""
+        with file_lock(self.path):
+            fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT | getattr(os, "O_BINARY", 0), 0o644)
+            try:
+                offset = os.fstat(fd).st_size
+                view = memoryview(data)
+                while view:
+                    view = view[os.write(fd, view):]
+                self._unsynced += count
+                if sync or self._fsync_due():
+                    os.fsync(fd)
+                    self._unsynced = 0
+                    self._last_fsync = time.monotonic()
+                    self.stats["fsyncs"] += 1
+            finally:
+                os.close(fd)
+            self.stats["signals"] += count
+            self.stats["batches"] += 1
+            self.stats["bytes"] += len(data)
+        return offset
+
+    def _run_hooks(self, appended: List[Appended]) -> None:
+        if appended:
+            for hook in self._hooks:
+                hook(self.path, appended)
+
+    def _fsync_due(self) -> bool:
+        if self.fsync_every is not None and self._unsynced >= self.fsync_every:
+            return True
+        if self.fsync_interval is not None and time.monotonic() - self._last_fsync >= self.fsync_interval:
+            return True
+        return False
+
+    # --- background batching ----------------------------------------------
+
+    def _due(self) -> bool:
+        if self._closed or self._requested > self._written:
+            return True
+        if not self._queue:
+            return False
+        return len(self._queue) >= self.max_batch or time.monotonic() - self._oldest >= self.max_delay
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._due():
+                    wait = None
+                    if self._oldest is not None:
+                        wait = max(0.0, self.max_delay - (time.monotonic() - self._oldest))
+                    self._cond.wait(wait)
+                batch, self._queue = self._queue, []
+                self._oldest = None
+                ticket = self._requested
+                closing = self._closed
+
+            error = None
+            requeue = False
+            if batch:
+                # A flush or close asks for durability when any fsync policy is configured.
+                sync = (closing or ticket > self._written) and (
+                    self.fsync_every is not None or self.fsync_interval is not None
+                )
+                try:
+                    appended = self._append(batch, sync)
+                except Exception as e:  # keep the signals; retry on the next window
+                    error, requeue = e, True
+                else:
+                    try:
+                        self._run_hooks(appended)
+                    except Exception as e:  # signals are durable; only report it
+                        error = e
+
+            with self._cond:
+                if requeue:
+                    self._queue[:0] = batch
+                    self._oldest = time.monotonic()
+                    if closing:
+                        self._error = error
+                        self._written = ticket
+                        self._cond.notify_all()
+                        return
+                if error is not None:
+                    self._error = error
+                self._written = ticket
+                self._cond.notify_all()
+                if closing and not self._queue:
+                    return
+
+
+_writers = {}
+_writers_lock = threading.Lock()
+
+
+def get_writer(path: Union[str, Path] = DEFAULT_BLACKBOARD_PATH) -> BlackboardWriter:
+    """Process-wide writer for a blackboard file."""
+    key = Path(path).resolve()
+    with _writers_lock:
+        writer = _writers.get(key)
+        if writer is None:
+            writer = _writers[key] = BlackboardWriter(key)
+            if ROTATE_BYTES or ROTATE_HOURS:
+                from .segments import attach_rotation
+
+                attach_rotation(
+                    writer,
+                    max_bytes=int(ROTATE_BYTES) if ROTATE_BYTES else None,
+                    max_age=timedelta(hours=float(ROTATE_HOURS)) if ROTATE_HOURS else None,
+                )
+        return writer
+
+
+def emit_signal(msg: str, hive: str, port: int, **fields) -> dict:
+    """Build a signal, queue it on the default blackboard and return it."""
+    signal = make_signal(msg, hive, port, **fields)
+    if TRANSPORT == "ring":
+        from .ring import get_producer  # shared-memory transport, when a drainer runs
+
+        producer = get_producer()
+        if producer is not None:
+            producer.emit(signal)
+            return signal
+    get_writer().emit(signal)
+    return signal
@@ -13,6 +13,13 @@ from crewai import Agent, LLM
 from crewai.tools import tool
 from typing import Dict, Any, Optional
 import os
+import json
+
+from ...blackboard import emit_signal
+from ...memory_bank.cache import get_query_cache
+from ...memory_bank.contracts import get_contract_registry
+from ...memory_bank.federation import format_hits, get_federation
+from ...memory_bank.write_buffer import get_write_buffer
 
 
 # === TOOLS ===
@@ -20,31 +27,71 @@ import os
 @tool
 def store_to_memory(key: str, value: str) -> str:
     """Store a value in the memory bank."""
-    return f"Stored '{key}': {value[:100]}..."
+    pending = get_write_buffer().put(key, value)
+    return f"Stored '{key}': {value[:100]}... ({pending} writes pending group commit)"
 
 
 @tool
 def recall_from_memory(key: str) -> str:
     """Recall a value from the memory bank."""
-    return f"Recalled '{key}': [Placeholder - query DuckDB]"
+    value = get_write_buffer().get(key)
+    if value is None:
+        return f"Nothing stored under '{key}'"
+    return f"Recalled '{key}': {value}"
 
 
 @tool
 def persist_contract(name: str, schema: str) -> str:
     """Persist a contract schema to memory."""
-    return f"Contract '{name}' persisted to memory bank"
+    entry = get_contract_registry().persist(name, schema)
+    if entry["reused"]:
+        return f"Contract '{name}' unchanged - already stored as v{entry['version']}"
+    result = f"Contract '{name}' persisted to memory bank as v{entry['version']}"
+    if entry["structural_matches"]:
+        same = ", ".join(f"{m['name']}@v{m['version']}" for m in entry["structural_matches"])
+        result += f" (same structure as {same})"
+    return result
+
+
+@tool
+def lookup_contract(schema: str) -> str:
+    """Find registered contracts with the same structure as a schema."""
+    matches = get_contract_registry().find_by_structure(schema)
+    if not matches:
+        return "No equivalent contract registered"
+    return "Equivalent contracts: " + ", ".join(f"{m['name']}@v{m['version']}" for m in matches)
+
+
+@tool
+def contract_diff(name: str, from_version: int, to_version: Optional[int] = None) -> str:
+    """Show the diff between two versions of a persisted contract."""
+    try:
+        return get_contract_registry().diff(name, from_version, to_version) or "No changes"
+    except KeyError as e:
+        return str(e)
 
 
 @tool
 def query_artifacts(fts_query: str) -> str:
-    """Query artifacts using full-text search."""
-    return f"FTS query '{fts_query}': [Placeholder - results from 6,423 artifacts]"
+    """Query artifacts across all memory banks using full-text search."""
+    return format_hits(get_federation().search(fts_query, limit=20))
+
+
+@tool
+def memory_cache_stats() -> str:
+    """Report memory bank query cache hit rate and size."""
+    m = get_query_cache().metrics()
+    return (
+        f"Query cache: {m['hit_rate']:.1%} hit rate ({m['hits']} hits, {m['misses']} misses), "
+        f"{m['entries']} entries, {m['stale']} stale, {m['evictions']} evicted, generation {m['generation']}"
+    )
 
 
 @tool
 def emit_store_signal(message: str) -> str:
     """Emit a STORE signal to the blackboard."""
-    return f"Signal emitted: {{port: 6, hive: 'I', msg: '{message}'}}"
+    signal = emit_signal(message, hive="I", port=6)
+    return f"Signal emitted: {json.dumps(signal, ensure_ascii=False)}"
 
 
 # === AGENT ===
@@ -72,9 +119,9 @@ def create_kraken_keeper(verbose: bool = True, llm: Optional[LLM] = None) -> Age
         You operate in the INTERLOCK phase (I) alongside Web Weaver (Port 1).
         You persist contracts, store artifacts, and enable recall.
         
-        Your tools: memory storage, recall, contract persistence, FTS queries.
+        Your tools: memory storage, recall, contract persistence and lookup, FTS queries.
         The memory bank contains 6,423 artifacts from Pre-HFO to Gen84.""",
-        tools=[store_to_memory, recall_from_memory, persist_contract, query_artifacts, emit_store_signal],
+        tools=[store_to_memory, recall_from_memory, persist_contract, lookup_contract, contract_diff, query_artifacts, memory_cache_stats, emit_store_signal],
         verbose=verbose,
         allow_delegation=False,
         llm=llm,
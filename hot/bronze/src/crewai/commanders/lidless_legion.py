@@ -13,15 +13,30 @@ from crewai import Agent, LLM
 from crewai.tools import tool
 from typing import Optional
 import os
+import json
+
+from ...blackboard import emit_signal
+from ...memory_bank import format_excerpts, highlight, shared_connection
+from ...memory_bank.federation import format_hits, get_federation
 
 
 # === TOOLS ===
 
 @tool
 def search_memory_bank(query: str) -> str:
-    """Search the HFO memory bank (6,423 artifacts) using FTS."""
-    # Placeholder - would use DuckDB FTS
-    return f"Memory search for '{query}': [Placeholder - connect to DuckDB]"
+    """Search every HFO memory bank generation using FTS (globally BM25-ranked)."""
+    return format_hits(get_federation().search(query))
+
+
+@tool
+def highlight_memory_bank(terms: str) -> str:
+    """Extract ranked excerpts (with line numbers) around comma-separated terms in the memory bank."""
+    cursor = shared_connection().cursor()
+    try:
+        excerpts = highlight(cursor, [t.strip() for t in terms.split(",")], case_sensitive=False)
+    finally:
+        cursor.close()
+    return format_excerpts(excerpts)
 
 
 @tool
@@ -42,7 +57,8 @@ def grep_codebase(pattern: str, path: Optional[str] = None) -> str:
 @tool
 def emit_sense_signal(message: str) -> str:
     """Emit a SENSE signal to the blackboard."""
-    return f"Signal emitted: {{port: 0, hive: 'H', msg: '{message}'}}"
+    signal = emit_signal(message, hive="H", port=0)
+    return f"Signal emitted: {json.dumps(signal, ensure_ascii=False)}"
 
 
 # === AGENT ===
@@ -68,11 +84,11 @@ def create_lidless_legion(verbose: bool = True, llm: Optional[LLM] = None) -> Ag
         Your secret: "Perception without interpretation."
         
         You operate in the HUNT phase (H) alongside Spider Sovereign (Port 7).
-        Your tools: memory bank search, web search (Tavily), codebase grep.
+        Your tools: memory bank search and highlights, web search (Tavily), codebase grep.
         
         You find exemplars, ground claims in sources, and report raw findings.
         You do NOT interpret - that is for other Commanders.""",
-        tools=[search_memory_bank, search_web, grep_codebase, emit_sense_signal],
+        tools=[search_memory_bank, highlight_memory_bank, search_web, grep_codebase, emit_sense_signal],
         verbose=verbose,
         allow_delegation=False,
         llm=llm,
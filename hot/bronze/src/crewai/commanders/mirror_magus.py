@@ -13,6 +13,9 @@ from crewai import Agent, LLM
 from crewai.tools import tool
 from typing import Optional
 import os
+import json
+
+from ...blackboard import emit_signal
 
 
 # === TOOLS ===
@@ -47,7 +50,8 @@ def apply_pattern(pattern_name: str, code: str) -> str:
 @tool
 def emit_shape_signal(message: str) -> str:
     """Emit a SHAPE signal to the blackboard."""
-    return f"Signal emitted: {{port: 2, hive: 'V', msg: '{message}'}}"
+    signal = emit_signal(message, hive="V", port=2)
+    return f"Signal emitted: {json.dumps(signal, ensure_ascii=False)}"
 
 
 # === AGENT ===
@@ -13,59 +13,95 @@ from crewai import Agent, LLM
 from crewai.tools import tool
 from typing import Dict, Optional
 import os
+import json
+
+from ...blackboard import emit_signal
+from ...blackboard.gates import GATES, check_signal, format_report, quarantine, validate_blackboard
+from ...blackboard.sequence import VIOLATION_MESSAGES, SequenceDetector, SequenceMonitor, classify, format_counts
 
 
 # === TOOLS ===
 
 @tool
 def validate_gate(gate_id: str, signal: str) -> str:
-    """Validate a signal against a specific gate (G0-G11)."""
-    gates = {
-        "G0": "ts - Valid ISO8601",
-        "G1": "mark - 0.0 ≤ mark ≤ 1.0",
-        "G2": "pull - upstream/downstream/lateral",
-        "G3": "msg - Non-empty string",
-        "G4": "type - signal/event/error/metric",
-        "G5": "hive - H/I/V/E/X",
-        "G6": "gen - Integer ≥ 85",
-        "G7": "port - Integer 0-7",
-    }
-    if gate_id not in gates:
-        return f"Unknown gate: {gate_id}. Valid: G0-G11"
-    return f"Gate {gate_id} ({gates.get(gate_id, 'custom')}): PASSED"
+    """Validate a signal (JSON) against a specific gate (G0-G7), or ALL gates."""
+    if gate_id != "ALL" and gate_id not in GATES:
+        return f"Unknown gate: {gate_id}. Valid: G0-G7, ALL"
+    try:
+        parsed = json.loads(signal)
+    except ValueError as e:
+        return f"Gate {gate_id}: FAILED (signal is not valid JSON: {e})"
+    if not isinstance(parsed, dict):
+        return f"Gate {gate_id}: FAILED (signal must be a JSON object)"
+    failures = check_signal(parsed, None if gate_id == "ALL" else [gate_id])
+    if failures:
+        return f"Gate {gate_id}: FAILED ({'; '.join(failures)})"
+    rule = "all gates" if gate_id == "ALL" else f"{GATES[gate_id][0]} - {GATES[gate_id][1]}"
+    return f"Gate {gate_id} ({rule}): PASSED"
+
+
+@tool
+def validate_blackboard_gates(full: bool = False) -> str:
+    """Validate every new blackboard signal against G0-G7 and quarantine failures."""
+    return format_report(validate_blackboard(full=full))
 
 
 @tool
 def enforce_hive_sequence(current_phase: str, previous_phase: str) -> str:
-    """Enforce HIVE phase sequence rules."""
-    valid_transitions = {
-        "H": ["I"],
-        "I": ["V"],
-        "V": ["E"],
-        "E": ["H"],  # Strange loop
-    }
-    if current_phase not in valid_transitions.get(previous_phase, []):
-        return f"VIOLATION: {previous_phase} → {current_phase} is not allowed"
+    """
+    Enforce HIVE phase sequence rules, using the transition matrix of
+    src/enforcement/hive-validator.ts: a phase may repeat (H → H), move to
+    the next phase (E loops back to H) or hand off (X).
+    """
+    violation = classify(previous_phase or None, current_phase)
+    if violation:
+        return f"VIOLATION: {previous_phase} → {current_phase} is not allowed ({violation}: {VIOLATION_MESSAGES[violation]})"
     return f"Transition {previous_phase} → {current_phase}: VALID"
 
 
+@tool
+def monitor_hive_sequence() -> str:
+    """Check new blackboard signals for HIVE sequence violations and emit them as error signals."""
+    monitor = SequenceMonitor(use_inotify=False)
+    try:
+        found = monitor.run_once()
+        counts = {**monitor.detector.counts, "keys": len(monitor.detector.phases)}
+    finally:
+        monitor.close()
+    return f"{len(found)} new violations emitted. Since start: {format_counts(counts)}"
+
+
 @tool
 def quarantine_signal(signal: str, reason: str) -> str:
     """Quarantine a signal that violates rules."""
+    quarantine([{"source": "pyre_praetorian", "reasons": [reason], "raw": signal}])
     return f"Signal QUARANTINED: {reason}"
 
 
 @tool
 def detect_reward_hack(trace: str) -> str:
-    """Detect reward hacking (GREEN without prior RED)."""
-    # Placeholder detection logic
-    return f"Reward hack detection for trace {trace}: [Analysis result]"
+    """Detect reward hacking (GREEN without prior RED) in a phase trace ("H,I,V,E") or a JSON list of signals."""
+    try:
+        signals = json.loads(trace)
+    except ValueError:
+        signals = None
+    if not isinstance(signals, list):
+        signals = [{"hive": phase.strip(), "gen": 0, "port": 0} for phase in trace.replace("→", ",").split(",") if phase.strip()]
+    detector = SequenceDetector()
+    found = detector.feed_all(s for s in signals if isinstance(s, dict))
+    found += detector.flush()
+    hacks = [v for v in found if v["kind"] == "REWARD_HACK"]
+    if not hacks:
+        return f"No reward hack in {detector.counts['signals']} signals"
+    steps = "; ".join(f"{v['from'] or '-'} → {v['to']} (gen {v['gen']} port {v['port']})" for v in hacks)
+    return f"REWARD HACK DETECTED ({len(hacks)}): {steps}"
 
 
 @tool
 def emit_defend_signal(message: str) -> str:
     """Emit a DEFEND signal to the blackboard."""
-    return f"Signal emitted: {{port: 5, hive: 'V', msg: '{message}'}}"
+    signal = emit_signal(message, hive="V", port=5)
+    return f"Signal emitted: {json.dumps(signal, ensure_ascii=False)}"
 
 
 # === AGENT ===
@@ -91,11 +127,11 @@ def create_pyre_praetorian(verbose: bool = True, llm: Optional[LLM] = None) -> A
         Your secret: "Forgiveness Architecture."
         
         You operate in the VALIDATE phase (V) alongside Mirror Magus (Port 2).
-        You enforce G0-G11 gates and HIVE sequence rules.
+        You enforce G0-G7 gates and HIVE sequence rules.
         
         Your tools: gate validation, sequence enforcement, quarantine, reward hack detection.
         You protect the system from violations and ensure honest TDD.""",
-        tools=[validate_gate, enforce_hive_sequence, quarantine_signal, detect_reward_hack, emit_defend_signal],
+        tools=[validate_gate, validate_blackboard_gates, enforce_hive_sequence, monitor_hive_sequence, quarantine_signal, detect_reward_hack, emit_defend_signal],
         verbose=verbose,
         allow_delegation=False,
         llm=llm,
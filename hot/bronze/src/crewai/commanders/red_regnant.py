@@ -16,6 +16,9 @@ from crewai import Agent, LLM
 from crewai.tools import tool
 from typing import Optional
 import os
+import json
+
+from ...blackboard import emit_signal
 
 
 # === TOOLS ===
@@ -50,7 +53,8 @@ def red_queen_check(component: str) -> str:
 @tool
 def emit_test_signal(message: str) -> str:
     """Emit a TEST signal to the blackboard."""
-    return f"Signal emitted: {{port: 4, hive: 'E', msg: '{message}'}}"
+    signal = emit_signal(message, hive="E", port=4)
+    return f"Signal emitted: {json.dumps(signal, ensure_ascii=False)}"
 
 
 # === AGENT ===
@@ -13,6 +13,9 @@ from crewai import Agent, LLM
 from crewai.tools import tool
 from typing import List, Optional
 import os
+import json
+
+from ...blackboard import emit_signal
 
 
 # === TOOLS ===
@@ -44,7 +47,8 @@ def determine_hive_phase(task_description: str) -> str:
 @tool
 def emit_decide_signal(message: str) -> str:
     """Emit a DECIDE signal to the blackboard."""
-    return f"Signal emitted: {{port: 7, hive: 'H', msg: '{message}'}}"
+    signal = emit_signal(message, hive="H", port=7)
+    return f"Signal emitted: {json.dumps(signal, ensure_ascii=False)}"
 
 
 @tool
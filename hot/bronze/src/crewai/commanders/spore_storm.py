@@ -14,7 +14,8 @@ from crewai.tools import tool
 from typing import Optional
 import os
 import json
-from datetime import datetime
+
+from ...blackboard import emit_signal
 
 
 # === TOOLS ===
@@ -22,17 +23,8 @@ from datetime import datetime
 @tool
 def emit_to_blackboard(message: str, hive_phase: str = "E") -> str:
     """Emit a signal to the obsidian blackboard."""
-    signal = {
-        "ts": datetime.utcnow().isoformat() + "Z",
-        "mark": 1.0,
-        "pull": "downstream",
-        "msg": message,
-        "type": "event",
-        "hive": hive_phase,
-        "gen": 87,
-        "port": 3
-    }
-    return f"Blackboard signal: {json.dumps(signal)}"
+    signal = emit_signal(message, hive=hive_phase, port=3, type="event")
+    return f"Blackboard signal: {json.dumps(signal, ensure_ascii=False)}"
 
 
 @tool
@@ -56,7 +48,8 @@ def prepare_next_cycle(lessons: str) -> str:
 @tool
 def emit_deliver_signal(message: str) -> str:
     """Emit a DELIVER signal to the blackboard."""
-    return f"Signal emitted: {{port: 3, hive: 'E', msg: '{message}'}}"
+    signal = emit_signal(message, hive="E", port=3)
+    return f"Signal emitted: {json.dumps(signal, ensure_ascii=False)}"
 
 
 # === AGENT ===
@@ -13,6 +13,10 @@ from crewai import Agent, LLM
 from crewai.tools import tool
 from typing import Optional
 import os
+import json
+
+from ...blackboard import emit_signal
+from ...memory_bank.contracts import get_contract_registry
 
 
 # === TOOLS ===
@@ -20,7 +24,7 @@ import os
 @tool
 def define_zod_schema(name: str, fields: str) -> str:
     """Define a Zod schema for contract validation."""
-    return f"""// {name}.schema.ts
+    schema = f"""// {name}.schema.ts
 import {{ z }} from 'zod';
 
 export const {name}Schema = z.object({{
@@ -28,6 +32,11 @@ export const {name}Schema = z.object({{
 }});
 
 export type {name} = z.infer<typeof {name}Schema>;"""
+    matches = get_contract_registry().find_by_structure(schema)
+    if matches:
+        existing = ", ".join(f"{m['name']}@v{m['version']}" for m in matches)
+        return f"// Equivalent contract already registered: {existing} - reuse it instead\n{schema}"
+    return schema
 
 
 @tool
@@ -60,7 +69,8 @@ export class {interface}Adapter implements {interface}Port {{
 @tool
 def emit_fuse_signal(message: str) -> str:
     """Emit a FUSE signal to the blackboard."""
-    return f"Signal emitted: {{port: 1, hive: 'I', msg: '{message}'}}"
+    signal = emit_signal(message, hive="I", port=1)
+    return f"Signal emitted: {json.dumps(signal, ensure_ascii=False)}"
 
 
 # === AGENT ===
@@ -0,0 +1,71 @@
+"""
+HFO Memory Bank
+===============
+
+DuckDB-backed artifact store (Pre-HFO → Gen84+) shared by the HIVE/8 Commanders
+and the research scripts.
+
+Usage:
+    from memory_bank import connect, highlight
+    con = connect()
+    for ex in highlight(con, ["HIVE/8:1010", "HIVE/8:2121"]):
+        print(ex["filename"], ex["start_line"], ex["text"])
+"""
+
+from .cache import QueryCache, bump_generation, get_query_cache
+from .connection import (
+    DEFAULT_DB_PATH,
+    WRITES_DB_PATH,
+    connect,
+    process_writes_path,
+    shared_connection,
+    writes_connection,
+    writes_stores,
+)
+from .contracts import ContractRegistry, get_contract_registry, normalize_schema, structure_of
+from .federation import BankSpec, Federation, get_federation, load_banks
+from .highlight import build_pattern, format_excerpts, highlight
+from .ingest import IngestRoot, default_roots, ingest, merge_writes
+from .snapshot import (
+    current_snapshot,
+    export_snapshot,
+    list_snapshots,
+    open_snapshot,
+    search_snapshot,
+)
+from .write_buffer import WriteBehindBuffer, get_write_buffer
+
+__all__ = [
+    "QueryCache",
+    "bump_generation",
+    "get_query_cache",
+    "DEFAULT_DB_PATH",
+    "WRITES_DB_PATH",
+    "connect",
+    "process_writes_path",
+    "shared_connection",
+    "writes_connection",
+    "writes_stores",
+    "ContractRegistry",
+    "get_contract_registry",
+    "normalize_schema",
+    "structure_of",
+    "BankSpec",
+    "Federation",
+    "get_federation",
+    "load_banks",
+    "build_pattern",
+    "format_excerpts",
+    "highlight",
+    "IngestRoot",
+    "default_roots",
+    "ingest",
+    "merge_writes",
+    "current_snapshot",
+    "export_snapshot",
+    "list_snapshots",
+    "open_snapshot",
+    "search_snapshot",
+    "WriteBehindBuffer",
+    "get_write_buffer",
+]
@@ -0,0 +1,142 @@
+"""
+Memory Bank BM25
+================
+
+BM25 scoring over the tables `PRAGMA create_fts_index` builds
+(docs, terms, dict, stats), split in two steps so corpus statistics can come
+from somewhere other than the bank being scored:
+
+1. `term_stats` - document count, average length and per-term document
+   frequency for a query in one bank.
+2. `score` - rank one bank's documents using the given statistics.
+
+A single bank passes its own statistics back in; a federation sums them
+across banks first so scores from different banks are comparable.
+
+Tokenization matches the create_fts_index defaults (porter stemmer, lower,
+strip_accents, non-letters as separators).
+"""
+
+from typing import Dict, List, NamedTuple, Optional
+
+import duckdb
+
+# Table names for a live bank (FTS schema) and for a Parquet snapshot (views).
+BANK_FTS_TABLES = {
+    "docs": "fts_main_artifacts.docs",
+    "terms": "fts_main_artifacts.terms",
+    "dict": "fts_main_artifacts.dict",
+    "stats": "fts_main_artifacts.stats",
+}
+SNAPSHOT_FTS_TABLES = {name: f"fts_{name}" for name in ("docs", "terms", "dict", "stats")}
+
+QUERY_TERMS_CTE = """
+q AS (
+    SELECT DISTINCT stem(token, 'porter') AS term
+    FROM (SELECT unnest(string_split_regex(lower(strip_accents($query)), '[^a-z]+')) AS token)
+    WHERE token <> ''
+)
+"""
+
+TERM_STATS_SQL = """
+WITH {query_terms}
+SELECT q.term, coalesce(d.df, 0) AS df
+FROM q LEFT JOIN {dict} d USING (term)
+"""
+
+SCORE_SQL = """
+WITH qt AS (
+    SELECT d.termid, g.df
+    FROM (SELECT unnest($terms) AS term, unnest($dfs) AS df) g
+    JOIN {dict} d USING (term)
+    WHERE g.df > 0
+),
+tf AS (
+    SELECT t.docid, t.termid, count(*) AS tf
+    FROM {terms} t JOIN qt USING (termid)
+    GROUP BY ALL
+),
+scored AS (
+    SELECT docs.name AS id,
+           sum(
+               ln(($num_docs - qt.df + 0.5) / (qt.df + 0.5) + 1)
+               * tf.tf * ($k + 1)
+               / (tf.tf + $k * (1 - $b + $b * docs.len / $avgdl))
+           ) AS score
+    FROM tf
+    JOIN qt USING (termid)
+    JOIN {docs} docs USING (docid)
+    GROUP BY docs.name
+)
+SELECT a.id, a.filename, a.generation, a.era, scored.score
+FROM scored JOIN artifacts a USING (id)
+WHERE a.generation BETWEEN $min_generation AND $max_generation
+ORDER BY scored.score DESC
+LIMIT $limit
+"""
+
+
+class TermStats(NamedTuple):
+    """Corpus statistics BM25 needs for one query."""
+    num_docs: int
+    avgdl: float
+    df: Dict[str, int]
+
+
+def term_stats(
+    con: duckdb.DuckDBPyConnection,
+    query: str,
+    tables: Dict[str, str] = BANK_FTS_TABLES,
+) -> TermStats:
+    """Document count, average length and per-term df for `query` in one bank."""
+    num_docs, avgdl = con.execute(f"SELECT num_docs, avgdl FROM {tables['stats']}").fetchone()
+    rows = con.execute(
+        TERM_STATS_SQL.format(query_terms=QUERY_TERMS_CTE, dict=tables["dict"]),
+        {"query": query},
+    ).fetchall()
+    return TermStats(num_docs, avgdl, dict(rows))
+
+
+def merge_term_stats(stats: List[TermStats]) -> TermStats:
+    """Combine per-bank statistics into corpus-wide statistics."""
+    num_docs = sum(s.num_docs for s in stats)
+    total_len = sum(s.num_docs * s.avgdl for s in stats)
+    df: Dict[str, int] = {}
+    for s in stats:
+        for term, count in s.df.items():
+            df[term] = df.get(term, 0) + count
+    return TermStats(num_docs, total_len / num_docs if num_docs else 0.0, df)
+
+
+def score(
+    con: duckdb.DuckDBPyConnection,
+    stats: TermStats,
+    tables: Dict[str, str] = BANK_FTS_TABLES,
+    limit: int = 10,
+    min_generation: Optional[int] = None,
+    max_generation: Optional[int] = None,
+    k: float = 1.2,
+    b: float = 0.75,
+) -> List[dict]:
+    """Top `limit` documents of one bank, scored with `stats`."""
+    if not stats.num_docs or not any(stats.df.values()):
+        return []
+    terms = list(stats.df)
+    rows = con.execute(
+        SCORE_SQL.format(dict=tables["dict"], terms=tables["terms"], docs=tables["docs"]),
+        {
+            "terms": terms,
+            "dfs": [stats.df[t] for t in terms],
+            "num_docs": stats.num_docs,
+            "avgdl": stats.avgdl,
+            "k": k,
+            "b": b,
+            "limit": limit,
+            "min_generation": -(2 ** 31) if min_generation is None else min_generation,
+            "max_generation": 2 ** 31 - 1 if max_generation is None else max_generation,
+        },
+    ).fetchall()
+    return [
+        {"id": id_, "filename": filename, "generation": gen, "era": era, "score": s}
+        for id_, filename, gen, era, s in rows
+    ]
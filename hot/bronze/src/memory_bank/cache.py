@@ -0,0 +1,142 @@
+"""
+Memory Bank Query Cache
+=======================
+
+Bounded LRU cache of normalized search query → ranked results, shared by
+the Commanders in one process.
+
+- Keys are normalized (lowercase, punctuation dropped, tokens de-duplicated
+  and sorted) since BM25 ignores term order, so near-identical HUNT queries
+  share an entry.
+- Entries expire after `ttl` seconds.
+- Every entry records the `version` of the data it was computed from, a
+  stamp of shared state the caller passes on lookup (federation.search uses
+  each bank's file stat or published snapshot). An entry whose version no
+  longer matches is stale, so an ingest or snapshot publish in another
+  process invalidates this process's entries too.
+- Entries also record the in-process generation: `bump_generation()`
+  (called by an in-process ingest) makes all older entries stale without
+  walking or clearing the cache. Stale entries are dropped lazily on their
+  next lookup.
+"""
+
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+
+_MISSING = object()
+
+
+def normalize_query(query: str) -> str:
+    """Canonical form of a bag-of-words query."""
+    return " ".join(sorted(set(TOKEN_PATTERN.findall(query.lower()))))
+
+
+class QueryCache:
+    """LRU + TTL cache invalidated by a data version and a generation counter."""
+
+    def __init__(self, max_entries: int = 512, ttl: float = 600.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries: "OrderedDict[Hashable, tuple]" = OrderedDict()  # key -> (generation, version, expires_at, value)
+        self._lock = threading.Lock()
+        self._generation = 0
+        self._metrics = {"hits": 0, "misses": 0, "stale": 0, "expired": 0, "evictions": 0}
+
+    @property
+    def generation(self) -> int:
+        return self._generation
+
+    def bump_generation(self) -> int:
+        """Invalidate everything cached so far (O(1))."""
+        with self._lock:
+            self._generation += 1
+            return self._generation
+
+    def get(self, key: Hashable, version: Hashable = None) -> Any:
+        """Cached value or `None` when missing, stale or expired."""
+        value = self._lookup(key, version)
+        return None if value is _MISSING else value
+
+    def _lookup(self, key: Hashable, version: Hashable) -> Any:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._metrics["misses"] += 1
+                return _MISSING
+            generation, entry_version, expires_at, value = entry
+            if generation != self._generation or entry_version != version:
+                del self._entries[key]
+                self._metrics["stale"] += 1
+                self._metrics["misses"] += 1
+                return _MISSING
+            if time.monotonic() >= expires_at:
+                del self._entries[key]
+                self._metrics["expired"] += 1
+                self._metrics["misses"] += 1
+                return _MISSING
+            self._entries.move_to_end(key)
+            self._metrics["hits"] += 1
+            return value
+
+    def put(
+        self,
+        key: Hashable,
+        value: Any,
+        generation: Optional[int] = None,
+        version: Hashable = None,
+    ) -> None:
+        """
+        Cache `value` computed from data at `version`. Pass the generation
+        and version read before computing it so a write that raced with the
+        computation leaves the entry stale.
+        """
+        with self._lock:
+            gen = self._generation if generation is None else generation
+            self._entries[key] = (gen, version, time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._metrics["evictions"] += 1
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any], version: Hashable = None) -> Any:
+        """Return the cached value for data at `version`, computing and caching it on a miss."""
+        generation = self._generation
+        value = self._lookup(key, version)
+        if value is not _MISSING:
+            return value
+        value = compute()
+        self.put(key, value, generation, version)
+        return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def metrics(self) -> Dict[str, Any]:
+        """Counters plus hit rate and current size."""
+        with self._lock:
+            lookups = self._metrics["hits"] + self._metrics["misses"]
+            return {
+                **self._metrics,
+                "entries": len(self._entries),
+                "generation": self._generation,
+                "hit_rate": self._metrics["hits"] / lookups if lookups else 0.0,
+            }
+
+
+_cache = QueryCache()
+
+
+def get_query_cache() -> QueryCache:
+    """Process-wide cache used by memory bank searches."""
+    return _cache
+
+
+def bump_generation() -> int:
+    """Signal that the memory bank changed in this process; cached searches become stale."""
+    return _cache.bump_generation()
@@ -0,0 +1,97 @@
+"""
+Memory Bank Connection
+======================
+
+Single place that knows where the HFO memory bank lives.
+
+Override the default bank with the HFO_MEMORY_DB environment variable.
+
+Agents never open the bank read-write. DuckDB allows one mode per database
+file per process and a read-write handle locks the file against every other
+process, so in-process code shares two connections:
+
+- shared_connection(): the bank, read-only (searches, highlights).
+- writes_connection(): this process's write store (memory_store, contracts),
+  read-write. Every process gets its own `<writes>.<pid>.duckdb` next to
+  WRITES_DB_PATH (the bank's `.writes.duckdb` unless HFO_MEMORY_WRITES says
+  otherwise), so agent processes never contend for one store's lock.
+  `python -m memory_bank.ingest` merges every store into the bank.
+
+Take a `.cursor()` per thread from either; never close them.
+"""
+
+import os
+import threading
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+
+import duckdb
+
+DEFAULT_DB_PATH = os.environ.get(
+    "HFO_MEMORY_DB",
+    "c:/Dev/active/portable_hfo_memory_pre_hfo_to_gen84_2025-12-27T21-46-52/hfo_memory.duckdb",
+)
+WRITES_DB_PATH = os.environ.get(
+    "HFO_MEMORY_WRITES",
+    str(Path(DEFAULT_DB_PATH).with_suffix(".writes.duckdb")),
+)
+
+_shared: Dict[str, Tuple[bool, duckdb.DuckDBPyConnection]] = {}
+_shared_lock = threading.Lock()
+
+
+def process_writes_path(base: Optional[Union[str, Path]] = None, pid: Optional[int] = None) -> Path:
+    """The write store of process `pid` (this one by default): `<base stem>.<pid><suffix>`."""
+    base = Path(base or WRITES_DB_PATH)
+    return base.with_name(f"{base.stem}.{pid or os.getpid()}{base.suffix}")
+
+
+def writes_stores(base: Optional[Union[str, Path]] = None) -> List[Path]:
+    """Every write store on disk for `base`, oldest first (`base` itself included if present)."""
+    base = Path(base or WRITES_DB_PATH)
+    stores = [
+        path for path in base.parent.glob(f"{base.stem}.*{base.suffix}")
+        if path.name[len(base.stem) + 1:-len(base.suffix) or None].isdigit()
+    ]
+    if base.exists():
+        stores.append(base)
+    return sorted(stores, key=lambda path: path.stat().st_mtime_ns)
+
+
+def connect(
+    db_path: Optional[Union[str, Path]] = None,
+    read_only: bool = True,
+) -> duckdb.DuckDBPyConnection:
+    """Open the memory bank with the FTS extension loaded."""
+    con = duckdb.connect(str(db_path or DEFAULT_DB_PATH), read_only=read_only)
+    con.execute("LOAD fts")
+    return con
+
+
+def _shared_connection(db_path: Union[str, Path], read_only: bool) -> duckdb.DuckDBPyConnection:
+    key = os.path.normcase(os.path.abspath(db_path))
+    with _shared_lock:
+        if key in _shared:
+            mode, con = _shared[key]
+            if mode != read_only:
+                raise ValueError(
+                    f"{db_path} is already open {'read-only' if mode else 'read-write'} in this process"
+                )
+            return con
+        if read_only:
+            con = connect(db_path, read_only=True)
+        else:
+            Path(db_path).parent.mkdir(parents=True, exist_ok=True)
+            con = duckdb.connect(str(db_path))
+        _shared[key] = (read_only, con)
+        return con
+
+
+def shared_connection(db_path: Optional[Union[str, Path]] = None) -> duckdb.DuckDBPyConnection:
+    """Process-wide read-only connection to a bank (the default bank by default)."""
+    return _shared_connection(db_path or DEFAULT_DB_PATH, read_only=True)
+
+
+def writes_connection(db_path: Optional[Union[str, Path]] = None) -> duckdb.DuckDBPyConnection:
+    """Process-wide read-write connection to a write store (this process's own by default)."""
+    return _shared_connection(db_path or process_writes_path(), read_only=False)
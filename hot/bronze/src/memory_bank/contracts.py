@@ -0,0 +1,249 @@
+"""
+Memory Bank Contract Registry
+=============================
+
+Content-addressed store for the Zod contracts Web Weaver defines and Kraken
+Keeper persists.
+
+- contract_blobs: one row per distinct normalized schema (sha256 key), so a
+  schema regenerated every cycle is stored once.
+- contract_versions: per-name version chain; re-persisting the latest
+  schema is a no-op instead of a new version.
+- structure_hash: name-agnostic, field-order-agnostic fingerprint, so
+  Interlock can find an equivalent contract under a different name and
+  reuse it instead of asking the LLM for a new one.
+
+Rows are written through the process-wide write-behind buffer into the
+write store, like store_to_memory, so persisting a contract is a dict
+update rather than a transaction. Reads merge the buffer's uncommitted rows
+with the store. This process holds the store read-write, so the version
+numbers it hands out cannot race with another writer.
+"""
+
+import difflib
+import hashlib
+import re
+import threading
+from typing import Dict, List, Optional, Tuple
+
+from .write_buffer import WriteBehindBuffer, get_write_buffer, now, register_table
+
+REGISTRY_DDL = [
+    """
+    CREATE TABLE IF NOT EXISTS contract_blobs (
+        hash           VARCHAR PRIMARY KEY,
+        structure_hash VARCHAR,
+        schema         VARCHAR,
+        created_at     TIMESTAMP
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS contract_versions (
+        name       VARCHAR,
+        version    INTEGER,
+        hash       VARCHAR,
+        created_at TIMESTAMP,
+        PRIMARY KEY (name, version)
+    )
+    """,
+    "CREATE INDEX IF NOT EXISTS contract_blobs_structure ON contract_blobs (structure_hash)",
+]
+
+register_table("contract_blobs", REGISTRY_DDL[:1] + REGISTRY_DDL[2:], "INSERT OR IGNORE")
+register_table("contract_versions", REGISTRY_DDL[1:2], "INSERT OR IGNORE")
+
+COMMENT_PATTERN = re.compile(r"//[^\n]*|/\*.*?\*/", re.DOTALL)
+PUNCT_SPACE_PATTERN = re.compile(r"\s*([{}()\[\]:,;=<>.|&?])\s*")
+TRAILING_COMMA_PATTERN = re.compile(r",([}\])])")
+EXPORT_NAME_PATTERN = re.compile(r"export (?:const|type|interface) (\w+?)(?:Schema)?\b")
+OBJECT_BODY_PATTERN = re.compile(r"z\.object\(\{")
+
+
+def normalize_schema(schema: str) -> str:
+    """Strip comments and insignificant whitespace/trailing commas."""
+    text = COMMENT_PATTERN.sub("", schema)
+    text = re.sub(r"\s+", " ", text).strip()
+    text = PUNCT_SPACE_PATTERN.sub(r"\1", text)
+    return TRAILING_COMMA_PATTERN.sub(r"\1", text)
+
+
+def _split_top_level(body: str) -> List[str]:
+    """Split on commas that are not nested inside brackets."""
+    parts, depth, start = [], 0, 0
+    for i, ch in enumerate(body):
+        if ch in "([{":
+            depth += 1
+        elif ch in ")]}":
+            depth -= 1
+        elif ch == "," and depth == 0:
+            parts.append(body[start:i])
+            start = i + 1
+    parts.append(body[start:])
+    return [p for p in parts if p]
+
+
+def _sort_object_fields(text: str) -> str:
+    """Sort the entries of every z.object({...}) so field order doesn't matter."""
+    out, pos = [], 0
+    for match in OBJECT_BODY_PATTERN.finditer(text):
+        if match.start() < pos:
+            continue
+        open_at = match.end() - 1
+        depth = 0
+        for close_at in range(open_at, len(text)):
+            if text[close_at] == "{":
+                depth += 1
+            elif text[close_at] == "}":
+                depth -= 1
+                if depth == 0:
+                    break
+        else:
+            break
+        body = _sort_object_fields(text[open_at + 1:close_at])
+        out.append(text[pos:open_at + 1])
+        out.append(",".join(sorted(_split_top_level(body))))
+        pos = close_at
+    out.append(text[pos:])
+    return "".join(out)
+
+
+def structure_of(schema: str) -> str:
+    """Name-agnostic, field-order-agnostic canonical form of a schema."""
+    text = normalize_schema(schema)
+    for name in set(EXPORT_NAME_PATTERN.findall(text)):
+        text = re.sub(rf"\b{re.escape(name)}(Schema)?\b", r"$\1", text)
+    return _sort_object_fields(text)
+
+
+def _sha256(text: str) -> str:
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class ContractRegistry:
+    """Versioned, content-addressed contract store behind a write-behind buffer."""
+
+    def __init__(self, buffer: WriteBehindBuffer):
+        self._buffer = buffer
+        self._lock = threading.Lock()
+
+    def _versions(self, name: str) -> Dict[int, Tuple[str, str]]:
+        """{version: (hash, created_at)} for `name`, buffered versions included."""
+        pending = {
+            row[1]: (row[2], row[3])
+            for row in self._buffer.pending_rows("contract_versions").values()
+            if row[0] == name
+        }
+        stored = self._buffer.query(
+            "SELECT version, hash, created_at FROM contract_versions WHERE name = ?", [name]
+        )
+        versions = {v: (h, str(ts)) for v, h, ts in stored}
+        versions.update(pending)
+        return versions
+
+    def _schema(self, digest: str) -> Optional[str]:
+        row = self._buffer.pending_rows("contract_blobs").get(digest)
+        if row is not None:
+            return row[2]
+        stored = self._buffer.query("SELECT schema FROM contract_blobs WHERE hash = ?", [digest])
+        return stored[0][0] if stored else None
+
+    def persist(self, name: str, schema: str) -> dict:
+        """
+        Record `schema` as the next version of `name`.
+
+        Returns the version entry plus `reused` (latest version already had
+        this content) and `structural_matches` (other contracts with the
+        same structure).
+        """
+        normalized = normalize_schema(schema)
+        digest = _sha256(normalized)
+        structure = _sha256(structure_of(schema))
+        with self._lock:
+            versions = self._versions(name)
+            latest = max(versions) if versions else None
+            reused = latest is not None and versions[latest][0] == digest
+            version = latest if reused else (latest + 1 if latest else 1)
+            if not reused:
+                ts = now()
+                self._buffer.put_row("contract_blobs", digest, (digest, structure, schema, ts))
+                self._buffer.put_row("contract_versions", f"{name}@{version}", (name, version, digest, ts))
+        return {
+            "name": name,
+            "version": version,
+            "hash": digest,
+            "reused": reused,
+            "structural_matches": [
+                m for m in self.find_by_structure(schema) if m["name"] != name
+            ],
+        }
+
+    def get(self, name: str, version: Optional[int] = None) -> Optional[dict]:
+        """Fetch a version of a contract (latest by default)."""
+        versions = self._versions(name)
+        if not versions:
+            return None
+        if version is None:
+            version = max(versions)
+        if version not in versions:
+            return None
+        digest, created_at = versions[version]
+        return {
+            "name": name,
+            "version": version,
+            "hash": digest,
+            "schema": self._schema(digest),
+            "created_at": created_at,
+        }
+
+    def history(self, name: str) -> List[dict]:
+        """The version chain for `name`, oldest first."""
+        return [
+            {"version": v, "hash": h, "created_at": ts}
+            for v, (h, ts) in sorted(self._versions(name).items())
+        ]
+
+    def diff(self, name: str, from_version: int, to_version: Optional[int] = None) -> str:
+        """Unified diff between two versions of a contract."""
+        old = self.get(name, from_version)
+        new = self.get(name, to_version)
+        if old is None or new is None:
+            raise KeyError(f"Unknown version of contract '{name}'")
+        return "".join(difflib.unified_diff(
+            old["schema"].splitlines(keepends=True),
+            new["schema"].splitlines(keepends=True),
+            fromfile=f"{name}@v{old['version']}",
+            tofile=f"{name}@v{new['version']}",
+        ))
+
+    def find_by_structure(self, schema: str) -> List[dict]:
+        """Contracts whose structure matches `schema`: the latest matching version per name."""
+        structure = _sha256(structure_of(schema))
+        hashes = {h for h, row in self._buffer.pending_rows("contract_blobs").items() if row[1] == structure}
+        pending = [row[:3] for row in self._buffer.pending_rows("contract_versions").values()]
+        stored = self._buffer.query(
+            """
+            SELECT v.name, v.version, v.hash
+            FROM contract_versions v JOIN contract_blobs b USING (hash)
+            WHERE b.structure_hash = ?
+            """,
+            [structure],
+        )
+        hashes.update(h for _, _, h in stored)
+        latest: Dict[str, Tuple[int, str]] = {}
+        for name, version, digest in stored + [r for r in pending if r[2] in hashes]:
+            if name not in latest or version > latest[name][0]:
+                latest[name] = (version, digest)
+        return [{"name": n, "version": v, "hash": h} for n, (v, h) in sorted(latest.items())]
+
+
+_registry: Optional[ContractRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_contract_registry() -> ContractRegistry:
+    """Process-wide registry on the shared write-behind buffer."""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = ContractRegistry(get_write_buffer())
+        return _registry
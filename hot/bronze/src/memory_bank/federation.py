@@ -0,0 +1,263 @@
+"""
+Memory Bank Federation
+======================
+
+Cross-bank recall over memory banks split by era and generation.
+
+Banks are listed in a JSON file named by HFO_MEMORY_BANKS:
+
+    {"banks": [
+        {"name": "pre_hfo_to_gen84", "path": "c:/Dev/active/.../hfo_memory.duckdb",
+         "min_generation": 0, "max_generation": 84},
+        {"name": "gen85_87", "path": "c:/Dev/active/hfo_snapshots", "kind": "snapshot"}
+    ]}
+
+`kind` is "duckdb" (default) or "snapshot" (a memory_bank.snapshot root; its
+generation range comes from the manifest). Without the variable the
+federation is just the default bank.
+
+Searches prune banks whose generation range cannot match, then query the
+rest in parallel (one DuckDB cursor per bank per thread; DuckDB releases the
+GIL while executing). DuckDB banks are read through the process-wide
+read-only connection (connection.shared_connection), so the federation
+never conflicts with other memory bank code in the process. Banks without
+FTS tables (e.g. a snapshot exported before its index existed) are left out
+of search() rather than failing it. BM25 runs in two phases so corpus
+statistics are summed across banks before scoring, which makes scores
+comparable and lets results merge into one global ranking.
+
+Cached search results are tied to each bank's version() (file stat, or the
+published snapshot), so an ingest or snapshot publish by another process
+invalidates them; a newly published snapshot is reopened on next use.
+"""
+
+import heapq
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, List, NamedTuple, Optional, Sequence
+
+import duckdb
+
+from . import bm25
+from .cache import get_query_cache, normalize_query
+from .connection import DEFAULT_DB_PATH, shared_connection
+from .snapshot import current_snapshot, open_snapshot
+
+BANKS_CONFIG = os.environ.get("HFO_MEMORY_BANKS")
+
+
+class BankSpec(NamedTuple):
+    """One memory bank and the generations it is known to hold."""
+    name: str
+    path: str
+    kind: str = "duckdb"
+    min_generation: Optional[int] = None
+    max_generation: Optional[int] = None
+
+    def overlaps(self, min_generation: Optional[int], max_generation: Optional[int]) -> bool:
+        """False only when the bank provably holds no generation in range."""
+        if min_generation is not None and self.max_generation is not None and self.max_generation < min_generation:
+            return False
+        if max_generation is not None and self.min_generation is not None and self.min_generation > max_generation:
+            return False
+        return True
+
+
+def _snapshot_range(root: str) -> tuple:
+    snapshot = current_snapshot(root)
+    if snapshot is None:
+        return None, None
+    manifest = json.loads((snapshot / "manifest.json").read_text(encoding="utf-8"))
+    gens = [p["generation"] for p in manifest["partitions"] if p["generation"] is not None]
+    return (min(gens), max(gens)) if gens else (None, None)
+
+
+def load_banks(config_path: Optional[str] = BANKS_CONFIG) -> List[BankSpec]:
+    """Read the bank list, filling snapshot generation ranges from manifests."""
+    if not config_path:
+        return [BankSpec("default", str(DEFAULT_DB_PATH))]
+    config = json.loads(Path(config_path).read_text(encoding="utf-8"))
+    banks = []
+    for entry in config["banks"]:
+        spec = BankSpec(**entry)
+        if spec.kind == "snapshot" and spec.min_generation is None and spec.max_generation is None:
+            lo, hi = _snapshot_range(spec.path)
+            spec = spec._replace(min_generation=lo, max_generation=hi)
+        banks.append(spec)
+    return banks
+
+
+class Federation:
+    """Parallel search across several memory banks."""
+
+    def __init__(self, banks: Optional[Sequence[BankSpec]] = None, max_workers: Optional[int] = None):
+        self.banks = list(banks if banks is not None else load_banks())
+        self._pool = ThreadPoolExecutor(max_workers=max_workers or max(1, len(self.banks)))
+        self._cons = {}  # snapshot bank name -> (snapshot dir, connection); DuckDB banks use the shared connection
+        self._searchable = {}
+        self._lock = threading.Lock()
+
+    def _cursor(self, bank: BankSpec) -> duckdb.DuckDBPyConnection:
+        if bank.kind != "snapshot":
+            return shared_connection(bank.path).cursor()
+        with self._lock:
+            current = current_snapshot(bank.path)
+            opened = self._cons.get(bank.name)
+            if opened is None or opened[0] != current:  # first use, or a newer snapshot was published
+                opened = (current, open_snapshot(current, snapshot_root=bank.path))
+                self._cons[bank.name] = opened
+                self._searchable.pop(bank.name, None)
+            return opened[1].cursor()
+
+    def version(self, bank: BankSpec) -> tuple:
+        """Stamp of a bank's on-disk state; changes when any process writes or publishes it."""
+        if bank.kind == "snapshot":
+            return (bank.name, str(current_snapshot(bank.path)))
+        stamp = [bank.name]
+        for path in (bank.path, f"{bank.path}.wal"):
+            try:
+                st = os.stat(path)
+                stamp.append((st.st_size, st.st_mtime_ns))
+            except FileNotFoundError:
+                stamp.append(None)
+        return tuple(stamp)
+
+    def _tables(self, bank: BankSpec) -> dict:
+        return bm25.SNAPSHOT_FTS_TABLES if bank.kind == "snapshot" else bm25.BANK_FTS_TABLES
+
+    def _has_fts(self, bank: BankSpec, cur: duckdb.DuckDBPyConnection) -> bool:
+        if bank.name not in self._searchable:
+            schema, _, table = self._tables(bank)["stats"].rpartition(".")
+            self._searchable[bank.name] = cur.execute(
+                "SELECT count(*) FROM information_schema.tables WHERE table_schema = ? AND table_name = ?",
+                [schema or "main", table],
+            ).fetchone()[0] > 0
+        return self._searchable[bank.name]
+
+    def select(self, min_generation: Optional[int] = None, max_generation: Optional[int] = None) -> List[BankSpec]:
+        """Banks that may hold generations in the range."""
+        return [b for b in self.banks if b.overlaps(min_generation, max_generation)]
+
+    def map(
+        self,
+        fn: Callable[[BankSpec, duckdb.DuckDBPyConnection], Any],
+        min_generation: Optional[int] = None,
+        max_generation: Optional[int] = None,
+    ) -> List[tuple]:
+        """Run `fn(bank, cursor)` on every selected bank in parallel."""
+        banks = self.select(min_generation, max_generation)
+
+        def run(bank: BankSpec):
+            cursor = self._cursor(bank)
+            try:
+                return bank, fn(bank, cursor)
+            finally:
+                cursor.close()
+
+        return list(self._pool.map(run, banks))
+
+    def query(
+        self,
+        sql: str,
+        params: Optional[Any] = None,
+        min_generation: Optional[int] = None,
+        max_generation: Optional[int] = None,
+    ) -> List[tuple]:
+        """Run the same SQL on every selected bank; rows are prefixed with the bank name."""
+        results = self.map(
+            lambda bank, cur: cur.execute(sql, params).fetchall(),
+            min_generation, max_generation,
+        )
+        return [(bank.name, *row) for bank, rows in results for row in rows]
+
+    def search(
+        self,
+        query: str,
+        limit: int = 10,
+        min_generation: Optional[int] = None,
+        max_generation: Optional[int] = None,
+    ) -> List[dict]:
+        """Globally ranked BM25 search across the selected banks (cached until a bank changes on disk)."""
+        banks = self.select(min_generation, max_generation)
+        key = (
+            "search",
+            normalize_query(query),
+            limit,
+            min_generation,
+            max_generation,
+            tuple(b.name for b in banks),
+        )
+        return get_query_cache().get_or_compute(
+            key,
+            lambda: self._search(query, limit, min_generation, max_generation),
+            version=tuple(self.version(b) for b in banks),
+        )
+
+    def _search(
+        self,
+        query: str,
+        limit: int,
+        min_generation: Optional[int],
+        max_generation: Optional[int],
+    ) -> List[dict]:
+        per_bank = self.map(
+            lambda bank, cur: bm25.term_stats(cur, query, self._tables(bank)) if self._has_fts(bank, cur) else None,
+            min_generation, max_generation,
+        )
+        per_bank = [(bank, s) for bank, s in per_bank if s is not None]
+        if not per_bank:
+            return []
+        stats = bm25.merge_term_stats([s for _, s in per_bank])
+
+        def score(bank: BankSpec, cur: duckdb.DuckDBPyConnection) -> List[dict]:
+            if not self._has_fts(bank, cur):
+                return []
+            return bm25.score(
+                cur, stats, self._tables(bank), limit,
+                min_generation=min_generation, max_generation=max_generation,
+            )
+
+        hits = []
+        for bank, rows in self.map(score, min_generation, max_generation):
+            for row in rows:
+                row["bank"] = bank.name
+                hits.append(row)
+
+        best = {}
+        for hit in hits:  # ids are only unique within a bank
+            key = (hit["bank"], hit["id"])
+            if key not in best or hit["score"] > best[key]["score"]:
+                best[key] = hit
+        return heapq.nlargest(limit, best.values(), key=lambda h: h["score"])
+
+    def close(self) -> None:
+        self._pool.shutdown()
+        with self._lock:
+            for _, con in self._cons.values():
+                con.close()
+            self._cons.clear()
+
+
+_federation: Optional[Federation] = None
+_federation_lock = threading.Lock()
+
+
+def get_federation() -> Federation:
+    """Process-wide federation over the configured banks."""
+    global _federation
+    with _federation_lock:
+        if _federation is None:
+            _federation = Federation()
+        return _federation
+
+
+def format_hits(hits: List[dict]) -> str:
+    """Render search hits as compact text for agent tool output."""
+    if not hits:
+        return "No matching artifacts."
+    return "\n".join(
+        f"{h['score']:.3f}  Gen {h['generation']} [{h['bank']}] {h['filename']}" for h in hits
+    )
@@ -0,0 +1,158 @@
+"""
+Memory Bank Highlight Engine
+============================
+
+Extracts relevant sections from artifacts without pulling whole documents
+into Python. Documents are split into lines inside DuckDB, matching lines
+become hits, nearby hits are merged into sections (gaps-and-islands), and
+only the ranked, deduplicated excerpts cross the wire.
+
+Each excerpt carries its 1-based line range so callers can cite it.
+"""
+
+import re
+from typing import Iterable, List, Optional, Sequence
+
+import duckdb
+
+HIGHLIGHT_SQL = """
+WITH docs AS (
+    SELECT id, filename, generation, content
+    FROM artifacts
+    WHERE {doc_filter}
+    ORDER BY generation DESC
+    LIMIT $max_docs
+),
+lines AS (
+    SELECT id, filename, generation,
+           unnest(string_split(content, chr(10))) AS line,
+           generate_subscripts(string_split(content, chr(10)), 1) AS lineno
+    FROM docs
+),
+hits AS (
+    SELECT id, lineno,
+           len(regexp_extract_all(line, $pattern, 0)) AS score
+    FROM lines
+    WHERE regexp_matches(line, $pattern)
+),
+islands AS (
+    SELECT id, lineno, score,
+           sum(CASE WHEN lineno - prev_lineno <= $gap THEN 0 ELSE 1 END)
+               OVER (PARTITION BY id ORDER BY lineno) AS section
+    FROM (
+        SELECT *, lag(lineno) OVER (PARTITION BY id ORDER BY lineno) AS prev_lineno
+        FROM hits
+    )
+),
+sections AS (
+    SELECT id, section,
+           greatest(min(lineno) - $before, 1) AS start_line,
+           least(max(lineno) + $after, greatest(min(lineno) - $before, 1) + $max_lines - 1) AS end_line,
+           sum(score) AS score,
+           count(*) AS hit_count
+    FROM islands
+    GROUP BY id, section
+),
+excerpts AS (
+    SELECT l.id, l.filename, l.generation, s.start_line, s.end_line, s.score, s.hit_count,
+           string_agg(l.line, chr(10) ORDER BY l.lineno) AS text
+    FROM sections s
+    JOIN lines l ON l.id = s.id AND l.lineno BETWEEN s.start_line AND s.end_line
+    GROUP BY ALL
+)
+SELECT id, filename, generation, start_line, end_line, score, hit_count, text
+FROM excerpts
+QUALIFY row_number() OVER (PARTITION BY md5(trim(text)) ORDER BY score DESC, generation DESC) = 1
+ORDER BY score DESC, generation DESC, filename, start_line
+LIMIT $max_excerpts
+"""
+
+
+def build_pattern(terms: Iterable[str]) -> str:
+    """Build a single RE2 alternation that matches any literal term."""
+    escaped = [re.escape(t) for t in terms if t]
+    if not escaped:
+        raise ValueError("At least one non-empty highlight term is required")
+    return "|".join(escaped)
+
+
+def highlight(
+    con: duckdb.DuckDBPyConnection,
+    terms: Iterable[str],
+    *,
+    pattern: Optional[str] = None,
+    doc_pattern: Optional[str] = None,
+    ids: Optional[Sequence[str]] = None,
+    case_sensitive: bool = True,
+    before: int = 0,
+    after: int = 3,
+    max_lines: int = 50,
+    max_docs: int = 20,
+    max_excerpts: int = 50,
+) -> List[dict]:
+    """
+    Return ranked, deduplicated excerpts around lines matching any term.
+
+    `pattern` overrides `terms` with a raw RE2 regex; `doc_pattern` narrows
+    the candidate artifacts (defaults to the line pattern); `ids` instead
+    fixes them to exactly those artifacts, e.g. the rows a search already
+    listed, so every listed document gets its excerpts. Hits closer than
+    `before + after` lines are merged into one section; sections are capped
+    at `max_lines`. Identical excerpts from different artifacts collapse to
+    the highest-scoring (then newest generation) copy.
+    """
+    regex = pattern or build_pattern(terms)
+    doc_regex = doc_pattern or regex
+    prefix = "" if case_sensitive else "(?i)"
+    params = {
+        "pattern": prefix + regex,
+        "doc_pattern": prefix + doc_regex,
+        "gap": before + after + 1,
+        "before": before,
+        "after": after,
+        "max_lines": max_lines,
+        "max_docs": max_docs,
+        "max_excerpts": max_excerpts,
+    }
+    if ids is not None:
+        params["ids"] = list(ids)
+        if not params["ids"]:
+            return []
+        params["max_docs"] = len(params["ids"])
+        del params["doc_pattern"]
+        doc_filter = "list_contains($ids, id)"
+    else:
+        doc_filter = "regexp_matches(content, $doc_pattern)"
+    rows = con.execute(HIGHLIGHT_SQL.format(doc_filter=doc_filter), params).fetchall()
+    return [
+        {
+            "id": id_,
+            "filename": filename,
+            "generation": generation,
+            "start_line": start_line,
+            "end_line": end_line,
+            "score": score,
+            "hit_count": hit_count,
+            "text": text,
+        }
+        for id_, filename, generation, start_line, end_line, score, hit_count, text in rows
+    ]
+
+
+def format_excerpts(excerpts: List[dict], max_chars: int = 4000) -> str:
+    """Render excerpts as compact text for agent tool output."""
+    if not excerpts:
+        return "No matching sections."
+    out = []
+    used = 0
+    for ex in excerpts:
+        block = (
+            f"## {ex['filename']} (Gen {ex['generation']}) "
+            f"L{ex['start_line']}-{ex['end_line']} score={ex['score']}\n{ex['text']}"
+        )
+        if used + len(block) > max_chars:
+            out.append(f"... [{len(excerpts) - len(out)} more excerpts]")
+            break
+        out.append(block)
+        used += len(block)
+    return "\n\n".join(out)
@@ -0,0 +1,294 @@
+"""
+Memory Bank Workspace Ingestion
+===============================
+
+Incrementally mirrors workspace files (notes, cold/bronze specs and handoffs)
+into the `artifacts` table.
+
+Change detection is two-level:
+1. (size, mtime_ns) from the `ingest_manifest` table - unchanged files are skipped
+   without being read.
+2. sha256 of the content - touched-but-identical files only refresh the manifest.
+
+Files that disappeared from a root (or now match its `exclude` patterns)
+are deleted from `artifacts`. The FTS index is rebuilt once per run, and
+only when something actually changed. DuckDB rebuilds it over the whole
+bank, so the default roots leave out the hot blackboard: it changes on
+almost every run and has its own indexes (blackboard.index,
+blackboard.columnar). Add it explicitly with --root when it is wanted in
+the bank, ideally together with --no-fts on frequent runs. For the same
+reason the cold/bronze root excludes COLD_BRONZE_EXCLUDES: dashboard
+outputs, caches and state files rewritten on every refresh.
+
+Each run also merges the agents' write stores (memory_store and the contract
+registry, see memory_bank.write_buffer) into the bank, except those an agent
+process still holds open.
+
+Usage:
+    python -m memory_bank.ingest --workspace c:/Dev/active/hfo_gen87_x3
+    python -m memory_bank.ingest --workspace c:/Dev/active/hfo_gen87_x3 --writes ''   # skip the write-store merge
+    python -m memory_bank.ingest --root hot=c:/Dev/active/hfo_gen87_x3/hot:blackboard.jsonl --no-fts
+"""
+
+import argparse
+import fnmatch
+import hashlib
+import os
+import re
+import sys
+import time
+from pathlib import Path
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple, Union
+
+import duckdb
+
+from .cache import bump_generation
+from .connection import DEFAULT_DB_PATH, WRITES_DB_PATH, connect, writes_stores
+from .write_buffer import fold_store
+
+CURRENT_GENERATION = 87
+GEN85_DOCS = Path("c:/Dev/active/hfo_kiro_gen85/_archived_gen85_docs")
+GEN_PATTERN = re.compile(r"gen[_-]?(\d{2,3})", re.IGNORECASE)
+# Generated files under cold/bronze (relative fnmatch patterns; `*` spans directories).
+COLD_BRONZE_EXCLUDES = (
+    "dashboard/snapshot.json",
+    "dashboard/DASHBOARD.md",
+    "dashboard/history/*",
+    ".cache/*",
+    "*/.cache/*",
+    "*.cache.json",
+    "*/node_modules/*",
+)
+
+MANIFEST_DDL = """
+CREATE TABLE IF NOT EXISTS ingest_manifest (
+    path        VARCHAR PRIMARY KEY,
+    root        VARCHAR,
+    artifact_id VARCHAR,
+    size        BIGINT,
+    mtime_ns    BIGINT,
+    sha256      VARCHAR,
+    ingested_at TIMESTAMP
+)
+"""
+
+ARTIFACTS_DDL = """
+CREATE TABLE IF NOT EXISTS artifacts (
+    id         VARCHAR,
+    filename   VARCHAR,
+    generation INTEGER,
+    era        VARCHAR,
+    content    VARCHAR
+)
+"""
+
+
+class IngestRoot(NamedTuple):
+    """A directory to mirror, the globs to pick up, and default lineage metadata."""
+    name: str
+    path: Path
+    patterns: Tuple[str, ...]
+    era: str = "hfo"
+    generation: int = CURRENT_GENERATION
+    exclude: Tuple[str, ...] = ()
+
+
+def default_roots(workspace: Path) -> List[IngestRoot]:
+    """Workspace locations that never reached the memory bank before Gen87."""
+    return [
+        IngestRoot("notes", workspace, ("ttao-notes-*.md",)),
+        IngestRoot("gen85-notes", GEN85_DOCS, ("ttao-notes-*.md",), generation=85),
+        IngestRoot(
+            "cold-bronze", workspace / "cold" / "bronze", ("**/*.md", "**/*.json"),
+            exclude=COLD_BRONZE_EXCLUDES,
+        ),
+    ]
+
+
+def infer_generation(path: Path, default: int) -> int:
+    """Take the last genNN marker in the path, else the root's default."""
+    matches = GEN_PATTERN.findall(path.as_posix())
+    return int(matches[-1]) if matches else default
+
+
+def artifact_id(root: IngestRoot, rel_path: str) -> str:
+    """Stable artifact id for a workspace file."""
+    return f"ws:{root.name}:{rel_path}"
+
+
+def iter_files(root: IngestRoot) -> Iterator[Tuple[str, Path, os.stat_result]]:
+    """Yield (relative posix path, absolute path, stat) for every matching file."""
+    if not root.path.exists():
+        return
+    seen = set()
+    for pattern in root.patterns:
+        for f in root.path.glob(pattern):
+            if f in seen or not f.is_file():
+                continue
+            seen.add(f)
+            rel = f.relative_to(root.path).as_posix()
+            if any(fnmatch.fnmatchcase(rel, pattern) for pattern in root.exclude):
+                continue
+            yield rel, f, f.stat()
+
+
+def sha256_file(path: Path) -> Tuple[str, bytes]:
+    """Hash a file and return its bytes (read once, used for both)."""
+    data = path.read_bytes()
+    return hashlib.sha256(data).hexdigest(), data
+
+
+def ingest(
+    con: duckdb.DuckDBPyConnection,
+    roots: List[IngestRoot],
+    rebuild_fts: bool = True,
+) -> Dict[str, int]:
+    """
+    Mirror `roots` into `artifacts`; returns counts of what changed.
+
+    Only roots passed in are reconciled - deletions never touch artifacts
+    that came from other roots or from the original bank import.
+    """
+    con.execute(ARTIFACTS_DDL)
+    con.execute(MANIFEST_DDL)
+
+    stats = {"scanned": 0, "unchanged": 0, "touched": 0, "upserted": 0, "deleted": 0}
+    upserts: List[Tuple[str, str, int, str, str]] = []
+    manifest_rows: List[Tuple[str, str, str, int, int, str]] = []
+    removed_ids: List[str] = []
+    removed_paths: List[str] = []
+
+    for root in roots:
+        known = {
+            path: (size, mtime_ns, digest)
+            for path, size, mtime_ns, digest in con.execute(
+                "SELECT path, size, mtime_ns, sha256 FROM ingest_manifest WHERE root = ?",
+                [root.name],
+            ).fetchall()
+        }
+        present = set()
+        for rel, abs_path, st in iter_files(root):
+            stats["scanned"] += 1
+            key = f"{root.name}:{rel}"
+            present.add(key)
+            prev = known.get(key)
+            if prev and prev[0] == st.st_size and prev[1] == st.st_mtime_ns:
+                stats["unchanged"] += 1
+                continue
+            digest, data = sha256_file(abs_path)
+            aid = artifact_id(root, rel)
+            manifest_rows.append((key, root.name, aid, st.st_size, st.st_mtime_ns, digest))
+            if prev and prev[2] == digest:
+                stats["touched"] += 1
+                continue
+            upserts.append((
+                aid,
+                abs_path.name,
+                infer_generation(abs_path, root.generation),
+                root.era,
+                data.decode("utf-8", errors="replace"),
+            ))
+        for key in known.keys() - present:
+            removed_paths.append(key)
+            removed_ids.append(f"ws:{key}")
+
+    con.execute("BEGIN TRANSACTION")
+    try:
+        if upserts or removed_ids:
+            con.execute("CREATE OR REPLACE TEMP TABLE _stale_ids (id VARCHAR)")
+            con.executemany(
+                "INSERT INTO _stale_ids VALUES (?)",
+                [(row[0],) for row in upserts] + [(i,) for i in removed_ids],
+            )
+            con.execute("DELETE FROM artifacts WHERE id IN (SELECT id FROM _stale_ids)")
+        if upserts:
+            con.executemany(
+                "INSERT INTO artifacts (id, filename, generation, era, content) VALUES (?, ?, ?, ?, ?)",
+                upserts,
+            )
+        if removed_paths:
+            con.executemany("DELETE FROM ingest_manifest WHERE path = ?", [(p,) for p in removed_paths])
+        if manifest_rows:
+            con.executemany(
+                "INSERT OR REPLACE INTO ingest_manifest VALUES (?, ?, ?, ?, ?, ?, now())",
+                manifest_rows,
+            )
+        con.execute("COMMIT")
+    except Exception:
+        con.execute("ROLLBACK")
+        raise
+
+    stats["upserted"] = len(upserts)
+    stats["deleted"] = len(removed_ids)
+
+    if upserts or removed_ids:
+        if rebuild_fts:
+            # DuckDB FTS has no incremental update; rebuild once per batch, never per file.
+            con.execute("PRAGMA create_fts_index('artifacts', 'id', 'content', overwrite=1)")
+        bump_generation()
+
+    return stats
+
+
+def merge_writes(con: duckdb.DuckDBPyConnection, writes_path: Union[str, Path] = WRITES_DB_PATH) -> Dict[str, int]:
+    """
+    Copy every agent write store under `writes_path` into the bank; returns rows merged per table.
+
+    Stores are merged oldest first, so later writes win. A store whose agent
+    process still holds it open cannot be attached and is left for the next run.
+    """
+    merged: Dict[str, int] = {}
+    for store in writes_stores(writes_path):
+        try:
+            copied = fold_store(con, store)
+        except (duckdb.IOException, duckdb.BinderException):  # locked by its agent / open in this process
+            print(f"Write store {store.name} not merged (in use by an agent process)", file=sys.stderr)
+            continue
+        for table, rows in copied.items():
+            merged[table] = merged.get(table, 0) + rows
+    return merged
+
+
+def parse_root(spec: str) -> IngestRoot:
+    """Parse NAME=PATH:GLOB[,GLOB...] (the last ':' separates the globs)."""
+    name, _, rest = spec.partition("=")
+    path, _, globs = rest.rpartition(":")
+    if not name or not path or not globs:
+        raise argparse.ArgumentTypeError(f"Expected NAME=PATH:GLOB[,GLOB], got {spec!r}")
+    return IngestRoot(name, Path(path), tuple(globs.split(",")))
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Incrementally ingest workspace files into the memory bank")
+    parser.add_argument("--db", default=DEFAULT_DB_PATH, help="Memory bank DuckDB file")
+    parser.add_argument("--workspace", default=os.environ.get("WORKSPACE_ROOT", "."), help="Workspace root for the default roots")
+    parser.add_argument("--root", action="append", type=parse_root, default=[], help="Extra root NAME=PATH:GLOB[,GLOB]")
+    parser.add_argument("--no-defaults", action="store_true", help="Only ingest --root entries")
+    parser.add_argument("--no-fts", action="store_true", help="Skip the FTS rebuild")
+    parser.add_argument("--writes", default=WRITES_DB_PATH, help="Agents' write store to merge ('' to skip)")
+    args = parser.parse_args(argv)
+
+    roots = [] if args.no_defaults else default_roots(Path(args.workspace))
+    roots += args.root
+
+    start = time.perf_counter()
+    con = connect(args.db, read_only=False)
+    try:
+        stats = ingest(con, roots, rebuild_fts=not args.no_fts)
+        merged = merge_writes(con, args.writes) if args.writes else {}
+    finally:
+        con.close()
+    elapsed = time.perf_counter() - start
+
+    print(
+        f"Ingested {stats['scanned']} files in {elapsed:.2f}s: "
+        f"{stats['upserted']} upserted, {stats['deleted']} deleted, "
+        f"{stats['unchanged']} unchanged, {stats['touched']} touched"
+    )
+    if merged:
+        print("Merged write store: " + ", ".join(f"{table} {rows} rows" for table, rows in merged.items()))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,206 @@
+"""
+Memory Bank Parquet Snapshots
+=============================
+
+Exports the `artifacts` table and its derived indexes (FTS tables, ingest
+manifest) to Parquet so any number of reader processes can query the bank
+without holding the DuckDB file lock.
+
+Layout:
+    <snapshot_root>/
+        CURRENT                      # name of the live snapshot (swapped atomically)
+        20260101T120000Z/
+            manifest.json
+            artifacts/era=hfo/generation=87/*.parquet
+            fts/{docs,terms,dict,stats}.parquet
+            ingest_manifest.parquet
+
+A snapshot directory is fully written under a temporary name, renamed into
+place, and only then published through CURRENT (os.replace). Readers resolve
+CURRENT once when they open, so a reader never sees a half-written snapshot.
+
+Usage:
+    python -m memory_bank.snapshot --out c:/Dev/active/hfo_snapshots --keep 3
+"""
+
+import argparse
+import json
+import os
+import shutil
+import sys
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Union
+
+import duckdb
+
+from . import bm25
+from .bm25 import SNAPSHOT_FTS_TABLES
+from .connection import DEFAULT_DB_PATH, connect
+
+DEFAULT_SNAPSHOT_ROOT = os.environ.get(
+    "HFO_MEMORY_SNAPSHOTS",
+    str(Path(DEFAULT_DB_PATH).parent / "snapshots"),
+)
+CURRENT_POINTER = "CURRENT"
+FTS_SCHEMA = "fts_main_artifacts"
+FTS_TABLES = ("docs", "terms", "dict", "stats")
+
+
+def _has_table(con: duckdb.DuckDBPyConnection, schema: str, table: str) -> bool:
+    return con.execute(
+        "SELECT count(*) FROM information_schema.tables WHERE table_schema = ? AND table_name = ?",
+        [schema, table],
+    ).fetchone()[0] > 0
+
+
+def _copy(con: duckdb.DuckDBPyConnection, relation: str, target: Path, options: str = "") -> int:
+    count = con.execute(f"SELECT count(*) FROM {relation}").fetchone()[0]
+    con.execute(f"COPY (SELECT * FROM {relation}) TO '{target.as_posix()}' (FORMAT PARQUET{options})")
+    return count
+
+
+def export_snapshot(
+    con: duckdb.DuckDBPyConnection,
+    snapshot_root: Union[str, Path] = DEFAULT_SNAPSHOT_ROOT,
+    keep: int = 3,
+) -> Path:
+    """Write a new snapshot, publish it as CURRENT and prune old ones."""
+    root = Path(snapshot_root)
+    root.mkdir(parents=True, exist_ok=True)
+    name = datetime.utcnow().strftime("%Y%m%dT%H%M%S%fZ")
+    staging = root / f".{name}.tmp"
+    final = root / name
+
+    staging.mkdir()
+    try:
+        tables: Dict[str, int] = {}
+        tables["artifacts"] = _copy(
+            con, "artifacts", staging / "artifacts",
+            ", PARTITION_BY (era, generation), COMPRESSION ZSTD",
+        )
+        if _has_table(con, FTS_SCHEMA, "docs"):
+            (staging / "fts").mkdir()
+            for table in FTS_TABLES:
+                tables[f"fts/{table}"] = _copy(
+                    con, f"{FTS_SCHEMA}.{table}", staging / "fts" / f"{table}.parquet"
+                )
+        if _has_table(con, "main", "ingest_manifest"):
+            tables["ingest_manifest"] = _copy(con, "ingest_manifest", staging / "ingest_manifest.parquet")
+
+        partitions = con.execute(
+            "SELECT era, generation, count(*) FROM artifacts GROUP BY ALL ORDER BY ALL"
+        ).fetchall()
+        manifest = {
+            "snapshot": name,
+            "created_at": datetime.utcnow().isoformat() + "Z",
+            "tables": tables,
+            "partitions": [
+                {"era": era, "generation": gen, "artifacts": n} for era, gen, n in partitions
+            ],
+        }
+        (staging / "manifest.json").write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+        os.rename(staging, final)
+    except Exception:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+
+    pointer_tmp = root / f".{CURRENT_POINTER}.tmp"
+    pointer_tmp.write_text(name, encoding="utf-8")
+    os.replace(pointer_tmp, root / CURRENT_POINTER)
+
+    prune_snapshots(root, keep)
+    return final
+
+
+def list_snapshots(snapshot_root: Union[str, Path] = DEFAULT_SNAPSHOT_ROOT) -> List[Path]:
+    """Published snapshots, oldest first."""
+    root = Path(snapshot_root)
+    if not root.exists():
+        return []
+    return sorted(p for p in root.iterdir() if p.is_dir() and (p / "manifest.json").exists())
+
+
+def prune_snapshots(snapshot_root: Union[str, Path], keep: int) -> None:
+    """Delete all but the newest `keep` snapshots (CURRENT is always kept)."""
+    root = Path(snapshot_root)
+    current = current_snapshot(root)
+    for old in list_snapshots(root)[:-keep] if keep > 0 else []:
+        if old != current:
+            shutil.rmtree(old, ignore_errors=True)
+
+
+def current_snapshot(snapshot_root: Union[str, Path] = DEFAULT_SNAPSHOT_ROOT) -> Optional[Path]:
+    """Resolve the CURRENT pointer to a snapshot directory."""
+    pointer = Path(snapshot_root) / CURRENT_POINTER
+    if not pointer.exists():
+        return None
+    return Path(snapshot_root) / pointer.read_text(encoding="utf-8").strip()
+
+
+def open_snapshot(
+    snapshot: Optional[Union[str, Path]] = None,
+    snapshot_root: Union[str, Path] = DEFAULT_SNAPSHOT_ROOT,
+) -> duckdb.DuckDBPyConnection:
+    """
+    Open an in-memory connection whose views scan a snapshot's Parquet files.
+
+    No file lock is taken, so any number of worker processes can open the
+    same snapshot; the OS page cache is shared between them.
+    """
+    path = Path(snapshot) if snapshot else current_snapshot(snapshot_root)
+    if path is None:
+        raise FileNotFoundError(f"No published snapshot under {snapshot_root}")
+
+    con = duckdb.connect(":memory:")
+    base = path.as_posix()
+    con.execute(
+        f"CREATE VIEW artifacts AS SELECT * FROM "
+        f"read_parquet('{base}/artifacts/**/*.parquet', hive_partitioning = true, hive_types_autocast = true)"
+    )
+    if (path / "fts").exists():
+        con.execute("LOAD fts")
+        for table in FTS_TABLES:
+            con.execute(
+                f"CREATE VIEW {SNAPSHOT_FTS_TABLES[table]} AS "
+                f"SELECT * FROM read_parquet('{base}/fts/{table}.parquet')"
+            )
+    if (path / "ingest_manifest.parquet").exists():
+        con.execute(f"CREATE VIEW ingest_manifest AS SELECT * FROM read_parquet('{base}/ingest_manifest.parquet')")
+    return con
+
+
+def search_snapshot(
+    con: duckdb.DuckDBPyConnection,
+    query: str,
+    limit: int = 10,
+    min_generation: Optional[int] = None,
+    max_generation: Optional[int] = None,
+) -> List[dict]:
+    """BM25 search against a connection from `open_snapshot`."""
+    stats = bm25.term_stats(con, query, SNAPSHOT_FTS_TABLES)
+    return bm25.score(
+        con, stats, SNAPSHOT_FTS_TABLES, limit,
+        min_generation=min_generation, max_generation=max_generation,
+    )
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Snapshot the memory bank to partitioned Parquet")
+    parser.add_argument("--db", default=DEFAULT_DB_PATH, help="Memory bank DuckDB file")
+    parser.add_argument("--out", default=DEFAULT_SNAPSHOT_ROOT, help="Snapshot root directory")
+    parser.add_argument("--keep", type=int, default=3, help="Snapshots to retain")
+    args = parser.parse_args(argv)
+
+    con = connect(args.db, read_only=True)
+    try:
+        path = export_snapshot(con, args.out, keep=args.keep)
+    finally:
+        con.close()
+    manifest = json.loads((path / "manifest.json").read_text(encoding="utf-8"))
+    print(f"Snapshot {manifest['snapshot']} published: {manifest['tables']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
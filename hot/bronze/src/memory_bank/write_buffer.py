@@ -0,0 +1,366 @@
+"""
+Memory Bank Write-Behind Buffer
+===============================
+
+Coalesces Commander writes (store_to_memory, persist_contract) into group
+commits instead of one DuckDB transaction per tool call.
+
+- Writes land in an in-memory dict keyed by (table, key) (last write wins),
+  so repeated stores of the same key cost one row per flush. Tables other
+  than memory_store are added with register_table() (see contracts.py).
+- A background thread commits when `max_batch` keys are pending or
+  `max_delay` seconds have passed since the oldest pending write.
+- `get()` reads pending and in-flight writes before DuckDB (read-your-writes);
+  `pending_rows()` + `query()` do the same for other tables.
+- `flush()` blocks until everything written before it is committed;
+  `close()` (also registered with atexit) flushes and stops the thread.
+- Rows go to this process's write store (connection.writes_connection),
+  not the bank, so buffering never conflicts with the bank's read-only
+  connection or locks the bank or another agent's store.
+- On open the buffer folds in the stores of processes that have exited
+  (a store nobody holds can be attached), so keys stored by earlier runs
+  stay readable. Writes of agents still running are not visible until
+  they exit or `python -m memory_bank.ingest` merges them into the bank.
+- Rows still pending when `close()` cannot commit them are saved to
+  `<write store>.unflushed.jsonl` and re-queued by the buffer that folds
+  that store in, instead of being lost.
+"""
+
+import atexit
+import json
+import os
+import sys
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+
+import duckdb
+
+from .connection import WRITES_DB_PATH, process_writes_path, writes_connection, writes_stores
+
+MEMORY_STORE_DDL = """
+CREATE TABLE IF NOT EXISTS memory_store (
+    key        VARCHAR PRIMARY KEY,
+    kind       VARCHAR,
+    value      VARCHAR,
+    updated_at TIMESTAMP
+)
+"""
+
+# Write-store tables: name -> (DDL statements, insert verb for a committed row).
+WRITE_TABLES: Dict[str, Tuple[List[str], str]] = {
+    "memory_store": ([MEMORY_STORE_DDL], "INSERT OR REPLACE"),
+}
+
+# Rows per INSERT statement; keeps statements well under parser limits.
+ROWS_PER_STATEMENT = 500
+
+RowKey = Tuple[str, str]  # (table, key)
+
+
+def register_table(name: str, ddl: List[str], insert: str = "INSERT OR REPLACE") -> None:
+    """Let the buffer commit rows to another write-store table."""
+    WRITE_TABLES[name] = (list(ddl), insert)
+
+
+def spill_path(store: Union[str, Path]) -> Path:
+    """Where rows a store's buffer could not commit are saved."""
+    return Path(f"{store}.unflushed.jsonl")
+
+
+def fold_store(con: duckdb.DuckDBPyConnection, store: Union[str, Path]) -> Dict[str, int]:
+    """
+    Copy the write-store tables of `store` into `con`'s database; returns rows per table.
+
+    The store is attached read-only, so this raises duckdb.IOException while
+    its owner process still holds it open.
+    """
+    con.execute(f"ATTACH '{Path(store).as_posix()}' AS folded (READ_ONLY)")
+    try:
+        present = {
+            name for (name,) in con.execute(
+                "SELECT table_name FROM duckdb_tables() WHERE database_name = 'folded'"
+            ).fetchall()
+        }
+        copied = {}
+        con.execute("BEGIN TRANSACTION")
+        try:
+            for table, (ddl, insert) in WRITE_TABLES.items():
+                if table not in present:
+                    continue
+                for statement in ddl:
+                    con.execute(statement)
+                con.execute(f"{insert} INTO {table} SELECT * FROM folded.{table}")
+                copied[table] = con.execute(f"SELECT count(*) FROM folded.{table}").fetchone()[0]
+            con.execute("COMMIT")
+        except Exception:
+            con.execute("ROLLBACK")
+            raise
+        return copied
+    finally:
+        con.execute("DETACH folded")
+
+
+def now() -> str:
+    """Timestamp for buffered rows (ISO text, so rows stay JSON-serializable)."""
+    return datetime.utcnow().isoformat(sep=" ")
+
+
+class WriteBehindBuffer:
+    """Group-commit buffer in front of the write-store tables (`memory_store` by default)."""
+
+    def __init__(
+        self,
+        db_path: Optional[Union[str, Path]] = None,
+        max_batch: int = 256,
+        max_delay: float = 0.25,
+    ):
+        """`db_path` names the shared write-store base; this process writes to its pid-suffixed store."""
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.store = process_writes_path(db_path or WRITES_DB_PATH)
+        self.spill_path = spill_path(self.store)
+        self._con = writes_connection(self.store).cursor()
+        self._created = set()
+        self._db_lock = threading.Lock()
+        with self._db_lock:
+            for table in list(WRITE_TABLES):
+                self._create(table)
+        self._cond = threading.Condition()
+        self._pending: Dict[RowKey, tuple] = self._load_spill(self.spill_path)
+        self._spilled = bool(self._pending)
+        self._adopt(db_path or WRITES_DB_PATH)
+        self._in_flight: Dict[RowKey, tuple] = {}
+        self._oldest: Optional[float] = time.monotonic() if self._pending else None
+        self._flush_requested = 0
+        self._flushed = 0
+        self._closed = False
+        self._error: Optional[Exception] = None
+        self.stats = {"puts": 0, "coalesced": 0, "commits": 0, "rows_committed": 0}
+        self._thread = threading.Thread(target=self._run, name="memory-write-behind", daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    # --- writes -----------------------------------------------------------
+
+    def put(self, key: str, value: str, kind: str = "memory") -> int:
+        """Buffer a memory_store write; returns the number of rows now pending."""
+        return self.put_row("memory_store", key, (key, kind, value, now()))
+
+    def put_row(self, table: str, key: str, row: tuple) -> int:
+        """Buffer a full row of a registered table; `key` coalesces rewrites of the same row."""
+        if table not in WRITE_TABLES:
+            raise KeyError(f"Unknown write-store table '{table}'")
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("WriteBehindBuffer is closed")
+            if (table, key) in self._pending:
+                self.stats["coalesced"] += 1
+            self._pending[(table, key)] = tuple(row)
+            self.stats["puts"] += 1
+            if self._oldest is None:
+                self._oldest = time.monotonic()
+            pending = len(self._pending)
+            if pending >= self.max_batch or pending == 1:
+                self._cond.notify_all()
+            return pending
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Commit everything buffered so far; True once it is durable.
+
+        Re-raises the last commit error (the rows stay buffered for retry).
+        """
+        with self._cond:
+            self._flush_requested += 1
+            ticket = self._flush_requested
+            self._cond.notify_all()
+            done = self._cond.wait_for(lambda: self._flushed >= ticket, timeout)
+            error, self._error = self._error, None
+        if error is not None:
+            raise error
+        return done
+
+    def close(self) -> None:
+        """Flush remaining writes and stop the background thread."""
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join()
+        if self._pending:
+            self._spill(self._error)
+        with self._db_lock:
+            self._con.close()
+
+    # --- stores and rows left by exited processes -------------------------
+
+    def _adopt(self, base: Union[str, Path]) -> None:
+        """Fold in the stores (and unflushed rows) of processes that have exited, then delete them."""
+        for store in writes_stores(base):
+            if store == self.store:
+                continue
+            try:
+                with self._db_lock:
+                    fold_store(self._con, store)
+            except duckdb.IOException:
+                continue  # its owner is still running
+            rows = self._load_spill(spill_path(store))
+            if rows:
+                for key, row in rows.items():
+                    self._pending.setdefault(key, row)
+                self._save_spill()  # on our own spill until they are committed
+                self._spilled = True
+            for path in (spill_path(store), Path(f"{store}.wal"), store):
+                try:
+                    path.unlink(missing_ok=True)
+                except OSError:  # still attached by an ingest run (Windows); folded again next time
+                    break
+
+    @staticmethod
+    def _load_spill(path: Path) -> Dict[RowKey, tuple]:
+        rows: Dict[RowKey, tuple] = {}
+        try:
+            with open(path, encoding="utf-8") as fp:
+                for line in fp:
+                    table, key, row = json.loads(line)
+                    rows[(table, key)] = tuple(row)
+        except FileNotFoundError:
+            pass
+        return rows
+
+    def _save_spill(self) -> None:
+        tmp = self.spill_path.with_name(f".{self.spill_path.name}.tmp")
+        with open(tmp, "w", encoding="utf-8") as fp:  # pending already holds any rows loaded from it
+            for (table, key), row in self._pending.items():
+                fp.write(json.dumps([table, key, row]) + "\n")
+        os.replace(tmp, self.spill_path)
+
+    def _spill(self, error: Optional[Exception]) -> None:
+        self._save_spill()
+        print(
+            f"memory_bank: {len(self._pending)} buffered writes not committed ({error}); "
+            f"saved to {self.spill_path} for the next run",
+            file=sys.stderr,
+        )
+
+    # --- reads ------------------------------------------------------------
+
+    def get(self, key: str) -> Optional[str]:
+        """Read a key, seeing this process's unflushed writes first."""
+        with self._cond:
+            row = self._pending.get(("memory_store", key)) or self._in_flight.get(("memory_store", key))
+        if row is not None:
+            return row[2]
+        found = self.query("SELECT value FROM memory_store WHERE key = ?", [key])
+        return found[0][0] if found else None
+
+    def keys(self, prefix: str = "") -> List[str]:
+        """All known keys with `prefix`, buffered ones included."""
+        buffered = {k for k in self.pending_rows("memory_store") if k.startswith(prefix)}
+        stored = self.query("SELECT key FROM memory_store WHERE starts_with(key, ?)", [prefix])
+        return sorted(buffered | {k for (k,) in stored})
+
+    def pending_rows(self, table: str) -> Dict[str, tuple]:
+        """{key: row} of `table` not committed yet. Read this before querying the store."""
+        with self._cond:
+            rows = {k: r for (t, k), r in self._in_flight.items() if t == table}
+            rows.update((k, r) for (t, k), r in self._pending.items() if t == table)
+        return rows
+
+    def query(self, sql: str, params: Optional[list] = None) -> List[tuple]:
+        """Run a read on the write store (committed rows only)."""
+        with self._db_lock:
+            return self._con.execute(sql, params).fetchall()
+
+    # --- background commit loop -------------------------------------------
+
+    def _due(self) -> bool:
+        if self._closed or self._flush_requested > self._flushed:
+            return True
+        if not self._pending:
+            return False
+        return (
+            len(self._pending) >= self.max_batch
+            or time.monotonic() - self._oldest >= self.max_delay
+        )
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._due():
+                    wait = None
+                    if self._oldest is not None:
+                        wait = max(0.0, self.max_delay - (time.monotonic() - self._oldest))
+                    self._cond.wait(wait)
+                self._in_flight, self._pending = self._pending, {}
+                self._oldest = None
+                ticket = self._flush_requested
+                closing = self._closed
+
+            error = None
+            if self._in_flight:
+                try:
+                    self._commit(self._in_flight)
+                except Exception as e:  # keep the rows; retry on the next window
+                    error = e
+
+            with self._cond:
+                if error is not None:
+                    for key, row in self._in_flight.items():
+                        self._pending.setdefault(key, row)
+                    if self._pending and self._oldest is None:
+                        self._oldest = time.monotonic()
+                    self._error = error
+                elif self._spilled:
+                    self._spilled = False
+                    self.spill_path.unlink(missing_ok=True)  # the re-queued rows were in this commit
+                self._in_flight = {}
+                self._flushed = ticket
+                self._cond.notify_all()
+                if closing and (error is not None or not self._pending):
+                    return
+
+    def _create(self, table: str) -> None:
+        for ddl in WRITE_TABLES[table][0]:
+            self._con.execute(ddl)
+        self._created.add(table)
+
+    def _commit(self, rows: Dict[RowKey, tuple]) -> None:
+        by_table: Dict[str, List[tuple]] = {}
+        for (table, _), row in rows.items():
+            by_table.setdefault(table, []).append(row)
+        with self._db_lock:
+            for table in by_table.keys() - self._created:
+                self._create(table)
+            self._con.execute("BEGIN TRANSACTION")
+            try:
+                for table, items in by_table.items():
+                    insert = WRITE_TABLES[table][1]
+                    for i in range(0, len(items), ROWS_PER_STATEMENT):
+                        chunk = items[i:i + ROWS_PER_STATEMENT]
+                        placeholders = ", ".join(["(" + ", ".join(["?"] * len(chunk[0])) + ")"] * len(chunk))
+                        params = [field for row in chunk for field in row]
+                        self._con.execute(f"{insert} INTO {table} VALUES {placeholders}", params)
+                self._con.execute("COMMIT")
+            except Exception:
+                self._con.execute("ROLLBACK")
+                raise
+        self.stats["commits"] += 1
+        self.stats["rows_committed"] += len(rows)
+
+
+_buffer: Optional[WriteBehindBuffer] = None
+_buffer_lock = threading.Lock()
+
+
+def get_write_buffer() -> WriteBehindBuffer:
+    """Process-wide buffer shared by every Commander in this process."""
+    global _buffer
+    with _buffer_lock:
+        if _buffer is None:
+            _buffer = WriteBehindBuffer()
+        return _buffer